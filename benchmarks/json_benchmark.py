@@ -0,0 +1,57 @@
+"""
+Compare FastAPI's default response rendering with FastJSONRoute on a large topic listing.
+
+Run from the project root:
+    python -m benchmarks.json_benchmark [--topics 5000] [--repeat 5]
+"""
+from common.responses import FastJSONResponse
+from common.routing import FastJSONRoute
+from data.models import Topic
+from datetime import datetime, timedelta
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+import argparse
+import timeit
+
+def _app(topics: list[Topic], **router_options) -> TestClient:
+    router = APIRouter(prefix="/api", **router_options)
+
+    @router.get("/model", response_model=list[Topic])
+    def with_response_model():
+        return topics
+
+    @router.get("/plain")
+    def without_response_model():
+        return (topic for topic in topics)
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+def run(count: int, repeat: int):
+    start = datetime(2025, 1, 1)
+    topics = [
+        Topic.from_query_result(i, f"Topic {i}", "Some content " * 20, i % 7, i % 50, 0, None,
+                                start + timedelta(minutes=i), f"user{i % 50}", None)
+        for i in range(count)]
+
+    default = _app(topics)
+    fast = _app(topics, route_class=FastJSONRoute, default_response_class=FastJSONResponse)
+
+    print(f"{'endpoint':<32} {'default ms':>11} {'fast ms':>8} {'speedup':>8}   ({count} topics, best of {repeat})")
+    for path, label in (("/api/model", "response_model=list[Topic]"), ("/api/plain", "generator, no response_model")):
+        assert default.get(path).json() == fast.get(path).json()
+
+        default_ms = min(timeit.repeat(lambda: default.get(path), number=1, repeat=repeat)) * 1000
+        fast_ms = min(timeit.repeat(lambda: fast.get(path), number=1, repeat=repeat)) * 1000
+        print(f"{label:<32} {default_ms:>11.1f} {fast_ms:>8.1f} {default_ms / fast_ms:>7.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--topics", type=int, default=5_000, help="Topics in the listing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per endpoint, the best one counts.")
+    args = parser.parse_args()
+    run(args.topics, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compare building models from database rows with and without Pydantic validation.
+
+Run from the project root:
+    python -m benchmarks.models_benchmark [--rows 10000] [--repeat 5]
+"""
+from data.models import Topic, Reply, User, Category, MessageResponse
+from datetime import datetime, timedelta
+import argparse
+import timeit
+
+START = datetime(2025, 1, 1)
+
+# Rows shaped like the services' SELECTs, one factory per model
+ROWS = {
+    Topic: lambda i: (i, f"Topic {i}", "Some content " * 20, i % 7, i % 50, 0, None, START + timedelta(minutes=i), f"user{i % 50}", None),
+    Reply: lambda i: (i, "Some reply text " * 5, i % 100, i % 50, START + timedelta(minutes=i), f"user{i % 50}", None, i % 13, i % 3),
+    User: lambda i: (i, f"user{i}", "x" * 64, 0, None, START),
+    Category: lambda i: (i, f"Category {i}", 0, 0, None),
+    MessageResponse: lambda i: (i, "Hello there", f"user{i % 50}", None, START + timedelta(seconds=i)),
+}
+
+def _validated(model, rows: list[tuple]) -> list:
+    """The old path: the full Pydantic constructor."""
+    fields = list(model.model_fields)
+    return [model(**dict(zip(fields, row))) for row in rows]
+
+def _trusted(model, rows: list[tuple]) -> list:
+    """The trusted path the services use for database rows."""
+    return [model.from_query_result(*row) for row in rows]
+
+def run(rows: int, repeat: int):
+    print(f"{'model':<16} {'validated ms':>13} {'trusted ms':>11} {'speedup':>8}   ({rows} rows, best of {repeat})")
+    for model, make_row in ROWS.items():
+        data = [make_row(i) for i in range(rows)]
+        assert _validated(model, data[:1]) == _trusted(model, data[:1])
+
+        validated = min(timeit.repeat(lambda: _validated(model, data), number=1, repeat=repeat)) * 1000
+        trusted = min(timeit.repeat(lambda: _trusted(model, data), number=1, repeat=repeat)) * 1000
+        print(f"{model.__name__:<16} {validated:>13.1f} {trusted:>11.1f} {validated / trusted:>7.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per model.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path, the best one counts.")
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+if __name__ == "__main__":
+    main()
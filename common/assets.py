@@ -0,0 +1,143 @@
+from common.compression import PrecompressedStaticFiles, VARIANT_SUFFIXES
+from starlette.responses import Response
+from starlette.types import Scope
+from pathlib import Path
+import threading
+import anyio
+import os
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Templates link static files through static_url(), which   #
+#       puts a hash of the file's content in its name, e.g.       #
+#       css/styles.css -> css/styles.1a2b3c4d5e.css. A hashed URL #
+#       never changes content, so browsers may cache it for a     #
+#       year without revalidating; editing a file changes its URL.#
+#       The manifest is built from the files once, at startup.    #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+STATIC_URL_PREFIX = "/static"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache" # Cached, but checked with the ETag before every use
+
+HASH_LENGTH = 10
+
+class AssetManifest:
+    """
+    Map of the files under a directory to their content-hashed names.
+
+    Args:
+        directory (str | Path): The static files directory.
+    """
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._hashed: dict[str, str] | None = None # path -> hashed path
+        self._originals: dict[str, str] = {}        # hashed path -> path
+        self._versions: dict[str, tuple[int, int]] = {} # path -> (mtime_ns, size) of the hashed content
+        self._lock = threading.Lock()
+
+    def build(self) -> dict[str, str]:
+        """
+        Hash every file under the directory (precompressed variants aside) and make it the manifest.
+
+        Returns:
+            dict[str, str]: Relative path -> hashed relative path, with '/' separators.
+        """
+        hashed, versions = {}, {}
+        for file in sorted(self.directory.rglob("*")):
+            if not file.is_file() or file.suffix in VARIANT_SUFFIXES.values(): continue
+
+            path = file.relative_to(self.directory).as_posix()
+            versions[path] = _version(file.stat())
+            digest = hashlib.sha256(file.read_bytes()).hexdigest()[:HASH_LENGTH]
+            hashed[path] = _with_hash(path, digest)
+
+        with self._lock:
+            self._originals = {value: key for key, value in hashed.items()}
+            self._versions = versions
+            self._hashed = hashed # Last: readers take a set _hashed as a built manifest
+
+        logger.info("Asset manifest built: %d files", len(hashed))
+        return hashed
+
+    def _entries(self) -> dict[str, str]:
+        hashed = self._hashed
+        return hashed if hashed is not None else self.build()
+
+    def hashed_path(self, path: str) -> str | None:
+        """Get the hashed name of a file, or None if it isn't in the manifest."""
+        return self._entries().get(path.lstrip("/"))
+
+    def original_path(self, hashed_path: str) -> str | None:
+        """Get the file behind a hashed name, or None if it isn't one."""
+        self._entries()
+        return self._originals.get(hashed_path.lstrip("/"))
+
+    def is_current(self, path: str, stat_result: os.stat_result | None) -> bool:
+        """Whether a file is still the one that was hashed, i.e. its hashed name matches its content."""
+        self._entries()
+        return stat_result is not None and self._versions.get(path.lstrip("/")) == _version(stat_result)
+
+    def url(self, path: str) -> str:
+        """
+        Get the URL of a static file, hashed if the file is in the manifest.
+
+        Example:
+            url("css/styles.css") -> "/static/css/styles.1a2b3c4d5e.css"
+        """
+        path = path.lstrip("/")
+        return f"{STATIC_URL_PREFIX}/{self.hashed_path(path) or path}"
+
+def _version(stat_result: os.stat_result) -> tuple[int, int]:
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+def _with_hash(path: str, digest: str) -> str:
+    directory, _, name = path.rpartition("/")
+    stem, dot, extension = name.partition(".")
+    name = f"{stem}.{digest}{dot}{extension}" if dot else f"{stem}.{digest}"
+    return f"{directory}/{name}" if directory else name
+
+
+_manifest = AssetManifest("static")
+
+def build_manifest() -> dict[str, str]:
+    """Hash the files under static/ for static_url(), e.g. at startup."""
+    return _manifest.build()
+
+def static_url(path: str) -> str:
+    """Template helper: URL of a file under static/, with its content hash, e.g. static_url('css/styles.css')."""
+    return _manifest.url(path)
+
+
+class AssetStaticFiles(PrecompressedStaticFiles):
+    """
+    Static files served under both their plain and their hashed names. Hashed names are
+    cached by browsers for a year as immutable; plain names are revalidated on every use,
+    and so are hashed names of files changed since the manifest was built, whose content
+    no longer matches their hash.
+
+    Args:
+        manifest (AssetManifest): Manifest of the hashed names. Defaults to the shared one.
+        **kwargs: Passed on to StaticFiles.
+    """
+    def __init__(self, *, manifest: AssetManifest | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest or _manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        original = self.manifest.original_path(Path(path).as_posix())
+        response = await super().get_response(original or path, scope)
+        if response.status_code not in (200, 304): return response
+
+        # PrecompressedStaticFiles only serves variants written after the source, so the
+        # body matches the hash as long as the source is still the file that was hashed
+        immutable = False
+        if original:
+            _, stat_result = await anyio.to_thread.run_sync(self.lookup_path, original)
+            immutable = self.manifest.is_current(original, stat_result)
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        return response
@@ -1,15 +1,21 @@
-from services.users_service import is_user_authenticated, find_user_by_token
+from services.users_service import find_user_by_token, find_user_by_token_async
 from fastapi import HTTPException, Request
 from data.models import User
 
 def get_user_or_raise_401(u_token: str) -> User:
     """Get User obj from u_token string or raise 401 Unauthorized."""
-    if not is_user_authenticated(u_token):
+    user = find_user_by_token(u_token)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid u-token.")
 
-    return find_user_by_token(u_token)
+    return user
 
 def get_user_if_token(request: Request) -> User | None:
     """Get User obj from Request cookies or None."""
     token = request.cookies.get('u-token')
-    return find_user_by_token(token)
\ No newline at end of file
+    return find_user_by_token(token)
+
+async def get_user_if_token_async(request: Request) -> User | None:
+    """Async version of get_user_if_token, for async route handlers."""
+    token = request.cookies.get('u-token')
+    return await find_user_by_token_async(token)
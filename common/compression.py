@@ -0,0 +1,281 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import StaticFiles
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from pathlib import Path
+import anyio
+import mimetypes
+import gzip
+import zlib
+import stat
+import os
+
+try:
+    import brotli
+except ImportError: # Optional: without it only gzip is offered
+    brotli = None
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Dynamic responses (HTML pages, JSON, NDJSON exports) are  #
+#       compressed by CompressionMiddleware, with brotli when the #
+#       client accepts it and the package is installed, else gzip.#
+#       Static files are compressed once, ahead of time, by       #
+#       `python manage.py compress-static`; PrecompressedStatic-  #
+#       Files serves those variants, and the middleware skips any #
+#       response that already has a Content-Encoding.             #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+COMPRESSION_CONFIG = {
+    "minimum_size": int(os.getenv("COMPRESSION_MIN_SIZE", 500)),
+    "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)),
+}
+
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+    "image/svg+xml", "image/x-icon",
+})
+
+# Static file extensions worth precompressing, and the suffix of each variant
+PRECOMPRESSED_EXTENSIONS = frozenset({".css", ".js", ".svg", ".html", ".json", ".txt", ".ico", ".map"})
+VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+def supported_encodings() -> tuple[str, ...]:
+    """Content codings this server can produce, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def choose_encoding(accept_encoding: str, offered: tuple[str, ...] | None = None) -> str | None:
+    """
+    Pick the content coding to use for a request from its Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header, e.g. "gzip, br;q=0.9".
+        offered (tuple[str, ...] | None): Codings to choose from, preferred first. Defaults to supported_encodings().
+
+    Returns:
+        str | None: The accepted coding with the highest q-value (ties go to the preferred one), or None.
+    """
+    offered = offered or supported_encodings()
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding: continue
+
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try: q = float(value)
+                except ValueError: q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q: best, best_q = coding, q
+    return best
+
+def is_compressible(content_type: str) -> bool:
+    """Whether a media type is text-like enough for compression to pay off."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+            or media_type.endswith("+json") or media_type.endswith("+xml"))
+
+
+class _Compressor:
+    """Incremental compressor with the same interface for every coding."""
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # 16+: gzip header and trailer
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses the client accepts compressed (Accept-Encoding), if they are of a
+    text-like type and at least minimum_size bytes. Streaming responses are compressed
+    chunk by chunk, so they keep streaming.
+
+    Args:
+        app (ASGIApp): The application.
+        minimum_size (int | None): Smallest single-message body worth compressing. Defaults to COMPRESSION_MIN_SIZE.
+        gzip_level (int | None): zlib level, 1 (fastest) to 9. Defaults to COMPRESSION_GZIP_LEVEL.
+        brotli_quality (int | None): Brotli quality, 0 (fastest) to 11. Defaults to COMPRESSION_BROTLI_QUALITY.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None, gzip_level: int | None = None,
+                 brotli_quality: int | None = None):
+        self.app = app
+        self.minimum_size = COMPRESSION_CONFIG["minimum_size"] if minimum_size is None else minimum_size
+        self.gzip_level = COMPRESSION_CONFIG["gzip_level"] if gzip_level is None else gzip_level
+        self.brotli_quality = COMPRESSION_CONFIG["brotli_quality"] if brotli_quality is None else brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Wraps send() for one response, deciding on its first body message whether to compress it."""
+    def __init__(self, middleware: CompressionMiddleware, send: Send, encoding: str):
+        self.middleware = middleware
+        self.send_next = send
+        self.encoding = encoding
+        self.start_message: Message | None = None
+        self.compressor: _Compressor | None = None
+        self.decided = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if self.start_message is None: # e.g. http.response.debug, sent ahead of the response
+            await self.send_next(message)
+            return
+
+        if not self.decided:
+            self.decided = True
+            if message["type"] == "http.response.body" and self._should_compress(message):
+                await self._start_compressing(message)
+                return
+
+            await self.send_next(self.start_message)
+
+        if self.compressor is None or message["type"] != "http.response.body":
+            await self.send_next(message)
+            return
+
+        more_body = message.get("more_body", False)
+        data = self.compressor.compress(message.get("body", b""))
+        if not more_body: data += self.compressor.finish()
+        if data or not more_body:
+            await self.send_next({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _should_compress(self, message: Message) -> bool:
+        status = self.start_message["status"]
+        headers = self._headers()
+        if status < 200 or status in (204, 304) or "content-encoding" in headers: return False
+        if not is_compressible(headers.get("content-type", "")): return False
+
+        headers.add_vary_header("Accept-Encoding")
+        return message.get("more_body", False) or len(message.get("body", b"")) >= self.middleware.minimum_size
+
+    def _headers(self) -> MutableHeaders:
+        """The response's headers, editable in place."""
+        self.start_message["headers"] = list(self.start_message.get("headers", []))
+        return MutableHeaders(raw=self.start_message["headers"])
+
+    async def _start_compressing(self, message: Message):
+        self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        more_body = message.get("more_body", False)
+        data = self.compressor.compress(message.get("body", b""))
+        if not more_body: data += self.compressor.finish()
+
+        headers = self._headers()
+        headers["Content-Encoding"] = self.encoding
+        del headers["Content-Length"]
+        if not more_body: headers["Content-Length"] = str(len(data))
+        if "etag" in headers: headers["ETag"] = _weak_etag(headers["etag"]) # The bytes differ from the identity body
+
+        await self.send_next(self.start_message)
+        await self.send_next({"type": "http.response.body", "body": data, "more_body": more_body})
+
+def _weak_etag(etag: str) -> str:
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a file's precompressed variant (style.css.br, style.css.gz)
+    when one exists and the client accepts its coding. Build the variants with
+    `python manage.py compress-static`; files without variants are served as is, and so
+    are files changed since their variants were written.
+    """
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code not in (200, 304) or not _has_precompressible_extension(path):
+            return response
+
+        response.headers.add_vary_header("Accept-Encoding")
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        offered = list(VARIANT_SUFFIXES)
+        _, source_stat = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if source_stat is None: return response
+
+        # Try the codings the client prefers first, skipping those without an up to date variant on disk
+        while offered and (encoding := choose_encoding(accept_encoding, tuple(offered))) is not None:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + VARIANT_SUFFIXES[encoding])
+            if _is_fresh_variant(stat_result, source_stat):
+                variant = self.file_response(full_path, stat_result, scope)
+                variant.headers["Content-Type"] = response.headers.get("content-type") or _guess_type(path)
+                variant.headers["Content-Encoding"] = encoding
+                variant.headers.add_vary_header("Accept-Encoding")
+                return variant
+            offered.remove(encoding)
+
+        return response
+
+def _is_fresh_variant(variant_stat: os.stat_result | None, source_stat: os.stat_result) -> bool:
+    """Whether a variant exists and was written after its source last changed."""
+    return (variant_stat is not None and stat.S_ISREG(variant_stat.st_mode)
+            and variant_stat.st_mtime >= source_stat.st_mtime)
+
+def _has_precompressible_extension(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in PRECOMPRESSED_EXTENSIONS
+
+def _guess_type(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def precompress_directory(directory: str | os.PathLike) -> int:
+    """
+    Write .gz (and, with brotli installed, .br) variants next to every text-like file
+    under a directory. Variants newer than their file are kept, and variants that
+    wouldn't be smaller than the file aren't written.
+
+    Args:
+        directory (str | PathLike): The static files directory.
+
+    Returns:
+        int: The number of variants written.
+    """
+    written = 0
+    for source in sorted(Path(directory).rglob("*")):
+        if not source.is_file() or source.suffix.lower() not in PRECOMPRESSED_EXTENSIONS: continue
+
+        data = None
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            if encoding == "br" and brotli is None: continue
+
+            target = source.with_name(source.name + suffix)
+            if target.exists() and target.stat().st_mtime >= source.stat().st_mtime: continue
+
+            if data is None: data = source.read_bytes()
+            compressed = (brotli.compress(data, quality=11) if encoding == "br"
+                          else gzip.compress(data, compresslevel=9, mtime=0))
+            if len(compressed) >= len(data):
+                target.unlink(missing_ok=True)
+                continue
+
+            target.write_bytes(compressed)
+            written += 1
+
+    return written
@@ -0,0 +1,48 @@
+from data.database import DB_REPLICA_CONFIG, DB_QUERY_STATS_CONFIG, request_scope
+from services import loaders
+from fastapi import Request
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cookie holding the unix time of the client's last write, see database_middleware
+READ_YOUR_WRITES_COOKIE = "db-wrote-at"
+
+async def database_middleware(request: Request, call_next):
+    """
+    Open a database request scope around every request, with the request's DataLoaders
+    (see services/loaders.py), so an entity is looked up at most once per request.
+
+    Reads are pinned to the primary for DB_READ_YOUR_WRITES_SECONDS after the client's
+    last write, so a POST-redirect-GET always shows the user's own reply or message
+    even if the read replicas lag behind.
+
+    Every response carries the request's SQL summary in the X-DB-Queries and X-DB-Time-Ms
+    headers, and statements repeated more than DB_N_PLUS_ONE_THRESHOLD times are logged
+    as likely N+1 patterns.
+
+    The scope closes once the response starts, before the body is sent. Queries run while
+    a StreamingResponse body is iterated (e.g. the NDJSON exports) are therefore left out
+    of the headers and the N+1 check, and get neither the request's DataLoaders nor its
+    primary pinning.
+    """
+    window = DB_REPLICA_CONFIG["read_your_writes_seconds"]
+    try: wrote_at = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError: wrote_at = 0.0
+
+    with request_scope(pinned_until=wrote_at + window) as state, loaders.request_scope():
+        response = await call_next(request)
+
+    queries = state.queries
+    response.headers["X-DB-Queries"] = str(queries.count)
+    response.headers["X-DB-Time-Ms"] = f"{queries.total_ms:.1f}"
+
+    repeated = queries.repeated(DB_QUERY_STATS_CONFIG["n_plus_one_threshold"])
+    for sql, times in repeated:
+        logger.warning("Possible N+1 on %s %s: ran %d times: %s", request.method, request.url.path, times, sql)
+    logger.info("%s %s: %s", request.method, request.url.path, queries.summary())
+
+    if state.last_write_at is not None and DB_REPLICA_CONFIG["hosts"]:
+        response.set_cookie(READ_YOUR_WRITES_COOKIE, f"{state.last_write_at:.3f}",
+                            max_age=max(int(window), 1), httponly=True, samesite="lax")
+    return response
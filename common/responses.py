@@ -1,4 +1,7 @@
 from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
 
 class BadRequest(Response):
     def __init__(self, content=''):
@@ -27,3 +30,30 @@ class InternalServerError(Response):
 class Created(Response):
     def __init__(self, content=''):
         super().__init__(status_code=201, content=content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by pydantic-core in one pass, straight from models, lists or
+    generators of models, datetimes etc. to bytes, without intermediate dicts.
+
+    Args:
+        adapter (TypeAdapter | None): Serialize with this type's schema (e.g. the route's
+            response model) instead of the runtime types of the content.
+        **dump_options: include / exclude / exclude_none ... options for adapter.dump_json().
+    """
+    def __init__(self, content, status_code: int = 200, headers=None, media_type=None, background=None,
+                 *, adapter: TypeAdapter | None = None, **dump_options):
+        self.adapter = adapter
+        self.dump_options = dump_options
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content) -> bytes:
+        if self.adapter is None: return to_json(content)
+        return self.adapter.dump_json(content, **self.dump_options)
+
+
+def set_cursor_headers(response: Response, next_cursor: str | None, prev_cursor: str | None):
+    """Expose the cursors of a paginated listing as X-Next-Cursor / X-Prev-Cursor headers."""
+    if next_cursor: response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor: response.headers["X-Prev-Cursor"] = prev_cursor
@@ -1,12 +1,120 @@
 from fastapi.templating import Jinja2Templates
+from fastapi import Request
 from common.authenticate import get_user_if_token
-from services.users_service import *
+from common.assets import static_url
+from services.users_service import get_avatar_by_username, get_avatar_by_user_id, find_user_by_id, load_users
+from collections.abc import Iterator
+from contextvars import ContextVar
+from pydantic import BaseModel
+import functools
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Template globals are memoized per request, so a template  #
+#       can call them in loops without repeating the lookup.      #
+#       Authors (user_id) of the rendered models are prefetched   #
+#       with one query per batch before the template needs them.  #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+PREFETCH_BATCH_SIZE = 100
+
+_render_memo: ContextVar[dict | None] = ContextVar("template_render_memo", default=None)
+
+def _memoized(fn):
+    """Memoize a template global by its arguments for the request being rendered."""
+    @functools.wraps(fn)
+    def wrapper(*args):
+        memo = _render_memo.get()
+        if memo is None: return fn(*args)
+
+        key = (fn.__name__, *args)
+        if key not in memo: memo[key] = fn(*args)
+        return memo[key]
+    return wrapper
+
+def _get_user(request: Request):
+    """Memoized get_user_if_token. Requests aren't hashable, and there is one per render anyway."""
+    memo = _render_memo.get()
+    if memo is None: return get_user_if_token(request)
+
+    if "get_user" not in memo: memo["get_user"] = get_user_if_token(request)
+    return memo["get_user"]
+
+def _prefetch_users(items):
+    """Load the authors of the given models with one query and memoize them for the render."""
+    memo = _render_memo.get()
+    if memo is None: return
+
+    # Models that were loaded with their author already (e.g. joined username) need no lookup
+    ids = {getattr(item, "user_id", None) for item in items if not getattr(item, "username", None)}
+    ids = {id for id in ids if isinstance(id, int) and ("find_user_by_id", id) not in memo}
+    if not ids: return
+
+    users = load_users(ids)
+    for id in ids:
+        user = users.get(id)
+        memo[("find_user_by_id", id)] = user
+        memo[("get_avatar_by_user_id", id)] = user.avatar_url if user else None
+
+def _prefetching(items: Iterator):
+    """Wrap a lazy sequence so the authors of each batch are prefetched before it is rendered."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= PREFETCH_BATCH_SIZE:
+            _prefetch_users(batch)
+            yield from batch
+            batch = []
+
+    _prefetch_users(batch)
+    yield from batch
+
+def _prefetch_context(context: dict):
+    """Prefetch the authors of every model in the context, wrapping streamed sequences."""
+    eager = []
+    for key, value in context.items():
+        if isinstance(value, BaseModel): eager.append(value)
+        elif isinstance(value, (list, tuple)): eager.extend(value)
+        elif isinstance(value, Iterator): context[key] = _prefetching(value)
+
+    _prefetch_users(eager)
+
 
 class CustomJinja2Templates(Jinja2Templates):
     def __init__(self, directory: str):
         super().__init__(directory=directory)
-        self.env.globals['get_user'] = get_user_if_token
-        self.env.globals['get_avatar_by_username'] = get_avatar_by_username
-        self.env.globals['get_avatar_by_user_id'] = get_avatar_by_user_id
-        self.env.globals['find_user_by_id'] = find_user_by_id
-        
\ No newline at end of file
+        self.env.globals['get_user'] = _get_user
+        self.env.globals['static_url'] = static_url
+        self.env.globals['get_avatar_by_username'] = _memoized(get_avatar_by_username)
+        self.env.globals['get_avatar_by_user_id'] = _memoized(get_avatar_by_user_id)
+        self.env.globals['find_user_by_id'] = _memoized(find_user_by_id)
+
+    def TemplateResponse(self, *args, **kwargs):
+        """
+        Render a template with request-scoped memoized globals and prefetched authors.
+        Accepts the same arguments as Jinja2Templates.TemplateResponse.
+        """
+        request, context = _request_and_context(args, kwargs)
+
+        memo = {}
+        if request is not None:
+            memo = getattr(request.state, "template_memo", None) or memo
+            request.state.template_memo = memo
+
+        token = _render_memo.set(memo)
+        try:
+            if context: _prefetch_context(context)
+            return super().TemplateResponse(*args, **kwargs)
+        finally:
+            _render_memo.reset(token)
+
+
+def _request_and_context(args: tuple, kwargs: dict) -> tuple[Request | None, dict | None]:
+    """Find the request and context in either TemplateResponse calling convention."""
+    if args and isinstance(args[0], Request):
+        request, rest = args[0], args[2:]   # (request, name, context, ...)
+    else:
+        request, rest = kwargs.get("request"), args[1:]   # (name, context, ...)
+
+    context = kwargs.get("context", rest[0] if rest else None)
+    if request is None and context: request = context.get("request")
+    return request, context
@@ -0,0 +1,145 @@
+from data.database import DB_CONFIG, DB_POOL_CONFIG, record_query
+from contextlib import asynccontextmanager
+import aiomysql
+import asyncio
+import time
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Async twin of data.database for async route handlers.     #
+#       Queries keep using '?' placeholders like the sync layer,  #
+#       so the same SQL can be shared between both.               #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+_pool: aiomysql.Pool | None = None
+_pool_lock: asyncio.Lock | None = None
+_pool_loop: asyncio.AbstractEventLoop | None = None
+
+async def _get_pool() -> aiomysql.Pool:
+    """
+    Get the asyncio connection pool, creating it on first use inside the running event loop.
+    The pool and its lock belong to that loop; a new loop (e.g. one per test) gets its own.
+    """
+    global _pool, _pool_lock, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool_loop is not loop:
+        _pool, _pool_lock, _pool_loop = None, asyncio.Lock(), loop
+
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    user = DB_CONFIG["user"],
+                    password = DB_CONFIG["password"],
+                    host = DB_CONFIG["host"],
+                    port = DB_CONFIG["port"],
+                    db = DB_CONFIG["database"],
+                    minsize = DB_POOL_CONFIG["min_size"],
+                    maxsize = DB_POOL_CONFIG["max_size"],
+                    pool_recycle = DB_POOL_CONFIG["recycle_seconds"],
+                    autocommit = True
+                )
+    return _pool
+
+@asynccontextmanager
+async def _get_connection():
+    """
+    Check out a pooled connection, waiting at most the configured pool timeout.
+    """
+    pool = await _get_pool()
+    conn = await asyncio.wait_for(pool.acquire(), DB_POOL_CONFIG["timeout_seconds"])
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+_QUOTES = "'\"`"
+
+def _to_driver_sql(sql: str) -> str:
+    """
+    Convert a '?' placeholder query to the driver's '%s' paramstyle. Only '?' outside of
+    quoted literals and identifiers are placeholders, e.g. in "WHERE a = ? AND b LIKE 'x?%'"
+    only the first one is. Literal '%' signs are escaped so they survive the driver's formatting.
+    """
+    out, quote, i = [], None, 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            if char == "\\" and quote != "`" and i + 1 < len(sql):
+                out.append(sql[i:i + 2].replace("%", "%%")) # Escaped character, e.g. \'
+                i += 2
+                continue
+            if char == quote: quote = None # A doubled quote ('') simply reopens the literal
+        elif char in _QUOTES:
+            quote = char
+        elif char == "?":
+            char = "%s"
+
+        out.append("%%" if char == "%" else char)
+        i += 1
+
+    return "".join(out)
+
+async def close_pool():
+    """
+    Close the asyncio connection pool, e.g. on application shutdown.
+    """
+    global _pool, _pool_lock, _pool_loop
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+    _pool, _pool_lock, _pool_loop = None, None, None
+
+async def read_query(sql: str, sql_params=()) -> list[tuple]:
+    """
+    Async version of data.database.read_query.
+
+    Args:
+        sql (str): The SQL query string to execute, with '?' placeholders.
+        sql_params (tuple): The SQL query parameters. Defaults as an empty tuple.
+
+    Returns:
+        list: The result of the SQL query as a sequence of sequences, e.g. list(tuple).
+    """
+    async with _get_connection() as conn:
+        async with conn.cursor() as cursor:
+            started = time.perf_counter()
+            await cursor.execute(_to_driver_sql(sql), tuple(sql_params))
+            rows = list(await cursor.fetchall())
+            record_query(sql, started, len(rows))
+            return rows
+
+async def insert_query(sql: str, sql_params=()) -> int:
+    """
+    Async version of data.database.insert_query.
+
+    Args:
+        sql (str): The INSERT SQL query string, with '?' placeholders.
+        sql_params (tuple): The parameters for the query. Defaults to an empty tuple.
+
+    Returns:
+        int: The ID of the last inserted row.
+    """
+    async with _get_connection() as conn:
+        async with conn.cursor() as cursor:
+            started = time.perf_counter()
+            await cursor.execute(_to_driver_sql(sql), tuple(sql_params))
+            record_query(sql, started, cursor.rowcount)
+            return cursor.lastrowid
+
+async def update_query(sql: str, sql_params=()) -> bool:
+    """
+    Async version of data.database.update_query.
+
+    Args:
+        sql (str): The UPDATE SQL query string, with '?' placeholders.
+        sql_params (tuple): The parameters for the query. Defaults to an empty tuple.
+
+    Returns:
+        bool: True if rows were affected, False otherwise.
+    """
+    async with _get_connection() as conn:
+        async with conn.cursor() as cursor:
+            started = time.perf_counter()
+            await cursor.execute(_to_driver_sql(sql), tuple(sql_params))
+            record_query(sql, started, cursor.rowcount)
+            return cursor.rowcount > 0
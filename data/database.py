@@ -1,7 +1,15 @@
+from data.query_stats import QueryLog, log_slow_query
+from data.replicas import Replica, ReplicaSet
+from data.pool import ConnectionPool, PoolStats
 from mariadb.connections import Connection
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator
 from dotenv import load_dotenv
 from mariadb import connect
 import cloudinary
+import time
+import re
 import os
 
 load_dotenv()
@@ -18,6 +26,32 @@ DB_CONFIG = {
 # ===========================================================================
 
 # ================================ OPTIONALS ================================
+# Load connection pool config from .env, defaults are fine for a single worker.
+DB_POOL_CONFIG = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+    "recycle_seconds": float(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800)),
+    "timeout_seconds": float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 10)),
+    "ping_after_idle_seconds": float(os.getenv("DB_POOL_PING_AFTER_IDLE_SECONDS", 1)),
+}
+
+# Load read replica config from .env. Reads are balanced across the replicas, writes go to DB_HOST.
+# DB_REPLICA_HOSTS is a comma-separated list of host[:port], credentials default to the primary's.
+DB_REPLICA_CONFIG = {
+    "hosts": [h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(",") if h.strip()],
+    "user": os.getenv("DB_REPLICA_USER", DB_CONFIG["user"]),
+    "password": os.getenv("DB_REPLICA_PASSWORD", DB_CONFIG["password"]),
+    "max_lag_seconds": float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", 5)),
+    "check_interval_seconds": float(os.getenv("DB_REPLICA_CHECK_SECONDS", 5)),
+    "read_your_writes_seconds": float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 10)),
+}
+
+# Load SQL instrumentation config from .env for the slow query log and the N+1 detector.
+DB_QUERY_STATS_CONFIG = {
+    "slow_query_ms": float(os.getenv("DB_SLOW_QUERY_MS", 200)),
+    "n_plus_one_threshold": int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", 5)),
+}
+
 # Load Claudinary config from .env for the user avatar and category images. |
 CLDNR_CONFIG = {
     "cldnr_cloud_name": os.getenv("CLDNR_CLOUD_NAME"),
@@ -37,34 +71,265 @@ else:
 NASA_API_KEY = os.getenv("NASA_API_KEY")
 # ===========================================================================
 
-def _get_connection() -> Connection:
+def _connect(host: str = None, port: int = None, user: str = None, password: str = None) -> Connection:
     """
-    Get a database connection with credentials from DB_CONFIG.
+    Open a new database connection with credentials from DB_CONFIG, or the given overrides.
+    Connections run in autocommit mode, so single statements are committed immediately.
     """
     return connect(
-        user = DB_CONFIG["user"],
-        password = DB_CONFIG["password"],
-        host = DB_CONFIG["host"],
-        port = DB_CONFIG["port"],
-        database = DB_CONFIG["database"]
+        user = user or DB_CONFIG["user"],
+        password = password or DB_CONFIG["password"],
+        host = host or DB_CONFIG["host"],
+        port = port or DB_CONFIG["port"],
+        database = DB_CONFIG["database"],
+        autocommit = True
     )
+
+def _replica(address: str) -> Replica:
+    """
+    Create a Replica with its own connection pool from a 'host[:port]' address.
+    """
+    host, _, port = address.partition(":")
+    port = int(port) if port else DB_CONFIG["port"]
+    connect_fn = lambda: _connect(host, port, DB_REPLICA_CONFIG["user"], DB_REPLICA_CONFIG["password"])
+    return Replica(f"{host}:{port}", ConnectionPool(connect_fn, **DB_POOL_CONFIG))
+
+_pool = ConnectionPool(_connect, **DB_POOL_CONFIG)
+_replicas = ReplicaSet(
+    [_replica(address) for address in DB_REPLICA_CONFIG["hosts"]],
+    max_lag_seconds = DB_REPLICA_CONFIG["max_lag_seconds"],
+    check_interval_seconds = DB_REPLICA_CONFIG["check_interval_seconds"]
+)
+
+class RequestDbState:
+    """
+    Database state of one request, shared by reference with every thread that serves it.
+
+    Attributes:
+        pinned_until (float): Unix time until which reads must go to the primary.
+        last_write_at (float | None): Unix time of the last write made by this request.
+        queries (QueryLog): Every statement executed by this request.
+    """
+    __slots__ = ("pinned_until", "last_write_at", "queries")
+
+    def __init__(self, pinned_until: float = 0.0):
+        self.pinned_until = pinned_until
+        self.last_write_at = None
+        self.queries = QueryLog()
+
+_request_state: ContextVar[RequestDbState | None] = ContextVar("_request_state", default=None)
+
+@contextmanager
+def request_scope(pinned_until: float = 0.0) -> Iterator[RequestDbState]:
+    """
+    Track database state for the duration of one request.
+    Once the request writes, its remaining reads go to the primary. Reads are also
+    pinned to the primary until pinned_until, so a client that just wrote (e.g. a
+    POST-redirect-GET) can read its own writes despite replica lag.
+
+    Args:
+        pinned_until (float): Unix time until which reads must go to the primary.
+
+    Yields:
+        RequestDbState: The state, check last_write_at afterwards to pin follow-up requests.
+    """
+    state = RequestDbState(pinned_until)
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+def record_query(sql: str, started: float, rows: int):
+    """
+    Record an executed statement in the current request's query log and the slow query log.
+
+    Args:
+        sql (str): The executed SQL.
+        started (float): time.perf_counter() value taken right before execution.
+        rows (int): Number of rows returned or affected.
+    """
+    duration_ms = (time.perf_counter() - started) * 1000
+    log_slow_query(sql, duration_ms, rows, DB_QUERY_STATS_CONFIG["slow_query_ms"])
+
+    state = _request_state.get()
+    if state is not None: state.queries.add(sql, duration_ms, rows)
+
+def note_write():
+    """
+    Mark the current request as writing: its remaining reads, and the client's follow-up
+    requests, go to the primary. Called by every write, and by code that defers a write.
+    """
+    state = _request_state.get()
+    if state is not None: state.last_write_at = time.time()
+
+def _read_pool() -> ConnectionPool:
+    """
+    Get the pool to run a read on: a healthy replica unless reads are pinned to the primary.
+    """
+    state = _request_state.get()
+    if state is not None and (state.last_write_at is not None or time.time() < state.pinned_until):
+        return _pool
+
+    replica = _replicas.choose()
+    return replica.pool if replica else _pool
+
+class _Transaction:
+    """
+    A unit of work bound to a single pooled connection to the primary.
+    The connection is checked out lazily on the first query, so a transaction
+    that never touches the database costs nothing.
+    """
+    def __init__(self):
+        self._pooled = None
+
+    @property
+    def conn(self) -> Connection:
+        if self._pooled is None:
+            note_write()
+            self._pooled = _pool.acquire()
+            self._pooled.conn.begin()
+        return self._pooled.conn
+
+    def commit(self):
+        if self._pooled is not None: self._pooled.conn.commit()
+
+    def rollback(self):
+        if self._pooled is not None: self._pooled.conn.rollback()
+
+    def close(self, discard: bool = False):
+        if self._pooled is not None:
+            _pool.release(self._pooled, discard=discard)
+            self._pooled = None
+
+_current_transaction: ContextVar[_Transaction | None] = ContextVar("_current_transaction", default=None)
+
+@contextmanager
+def transaction():
+    """
+    Run every read_query/insert_query/update_query inside the with-block on one
+    connection and commit them together when the block exits. Any exception rolls
+    the whole unit of work back. Nested transaction() blocks join the outer one.
+
+    Example:
+        with transaction():
+            new_id = insert_query(...)
+            insert_query(..., (new_id, ...))
+    """
+    if _current_transaction.get() is not None:
+        yield
+        return
+
+    tx = _Transaction()
+    token = _current_transaction.set(tx)
+    try:
+        yield
+        tx.commit()
+    except BaseException:
+        try:
+            tx.rollback()
+            tx.close()
+        except Exception:
+            tx.close(discard=True)
+        raise
+    else:
+        tx.close()
+    finally:
+        _current_transaction.reset(token)
+
+@contextmanager
+def _get_connection(read_only: bool = False, primary: bool = False):
+    """
+    Get the connection to run a query on: the current transaction's connection if one
+    is active, otherwise a pooled connection that goes back to the pool when the
+    with-block exits. Reads may be served by a replica unless primary is set, writes
+    always go to the primary.
+    """
+    tx = _current_transaction.get()
+    if tx is not None:
+        yield tx.conn
+        return
+
+    if read_only:
+        pool = _pool if primary else _read_pool()
+    else:
+        note_write()
+        pool = _pool
+
+    with pool.connection() as conn:
+        yield conn
+
+def get_pool_stats() -> PoolStats:
+    """
+    Get a snapshot of the primary connection pool usage (in-use, idle, checkout wait times).
+    """
+    return _pool.stats()
+
+def get_replica_stats() -> dict[str, dict]:
+    """
+    Get the health, replication lag and pool usage of every read replica.
+    """
+    return {
+        r.name: {"healthy": r.healthy, "lag_seconds": r.lag_seconds, "pool": r.pool.stats()}
+        for r in _replicas.replicas
+    }
+
+def close_pool():
+    """
+    Close all idle pooled connections, e.g. on application shutdown.
+    """
+    _pool.close()
+    _replicas.close()
     
-def read_query(sql: str, sql_params=()) -> list[tuple]:
+def read_query(sql: str, sql_params=(), *, primary: bool = False) -> list[tuple]:
     """
     Read and execute a SQL query. For parameterized queries, use '?' as a placeholder \n
     for parameters and pass their values as a tuple in the sql_params argument.
+    Served by a read replica when configured, unless the request has to read its own writes.
     Args:
         sql (str): The SQL query string to execute.
         sql_params (tuple): The SQL query parameters. Defaults as an empty tuple.
+        primary (bool): Always read from the primary, e.g. to fill a shared cache that
+            must not pick up a lagging replica's data.
         
     Returns:
         list: The result of the SQL query as a sequence of sequences, e.g. list(tuple).
     """
-    with _get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(sql, sql_params)
-        return cursor.fetchall()
+    with _get_connection(read_only=True, primary=primary) as conn:
+        with conn.cursor() as cursor:
+            started = time.perf_counter()
+            cursor.execute(sql, sql_params)
+            rows = cursor.fetchall()
+            record_query(sql, started, len(rows))
+            return rows
             
+def stream_query(sql: str, sql_params=(), batch_size: int = 500) -> Iterator[tuple]:
+    """
+    Execute a SQL query and lazily yield its rows, fetched from an unbuffered
+    (server-side) cursor in batches of batch_size. Memory use stays flat no matter
+    how many rows the query returns.
+
+    The query runs on its own pooled connection (a replica's when possible), which stays
+    checked out until the generator is exhausted or closed, so consume it promptly.
+    It does not see uncommitted writes of an active transaction().
+
+    Args:
+        sql (str): The SQL query string to execute.
+        sql_params (tuple): The SQL query parameters. Defaults as an empty tuple.
+        batch_size (int): Number of rows fetched per round trip. Defaults to 500.
+
+    Yields:
+        tuple: One result row at a time.
+    """
+    with _read_pool().connection() as conn:
+        with conn.cursor(buffered=False) as cursor:
+            started, count = time.perf_counter(), 0
+            cursor.execute(sql, sql_params)
+            while rows := cursor.fetchmany(batch_size):
+                count += len(rows)
+                yield from rows
+            record_query(sql, started, count)
+
 def insert_query(sql: str, sql_params=()) -> int:
     """
     Execute an INSERT SQL query and return the ID of the last inserted row.
@@ -77,10 +342,11 @@ def insert_query(sql: str, sql_params=()) -> int:
         int: The ID of the last inserted row.
     """
     with _get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(sql, sql_params)
-        conn.commit()
-        return cursor.lastrowid
+        with conn.cursor() as cursor:
+            started = time.perf_counter()
+            cursor.execute(sql, sql_params)
+            record_query(sql, started, cursor.rowcount)
+            return cursor.lastrowid
             
 def update_query(sql: str, sql_params=()) -> bool:
     """
@@ -94,7 +360,108 @@ def update_query(sql: str, sql_params=()) -> bool:
         bool: True if rows were affected, False otherwise.
     """
     with _get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(sql, sql_params)
-        conn.commit()
-        return cursor.rowcount > 0
\ No newline at end of file
+        with conn.cursor() as cursor:
+            started = time.perf_counter()
+            cursor.execute(sql, sql_params)
+            record_query(sql, started, cursor.rowcount)
+            return cursor.rowcount > 0
+
+_VALUES = re.compile(r"\bVALUES\s*\(", re.IGNORECASE)
+
+def _values_group(sql: str) -> tuple[int, int] | None:
+    """
+    Find the row group after VALUES, e.g. "(?, ?, NOW())" in "INSERT INTO t(a, b, c) VALUES (?, ?, NOW())".
+    Parentheses are matched pairwise, skipping the ones inside quoted literals and identifiers.
+
+    Returns:
+        tuple[int, int] | None: Start and end index of the group, parentheses included,
+        or None if the statement has no (balanced) VALUES group.
+    """
+    match = _VALUES.search(sql)
+    if not match: return None
+
+    start = match.end() - 1
+    depth, quote, i = 0, None, start
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            if char == "\\" and quote != "`": i += 1 # Escaped character, e.g. \'
+            elif char == quote: quote = None
+        elif char in "'\"`": quote = char
+        elif char == "(": depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0: return start, i + 1
+        i += 1
+
+    return None
+
+def insert_many_query(sql: str, sql_params_seq: Iterable[tuple], chunk_size: int = 500) -> list[int]:
+    """
+    Insert many rows with multi-row INSERT statements, chunk_size rows per round trip.
+    The row group after VALUES is repeated once per row, so pass the same statement you
+    would give to insert_query, e.g. "INSERT INTO t(a, b, c) VALUES (?, ?, NOW())".
+    Anything after the group (like ON DUPLICATE KEY UPDATE ...) is kept as is.
+    All chunks are written in one transaction.
+
+    Args:
+        sql (str): The single-row INSERT SQL query string.
+        sql_params_seq (Iterable[tuple]): One parameters tuple per row.
+        chunk_size (int): Max rows per statement. Defaults to 500.
+
+    Raises:
+        ValueError: If the statement has no VALUES group with balanced parentheses.
+
+    Returns:
+        list[int]: The generated IDs in row order. Empty for tables without an AUTO_INCREMENT
+        key; relies on consecutive IDs per statement (innodb_autoinc_lock_mode 0 or 1, or no
+        concurrent bulk inserts into the same table).
+    """
+    rows = [tuple(params) for params in sql_params_seq]
+    if not rows: return []
+
+    span = _values_group(sql)
+    if not span:
+        raise ValueError("insert_many_query expects an 'INSERT ... VALUES (?, ...)' statement.")
+    head, group, tail = sql[:span[0]], sql[span[0]:span[1]], sql[span[1]:]
+
+    generated_ids = []
+    with transaction(), _get_connection() as conn:
+        with conn.cursor() as cursor:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                chunk_sql = head + ", ".join([group] * len(chunk)) + tail
+                started = time.perf_counter()
+                cursor.execute(chunk_sql, tuple(v for row in chunk for v in row))
+                record_query(chunk_sql, started, cursor.rowcount)
+                if cursor.lastrowid:
+                    generated_ids.extend(range(cursor.lastrowid, cursor.lastrowid + len(chunk)))
+
+    return generated_ids
+
+def update_many_query(sql: str, sql_params_seq: Iterable[tuple], chunk_size: int = 500) -> int:
+    """
+    Execute an UPDATE (or DELETE) SQL query once per parameters tuple with executemany,
+    chunk_size tuples per round trip. All chunks are written in one transaction.
+
+    Args:
+        sql (str): The UPDATE SQL query string.
+        sql_params_seq (Iterable[tuple]): One parameters tuple per execution.
+        chunk_size (int): Max parameter tuples per round trip. Defaults to 500.
+
+    Returns:
+        int: The total number of affected rows.
+    """
+    rows = [tuple(params) for params in sql_params_seq]
+    if not rows: return 0
+
+    affected = 0
+    with transaction(), _get_connection() as conn:
+        with conn.cursor() as cursor:
+            for start in range(0, len(rows), chunk_size):
+                started = time.perf_counter()
+                cursor.executemany(sql, rows[start:start + chunk_size])
+                record_query(sql, started, cursor.rowcount)
+                affected += max(cursor.rowcount, 0)
+
+    return affected
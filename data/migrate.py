@@ -0,0 +1,130 @@
+from data.database import read_query, insert_query, update_query
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import re
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Migrations live in data/migrations as NNNN_description.sql #
+#       and are applied in version order, each exactly once.       #
+#       Write them idempotent (IF NOT EXISTS ...), DDL can't be    #
+#       rolled back in MariaDB. Run with: python manage.py migrate #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+    @property
+    def statements(self) -> list[str]:
+        return split_statements(self.sql)
+
+
+def split_statements(sql: str) -> list[str]:
+    """
+    Split a migration script into single statements on ';' line endings.
+    Full-line '--' comments and blank lines are dropped.
+
+    Args:
+        sql (str): The migration script.
+
+    Returns:
+        list[str]: The statements, without their trailing ';'.
+    """
+    statements, current = [], []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("--"): continue
+        current.append(line)
+        if stripped.endswith(";"):
+            statements.append("\n".join(current).strip().rstrip(";").strip())
+            current = []
+
+    if current: statements.append("\n".join(current).strip())
+    return statements
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """
+    Load every migration file of a directory, sorted by version.
+
+    Raises:
+        ValueError: If two files share a version number.
+    """
+    migrations = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _MIGRATION_FILE.match(path.name)
+        if not match: continue
+
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {path.name}")
+        migrations[version] = Migration(version, match.group(2), path.read_text(encoding="utf-8"))
+
+    return [migrations[v] for v in sorted(migrations)]
+
+def _ensure_version_table():
+    update_query("""
+        CREATE TABLE IF NOT EXISTS `schema_migrations` (
+          `version` INT(11) NOT NULL,
+          `name` VARCHAR(255) NOT NULL,
+          `checksum` CHAR(64) NOT NULL,
+          `applied_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP(),
+          PRIMARY KEY (`version`))
+        ENGINE = InnoDB""")
+
+def applied_versions() -> dict[int, str]:
+    """
+    Get the applied migration versions with their checksums.
+    """
+    _ensure_version_table()
+    return {version: checksum for version, checksum in read_query("SELECT version, checksum FROM schema_migrations", primary=True)}
+
+def pending_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """
+    Get the migrations that were not applied yet, in the order they will run.
+    """
+    applied = applied_versions()
+    return [m for m in load_migrations(directory) if m.version not in applied]
+
+def run_migrations(directory: Path = MIGRATIONS_DIR, log=print) -> list[Migration]:
+    """
+    Apply every pending migration in version order and record it in schema_migrations.
+    A failing migration stops the run; since migrations are idempotent it can simply
+    be fixed and run again.
+
+    Args:
+        directory (Path): Folder with the migration files. Defaults to data/migrations.
+        log (Callable[[str], None]): Progress output. Defaults to print.
+
+    Returns:
+        list[Migration]: The migrations that were applied.
+    """
+    applied = applied_versions()
+    done = []
+
+    for migration in load_migrations(directory):
+        if migration.version in applied:
+            if applied[migration.version] != migration.checksum:
+                log(f"WARNING: migration {migration.version:04d}_{migration.name} changed after it was applied.")
+            continue
+
+        log(f"Applying {migration.version:04d}_{migration.name} ...")
+        for statement in migration.statements:
+            update_query(statement)
+
+        insert_query(
+            "INSERT INTO schema_migrations(version, name, checksum) VALUES (?, ?, ?)",
+            (migration.version, migration.name, migration.checksum,))
+        done.append(migration)
+
+    log(f"{len(done)} migration(s) applied." if done else "Database schema is up to date.")
+    return done
@@ -0,0 +1,16 @@
+-- -----------------------------------------------------
+-- Composite indexes for the access patterns of the services.
+-- Each one also covers the ORDER BY of its query, so no filesort is needed.
+-- -----------------------------------------------------
+
+-- replies_service.get_by_topic: WHERE topic_id = ? ORDER BY created_at
+CREATE INDEX IF NOT EXISTS `idx_replies_topic_created` ON `replies` (`topic_id` ASC, `created_at` ASC);
+
+-- conversations_service.get_conversation: WHERE conversation_id = ? ORDER BY created_at
+CREATE INDEX IF NOT EXISTS `idx_messages_conversation_created` ON `messages` (`conversation_id` ASC, `created_at` ASC);
+
+-- categories_service.topics_by_category: WHERE category_id = ? ORDER BY created_at
+CREATE INDEX IF NOT EXISTS `idx_topics_category_created` ON `topics` (`category_id` ASC, `created_at` ASC);
+
+-- votes_service.count_votes_for_replies: JOIN votes ON reply_id, SUM(CASE type_vote ...)
+CREATE INDEX IF NOT EXISTS `idx_votes_reply_type` ON `votes` (`reply_id` ASC, `type_vote` ASC);
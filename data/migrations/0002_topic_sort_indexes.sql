@@ -0,0 +1,17 @@
+-- -----------------------------------------------------
+-- Indexes for the whitelisted topic sort keys (topics_service.TOPIC_SORT_KEYS).
+-- Every sort is paired with id as tiebreaker; InnoDB appends the primary key to
+-- secondary indexes, so (col) already orders as (col, id) and serves both
+-- ORDER BY col, id and the keyset condition of topics_service.page().
+-- Sorting by id uses the primary key, and category + created_at is covered by
+-- idx_topics_category_created from 0001.
+-- -----------------------------------------------------
+
+-- topics_service.all / page: ORDER BY created_at, id
+CREATE INDEX IF NOT EXISTS `idx_topics_created` ON `topics` (`created_at` ASC);
+
+-- topics_service.all / page: ORDER BY title, id
+CREATE INDEX IF NOT EXISTS `idx_topics_title` ON `topics` (`title` ASC);
+
+-- categories_service.topics_by_category / page(category_id): WHERE category_id = ? ORDER BY title, id
+CREATE INDEX IF NOT EXISTS `idx_topics_category_title` ON `topics` (`category_id` ASC, `title` ASC);
@@ -0,0 +1,18 @@
+-- -----------------------------------------------------
+-- Vote counters on replies, so a topic page reads its replies' votes with the
+-- replies instead of aggregating the votes table on every view.
+-- votes_service keeps them up to date in the same transaction as the vote;
+-- python manage.py reconcile-votes recomputes them from the votes table.
+-- -----------------------------------------------------
+
+ALTER TABLE `replies`
+  ADD COLUMN IF NOT EXISTS `up_count` INT(11) NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS `down_count` INT(11) NOT NULL DEFAULT 0;
+
+-- Backfill from the existing votes
+UPDATE `replies` r
+  LEFT JOIN (
+    SELECT reply_id, SUM(type_vote = 'up') AS up_count, SUM(type_vote = 'down') AS down_count
+    FROM `votes`
+    GROUP BY reply_id) v ON v.reply_id = r.id
+  SET r.up_count = COALESCE(v.up_count, 0), r.down_count = COALESCE(v.down_count, 0);
@@ -0,0 +1,8 @@
+-- -----------------------------------------------------
+-- idx_votes_reply_type (0001) served the per-view vote aggregation that 0003
+-- replaced with the replies' up_count / down_count counters. Nothing reads
+-- votes by (reply_id, type_vote) anymore, so the index only slows down votes.
+-- fk_votes_replies1_idx still covers the foreign key and reconcile-votes.
+-- -----------------------------------------------------
+
+DROP INDEX IF EXISTS `idx_votes_reply_type` ON `votes`;
@@ -2,6 +2,30 @@ from pydantic import BaseModel, StringConstraints, field_validator
 from datetime import datetime
 from typing import Annotated, Literal, Optional
 
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: from_query_result() is the trusted path for database rows #
+#       and builds models without validation: the driver already  #
+#       returns typed columns. Only pass it values that come from #
+#       the database or from models that were validated already.  #
+#       Anything from a client goes through the constructor.      #
+#       Benchmark: python -m benchmarks.models_benchmark          #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+_set_attribute = object.__setattr__
+
+def _trusted(cls, **values):
+    """
+    Build a model from values of the right types, every field given, without validating them.
+    Sets the same instance attributes as BaseModel.model_construct(), which is slower than
+    validating because it resolves defaults and aliases in Python.
+    """
+    model = cls.__new__(cls)
+    _set_attribute(model, "__dict__", values)
+    _set_attribute(model, "__pydantic_fields_set__", set(values))
+    _set_attribute(model, "__pydantic_extra__", None)
+    _set_attribute(model, "__pydantic_private__", None)
+    return model
+
 class Username(BaseModel):
     name: str
 
@@ -25,7 +49,7 @@ class User(BaseModel):
     
     @classmethod
     def from_query_result(cls, id, username, password, is_admin, avatar_url, created_at):
-        return cls(
+        return _trusted(cls,
             id=id,
             username=username,
             password=password,
@@ -43,7 +67,7 @@ class Category(BaseModel):
 
     @classmethod
     def from_query_result(cls, id: int, name: str, is_private: int, is_locked: int, image_url: str | None = None):
-        return cls(
+        return _trusted(cls,
             id=id,
             name=name,
             is_private=is_private,
@@ -60,10 +84,12 @@ class Topic(BaseModel):
     is_locked: int
     best_reply_id: Optional[int] = None
     created_at: Optional[datetime] = None
+    username: Optional[str] = None
+    avatar_url: Optional[str] = None
 
     @classmethod
-    def from_query_result(cls, id, title, content, category_id, user_id, is_locked, best_reply_id, created_at) -> "Topic":
-        return cls(
+    def from_query_result(cls, id, title, content, category_id, user_id, is_locked, best_reply_id, created_at, username=None, avatar_url=None) -> "Topic":
+        return _trusted(cls,
             id=id,
             title=title,
             content=content,
@@ -71,7 +97,9 @@ class Topic(BaseModel):
             user_id=user_id,
             is_locked=is_locked,
             best_reply_id=best_reply_id,
-            created_at=created_at
+            created_at=created_at,
+            username=username,
+            avatar_url=avatar_url
         )
 
 class TopicCreate(BaseModel):
@@ -90,17 +118,22 @@ class Reply(BaseModel):
     created_at: datetime
     username: Optional[str] = None
     avatar_url: Optional[str] = None
+    up_count: int = 0
+    down_count: int = 0
 
     @classmethod
-    def from_query_result(cls, id: int, text: str, topic_id: int, user_id: int, created_at: datetime, username: Optional[str] = None, avatar_url: Optional[str] = None) -> "Reply":
-        return cls(
+    def from_query_result(cls, id: int, text: str, topic_id: int, user_id: int, created_at: datetime, username: Optional[str] = None, avatar_url: Optional[str] = None,
+                          up_count: int = 0, down_count: int = 0) -> "Reply":
+        return _trusted(cls,
             id=id,
             text=text,
             topic_id=topic_id,
             user_id=user_id,
             created_at=created_at,
             username=username,
-            avatar_url=avatar_url
+            avatar_url=avatar_url,
+            up_count=up_count,
+            down_count=down_count
         )
         
 class MessageCreate(BaseModel):
@@ -112,16 +145,28 @@ class Message(BaseModel):
     conversation_id: int
     sender_id: int
     created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_query_result(cls, id, text, conversation_id, sender_id, created_at):
+        return _trusted(cls,
+            id=id,
+            text=text,
+            conversation_id=conversation_id,
+            sender_id=sender_id,
+            created_at=created_at
+        )
     
 class MessageResponse(BaseModel):
+    id: int
     text: str
     username: str
     avatar_url: str | None
     created_at: datetime
     
     @classmethod
-    def from_query_result(cls, text, username, avatar_url, created_at):
-        return cls(
+    def from_query_result(cls, id, text, username, avatar_url, created_at):
+        return _trusted(cls,
+            id=id,
             text=text,
             username=username,
             avatar_url=avatar_url,
@@ -138,7 +183,7 @@ class Conversation(BaseModel):
 
     @classmethod
     def from_query_result(cls, id, name):
-        return cls(
+        return _trusted(cls,
             id=id,
             name=name
         )
@@ -150,7 +195,7 @@ class CreateConversationResponse(BaseModel):
     
     @classmethod
     def from_query_result(cls, id, name, user_ids):
-        return cls(
+        return _trusted(cls,
             id=id,
             name=name,
             user_ids=user_ids
@@ -160,13 +205,15 @@ class ConversationResponse(BaseModel):
     id: int
     name: str
     messages: list[MessageResponse]
+    older_cursor: int | None = None # Pass as 'before' to get the previous page of messages
     
     @classmethod
-    def from_query_result(cls, id, name, messages):
-        return cls(
+    def from_query_result(cls, id, name, messages, older_cursor=None):
+        return _trusted(cls,
             id=id,
             name=name,
-            messages=messages
+            messages=messages,
+            older_cursor=older_cursor
         )   
 
 class ParticipantsResponse(BaseModel):
@@ -175,7 +222,7 @@ class ParticipantsResponse(BaseModel):
 
     @classmethod
     def from_query_result(cls, id, name):
-        return cls(
+        return _trusted(cls,
             id=id,
             name=name
         )
@@ -183,13 +230,21 @@ class AllConversationsResponse(BaseModel):
     id: int
     name: str
     participants: list[ParticipantsResponse]
+    message_count: int = 0
+    last_message: str | None = None
+    last_message_by: str | None = None
+    last_message_at: datetime | None = None
     
     @classmethod
-    def from_query_result(cls, id, name, participants):
-        return cls(
+    def from_query_result(cls, id, name, participants, message_count=0, last_message=None, last_message_by=None, last_message_at=None):
+        return _trusted(cls,
             id=id,
             name=name,
-            participants=participants
+            participants=participants,
+            message_count=message_count,
+            last_message=last_message,
+            last_message_by=last_message_by,
+            last_message_at=last_message_at
         )
 
 class VoteCreate(BaseModel):
@@ -203,7 +258,7 @@ class Vote(BaseModel):
 
     @classmethod
     def from_query_result(cls, id: int, reply_id: int, user_id: int, type_vote: str) -> "Vote":
-        return cls(
+        return _trusted(cls,
             id=id,
             reply_id=reply_id,
             user_id=user_id,
@@ -0,0 +1,236 @@
+from contextlib import contextmanager
+from mariadb.connections import Connection
+from dataclasses import dataclass
+import threading
+import time
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out of the pool in time."""
+
+
+@dataclass
+class PoolStats:
+    """Snapshot of the pool state, as returned by ConnectionPool.stats()."""
+    min_size: int
+    max_size: int
+    in_use: int
+    idle: int
+    total_checkouts: int
+    total_created: int
+    total_discarded: int
+    total_timeouts: int
+    total_wait_ms: float
+    max_wait_ms: float
+
+    @property
+    def avg_wait_ms(self) -> float:
+        return self.total_wait_ms / self.total_checkouts if self.total_checkouts else 0.0
+
+
+class _PooledConnection:
+    """Internal bookkeeping wrapper around a raw driver connection."""
+    __slots__ = ("conn", "created_at", "last_used_at")
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections.
+
+    Connections are created lazily up to max_size, the pool is pre-filled with min_size
+    connections on first use, and every checkout is validated before it is handed out:
+      - connections older than recycle_seconds are closed and replaced,
+      - connections idle for longer than ping_after_idle_seconds are pinged first.
+
+    Args:
+        connect_fn (Callable[[], Connection]): Factory that opens a new raw connection.
+        min_size (int): Number of connections kept open when idle.
+        max_size (int): Hard limit of simultaneously open connections.
+        recycle_seconds (float): Max lifetime of a connection. 0 disables recycling.
+        timeout_seconds (float): Max time a checkout waits for a free connection.
+        ping_after_idle_seconds (float): Idle time after which a connection is pinged on checkout.
+    """
+
+    def __init__(self, connect_fn, *, min_size: int = 1, max_size: int = 10,
+                 recycle_seconds: float = 1800, timeout_seconds: float = 10,
+                 ping_after_idle_seconds: float = 1):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self._connect_fn = connect_fn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.recycle_seconds = recycle_seconds
+        self.timeout_seconds = timeout_seconds
+        self.ping_after_idle_seconds = ping_after_idle_seconds
+
+        self._idle: list[_PooledConnection] = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._filled = False
+        self._closed = False
+
+        self._total_checkouts = 0
+        self._total_created = 0
+        self._total_discarded = 0
+        self._total_timeouts = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+
+    # -------------------------------------------------------------------------
+    # Checkout / release
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of a with-block.
+
+        The connection is returned to the pool on exit. If the block raised, any open
+        transaction is rolled back first and broken or interrupted connections are discarded.
+        """
+        pooled = self.acquire()
+        discard = False
+        try:
+            yield pooled.conn
+        except Exception:
+            # Roll back whatever the failed block left open; a connection that can't
+            # even do that is broken and must not go back to the pool
+            try: pooled.conn.rollback()
+            except Exception: discard = True
+            raise
+        except BaseException:
+            # Interrupted mid-use (e.g. a streaming generator closed early), state unknown
+            discard = True
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def acquire(self) -> _PooledConnection:
+        """
+        Check out a validated connection, waiting up to timeout_seconds for a free slot.
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time.
+        """
+        if not self._filled: self._fill()
+
+        started = time.monotonic()
+        deadline = started + self.timeout_seconds
+
+        pooled = None
+        with self._cond:
+            if self._closed: raise RuntimeError("Connection pool is closed.")
+
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    if self._idle or self._in_use < self.max_size: break
+                    self._total_timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout_seconds}s waiting for a database connection "
+                        f"({self._in_use}/{self.max_size} in use).")
+
+            # Reserve a slot before doing any I/O outside the lock
+            self._in_use += 1
+            if self._idle: pooled = self._idle.pop()
+
+        try:
+            if pooled is None:
+                pooled = self._create()
+            elif not self._validate(pooled):
+                self._close_quietly(pooled)
+                with self._cond: self._total_discarded += 1
+                pooled = self._create()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited_ms = (time.monotonic() - started) * 1000
+        with self._cond:
+            self._total_checkouts += 1
+            self._total_wait_ms += waited_ms
+            self._max_wait_ms = max(self._max_wait_ms, waited_ms)
+        return pooled
+
+    def release(self, pooled: _PooledConnection, discard: bool = False):
+        """Return a checked out connection to the pool, or close it if discard is True."""
+        pooled.last_used_at = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed or len(self._idle) >= self.max_size:
+                self._total_discarded += 1
+            else:
+                self._idle.append(pooled)
+                pooled = None
+            self._cond.notify()
+
+        if pooled is not None: self._close_quietly(pooled)
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> PoolStats:
+        """Return a consistent snapshot of the pool counters."""
+        with self._cond:
+            return PoolStats(
+                min_size=self.min_size,
+                max_size=self.max_size,
+                in_use=self._in_use,
+                idle=len(self._idle),
+                total_checkouts=self._total_checkouts,
+                total_created=self._total_created,
+                total_discarded=self._total_discarded,
+                total_timeouts=self._total_timeouts,
+                total_wait_ms=self._total_wait_ms,
+                max_wait_ms=self._max_wait_ms,
+            )
+
+    def close(self):
+        """Close every idle connection. Connections in use are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle: self._close_quietly(pooled)
+
+    def _fill(self):
+        """Open min_size connections up front so the first requests skip the handshake."""
+        with self._cond:
+            if self._filled: return
+            self._filled = True
+            missing = self.min_size - len(self._idle) - self._in_use
+
+        for _ in range(max(missing, 0)):
+            try: pooled = self._create()
+            except Exception: break # The database may be down at startup; checkouts will retry
+            with self._cond: self._idle.append(pooled)
+
+    def _create(self) -> _PooledConnection:
+        pooled = _PooledConnection(self._connect_fn())
+        with self._cond: self._total_created += 1
+        return pooled
+
+    def _validate(self, pooled: _PooledConnection) -> bool:
+        """Check that an idle connection is still usable (recycle age and pre-ping)."""
+        now = time.monotonic()
+        if self.recycle_seconds and now - pooled.created_at > self.recycle_seconds:
+            return False
+
+        if now - pooled.last_used_at > self.ping_after_idle_seconds:
+            try: pooled.conn.ping()
+            except Exception: return False
+
+        return True
+
+    @staticmethod
+    def _close_quietly(pooled: _PooledConnection):
+        try: pooled.conn.close()
+        except Exception: pass
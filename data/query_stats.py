@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from collections import Counter
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"VALUES\s*\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a SQL statement to its shape, so the same query with different
+    parameters or IN-list lengths is counted as one statement.
+
+    Example:
+        "SELECT * FROM users WHERE id IN (?, ?, ?) AND x = 5" -> "SELECT * FROM users WHERE id IN (...) AND x = ?"
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = _VALUES_LIST.sub("VALUES (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class QueryRecord:
+    """One executed statement."""
+    sql: str
+    duration_ms: float
+    rows: int
+
+
+@dataclass
+class QueryLog:
+    """
+    Every statement executed during one request, with helpers to summarize them.
+    """
+    records: list[QueryRecord] = field(default_factory=list)
+
+    def add(self, sql: str, duration_ms: float, rows: int):
+        self.records.append(QueryRecord(normalize_sql(sql), duration_ms, rows))
+
+    @property
+    def count(self) -> int:
+        return len(self.records)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(r.duration_ms for r in self.records)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Get the statements that ran more than threshold times, most frequent first.
+        These are the likely N+1 query patterns.
+        """
+        counts = Counter(r.sql for r in self.records)
+        return [(sql, n) for sql, n in counts.most_common() if n > threshold]
+
+    def summary(self) -> str:
+        """One line summary, e.g. '7 queries in 12.3 ms (5 distinct)'."""
+        distinct = len({r.sql for r in self.records})
+        return f"{self.count} queries in {self.total_ms:.1f} ms ({distinct} distinct)"
+
+
+def log_slow_query(sql: str, duration_ms: float, rows: int, threshold_ms: float):
+    """Log a statement that took longer than threshold_ms."""
+    if duration_ms >= threshold_ms:
+        logger.warning("Slow query (%.1f ms, %d rows): %s", duration_ms, rows, normalize_sql(sql))
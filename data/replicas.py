@@ -0,0 +1,95 @@
+from data.pool import ConnectionPool
+import threading
+import itertools
+import time
+
+class Replica:
+    """
+    A read replica with its own connection pool and last known replication lag.
+
+    Args:
+        name (str): Display name of the replica, e.g. 'host:port'.
+        pool (ConnectionPool): Connection pool for the replica.
+    """
+    def __init__(self, name: str, pool: ConnectionPool):
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.lag_seconds: float | None = None
+        self.checked_at = 0.0
+        self._check_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Replica({self.name!r}, healthy={self.healthy}, lag_seconds={self.lag_seconds})"
+
+
+def _read_lag_seconds(replica: Replica) -> float | None:
+    """
+    Read Seconds_Behind_Master from the replica's SHOW SLAVE STATUS output.
+
+    Returns:
+        float: The replication lag, 0 if the server isn't replicating from anywhere.
+        None: If replication is configured but broken (SQL or IO thread stopped).
+    """
+    with replica.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW SLAVE STATUS")
+            row = cursor.fetchone()
+            if row is None: return 0.0
+            columns = [column[0] for column in cursor.description]
+            lag = row[columns.index("Seconds_Behind_Master")]
+            return None if lag is None else float(lag)
+
+
+class ReplicaSet:
+    """
+    Round-robin load balancer over read replicas that drops lagging replicas out.
+
+    Replication lag is re-checked lazily, at most every check_interval_seconds per replica,
+    by whichever thread picks the replica first. A replica is used only while its lag is
+    known and at most max_lag_seconds.
+
+    Args:
+        replicas (list[Replica]): The replicas to balance between.
+        max_lag_seconds (float): Highest replication lag that still counts as healthy.
+        check_interval_seconds (float): Minimum time between two lag checks of a replica.
+    """
+    def __init__(self, replicas: list[Replica], *, max_lag_seconds: float = 5, check_interval_seconds: float = 5):
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._round_robin = itertools.cycle(range(len(replicas))) if replicas else None
+        self._rr_lock = threading.Lock()
+
+    def choose(self) -> Replica | None:
+        """
+        Get the next healthy replica, or None if all of them are lagging or down.
+        """
+        if not self.replicas: return None
+
+        with self._rr_lock: start = next(self._round_robin)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            self._maybe_check(replica)
+            if replica.healthy: return replica
+
+        return None
+
+    def _maybe_check(self, replica: Replica):
+        """Refresh a replica's lag if the last check is stale and nobody else is refreshing it."""
+        if time.monotonic() - replica.checked_at < self.check_interval_seconds: return
+        if not replica._check_lock.acquire(blocking=False): return
+
+        try:
+            try: lag = _read_lag_seconds(replica)
+            except Exception: lag = None
+
+            replica.lag_seconds = lag
+            replica.healthy = lag is not None and lag <= self.max_lag_seconds
+            replica.checked_at = time.monotonic()
+        finally:
+            replica._check_lock.release()
+
+    def close(self):
+        """Close the idle connections of every replica pool."""
+        for replica in self.replicas: replica.pool.close()
@@ -1,11 +1,16 @@
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exception_handlers import RequestValidationError
 from common.template_config import CustomJinja2Templates
+from common.middleware import database_middleware
+from common.compression import CompressionMiddleware
+from common.assets import AssetStaticFiles, build_manifest
 from fastapi.exceptions import RequestValidationError
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
 from fastapi import Request, FastAPI
 from starlette.status import *
+from data import database, async_database
+from services import votes_service
 import uvicorn
 
 # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ API ROUTER IMPORTS ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
@@ -13,6 +18,8 @@ from routers.api.users_router import api_users_router
 from routers.api.conversations_router import api_conversations_router
 from routers.api.topics_router import api_topics_router
 from routers.api.categories_router import api_categories_router
+from routers.api.search_router import api_search_router
+from routers.api.exports_router import api_exports_router
 
 # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ WEB ROUTER IMPORTS ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
 from routers.web.home_router import home_router
@@ -23,9 +30,20 @@ from routers.web.categories_router import category_router
 
 
 # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ APP AND TEMPLATES ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    build_manifest()
+    votes_service.start_vote_buffer()
+    yield
+    votes_service.stop_vote_buffer() # Write the buffered votes before the pools close
+    database.close_pool()
+    await async_database.close_pool()
+
+app = FastAPI(lifespan=lifespan)
+app.middleware("http")(database_middleware)
+app.add_middleware(CompressionMiddleware) # Outermost, so it compresses what the other middleware return
 templates = CustomJinja2Templates(directory="templates")
-app.mount('/static', StaticFiles(directory='static'), name='static')
+app.mount('/static', AssetStaticFiles(directory='static'), name='static')
 
 
 # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ EXCEPTION HANDLING ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
@@ -94,6 +112,8 @@ app.include_router(api_users_router, tags=["API - Users"])
 app.include_router(api_conversations_router, tags=["API - Conversations"])
 app.include_router(api_topics_router, tags=["API - Topics"])
 app.include_router(api_categories_router, tags=["API - Categories"])
+app.include_router(api_search_router, tags=["API - Search"])
+app.include_router(api_exports_router, tags=["API - Exports"])
 
 
 # ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ WEB ROUTERS ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ 
@@ -0,0 +1,52 @@
+import argparse
+
+# ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ COMMANDS ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
+def migrate(args: argparse.Namespace):
+    """Apply pending schema migrations from data/migrations."""
+    from data import migrate as migrations
+
+    if args.list:
+        pending = migrations.pending_migrations()
+        for m in pending: print(f"pending: {m.version:04d}_{m.name}")
+        if not pending: print("Database schema is up to date.")
+        return
+
+    migrations.run_migrations()
+
+def reconcile_votes(args: argparse.Namespace):
+    """Recompute the replies' vote counters from the votes table."""
+    from services import votes_service
+
+    fixed = votes_service.reconcile_vote_counts()
+    print("Vote counters fixed." if fixed else "Vote counters are up to date.")
+
+def compress_static(args: argparse.Namespace):
+    """Write precompressed .gz (and .br, with brotli installed) variants of the static files."""
+    from common import compression
+
+    written = compression.precompress_directory(args.directory)
+    if compression.brotli is None: print("brotli isn't installed: only .gz variants were written.")
+    print(f"{written} compressed variant(s) written." if written else "Compressed variants are up to date.")
+
+
+# ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ CLI ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~ ~
+def main():
+    parser = argparse.ArgumentParser(description="Forum System management commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help=migrate.__doc__)
+    migrate_parser.add_argument("--list", action="store_true", help="Only list pending migrations.")
+    migrate_parser.set_defaults(func=migrate)
+
+    reconcile_parser = commands.add_parser("reconcile-votes", help=reconcile_votes.__doc__)
+    reconcile_parser.set_defaults(func=reconcile_votes)
+
+    compress_parser = commands.add_parser("compress-static", help=compress_static.__doc__)
+    compress_parser.add_argument("--directory", default="static", help="Static files directory.")
+    compress_parser.set_defaults(func=compress_static)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
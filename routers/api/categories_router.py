@@ -1,11 +1,12 @@
 import traceback
-from fastapi import APIRouter, Header
+from fastapi import APIRouter, Header, Query, Response
 from pydantic import BaseModel
 from common import responses
 from common.authenticate import get_user_or_raise_401
-from common.responses import NotFound, Unauthorized, BadRequest
+from common.responses import NotFound, Unauthorized, BadRequest, FastJSONResponse
 from data.models import Category, Topic, CategoryPrivacyUpdate
 from services import topics_service, categories_service
+from common.routing import FastJSONRoute
 
 
 class CategoryTopicResponseModel(BaseModel):
@@ -33,7 +34,7 @@ class CategoryLockRequest(BaseModel):
     """
     is_locked: bool
 
-api_categories_router = APIRouter(prefix="/api/categories")
+api_categories_router = APIRouter(prefix="/api/categories", route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 
 @api_categories_router.get('/')
@@ -49,38 +50,41 @@ def get_categories():
 @api_categories_router.get("/{id}/topics")
 def get_category_by_id(
         id: int,
+        response: Response,
         search: str | None = None,
-        sort: str | None = None,
-        sort_by: str | None = None,
-        page: int = 1,
-        size: int = 5):
+        sort: str = "desc",
+        sort_by: str = "created_at",
+        cursor: str | None = None,
+        size: int = Query(5, ge=1, le=100)):
     """
-    Get a single category by ID with its related topics.
+    Get a single category by ID with a page of its topics, using cursor pagination.
+
+    The cursors of the neighbour pages are returned in the X-Next-Cursor and X-Prev-Cursor
+    headers (missing at either end).
 
     Args:
         id (int): The ID of the category.
         search (Optional[str]): Optional keyword for filtering topics.
-        sort (Optional[str]): Sort direction ('asc' or 'desc').
-        sort_by (Optional[str]): Attribute to sort by (e.g. 'title').
-        page (int): Page number for pagination.
-        size (int): Number of topics per page.
+        sort (str): Sort direction ('asc' or 'desc'). Defaults to 'desc'.
+        sort_by (str): Attribute to sort by: 'created_at', 'id' or 'title'. Defaults to 'created_at'.
+        cursor (Optional[str]): Cursor of the page to get, from a previous response.
+        size (int): Number of topics per page, 1 to 100. Defaults to 5.
 
     Returns:
-        CategoryTopicResponseModel | list[Topic] | NotFound: Category with topics or an error response.
+        CategoryTopicResponseModel | NotFound | BadRequest: Category with topics or an error response.
     """
 
     category = categories_service.get_by_id(id)
     if not category:
         return NotFound(f"Category with ID '{id}' not found.")
 
-    offset = (page - 1) * size
-    result = categories_service.topics_by_category(category_id=id, search=search, limit=size, offset=offset)
-    topics = list(result)
-
-    if sort in ("asc", "desc"):
-        return topics_service.sort(topics, reverse=sort == 'desc', attribute=sort_by)
+    try:
+        page = topics_service.page(search, category_id=id, sort_by=sort_by, order=sort, cursor=cursor, size=size)
+    except ValueError as e:
+        return BadRequest(str(e))
 
-    return CategoryTopicResponseModel(category=category, topics=topics)
+    responses.set_cursor_headers(response, page.next_cursor, page.prev_cursor)
+    return CategoryTopicResponseModel(category=category, topics=page.topics)
 
 @api_categories_router.post("/")
 def create_category(category_data: CategoryCreate, u_token: str = Header()):
@@ -134,7 +138,7 @@ def update_category_privacy(id: int, category_data: CategoryPrivacyUpdate, u_tok
     updated = categories_service.set_privacy(id, category_data.is_private)
     if not updated:
         return BadRequest("Could not update privacy. Try again?")
-    return categories_service.get_by_id(id)
+    return category.model_copy(update={"is_private": int(category_data.is_private)})
 
 @api_categories_router.patch("/{id}/lock", response_model=Category)
 def set_category_lock(id: int, data: CategoryLockRequest, u_token: str = Header()):
@@ -160,4 +164,4 @@ def set_category_lock(id: int, data: CategoryLockRequest, u_token: str = Header(
     if not categories_service.set_locked(id, data.is_locked):
         return BadRequest("Could not update lock status.")
 
-    return categories_service.get_by_id(id)
+    return category.model_copy(update={"is_locked": int(data.is_locked)})
@@ -1,8 +1,10 @@
 import services.conversations_service as conversation_service
-from fastapi import APIRouter, Header, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
 import services.users_service as user_service
 from common import responses, authenticate
 from data.models import *
+from common.responses import FastJSONResponse
+from common.routing import FastJSONRoute
 
 def _generic_validator(u_token: str, conversation_id: int):
     """Helper function for validating that the user from given token belongs to the conversation from the given id."""
@@ -22,18 +24,24 @@ def _generic_validator(u_token: str, conversation_id: int):
 
 # ------------------------ CONVERSATIONS ROUTER BEGIN -------------------------
 
-api_conversations_router = APIRouter(prefix='/api/conversations')
+api_conversations_router = APIRouter(prefix='/api/conversations', route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 # -----------------------------------------------------------------------------
 # CONVERSATIONS - GET REQUESTS
 # -----------------------------------------------------------------------------
 
 @api_conversations_router.get('/')
-def get_all_conversations(contains_user: str | None = None, u_token: str = Header()):
+def get_all_conversations(
+        contains_user: str | None = None,
+        page: int = Query(1, ge=1),
+        size: int = Query(20, ge=1, le=100),
+        u_token: str = Header()):
     """
-    Retrieve a list of conversations with optional filtering.
+    Retrieve a paginated list of conversations, most recently active first, with optional filtering.
     Args:
         contains_user (str | None): Query parameter for filtering conversations that contain the user (via username).
+        page (int): Pagination page number (1-based).
+        size (int): Number of conversations per page, 1 to 100.
     Returns:
         list[AllConversationsResponse]: The newly created AllConversationsResponse model, or NotFound.
     """
@@ -51,17 +59,24 @@ def get_all_conversations(contains_user: str | None = None, u_token: str = Heade
         if not user: return responses.NotFound(f"No conversations of user '{auth_user.username}' found.")
         user_ids.add(user.id)
     
-    conversations = conversation_service.get_all_conversations(user_ids)
+    offset = (page - 1) * size
+    conversations = conversation_service.get_all_conversations(user_ids, limit=size, offset=offset)
     if not conversations: return responses.NotFound(f"No conversations of user '{auth_user.username}' found.")
     
     return conversations
 
 @api_conversations_router.get('/{conversation_id}')
-def get_conversation(conversation_id: int, u_token: str = Header()):
+def get_conversation(
+        conversation_id: int,
+        before: int | None = Query(None, ge=1),
+        size: int = Query(conversation_service.MESSAGES_PAGE_SIZE, ge=1, le=conversation_service.MAX_MESSAGES_PAGE_SIZE),
+        u_token: str = Header()):
     """
-    Retrieve a detailed conversation with a given id.
+    Retrieve a detailed conversation with a given id and one page of its newest messages.
     Args:
         conversation_id (int): ID of the conversation.
+        before (int | None): Cursor from older_cursor of a previous response, to get older messages.
+        size (int): Number of messages per page, 1 to MAX_MESSAGES_PAGE_SIZE.
         u_token (str): User authentication token from header.
     Returns:
         ConversationResponse: The newly created ConversationResponse model, or NotFound.
@@ -70,7 +85,7 @@ def get_conversation(conversation_id: int, u_token: str = Header()):
     _generic_validator(u_token, conversation_id)
     
     # Try to view conversation
-    conversation = conversation_service.get_conversation(conversation_id)
+    conversation = conversation_service.get_conversation(conversation_id, before=before, limit=size)
     if not conversation: return responses.NotFound(f"Conversation with id {conversation_id} not found.")
 
     return conversation
@@ -103,10 +118,11 @@ def create_conversation(conv_data: CreateConversation, u_token = Header(), creat
     user_ids.add(auth_user.id)
     
     # Verify that all users exist
+    found_users = user_service.find_users_by_ids(user_ids)
     for id in user_ids:
-        if not user_service.find_user_by_id(id): return responses.NotFound(f"User with id {id} not found.")
+        if id not in found_users: return responses.NotFound(f"User with id {id} not found.")
         
-    conversation = conversation_service.create_conversation(conv_data.name, user_ids)
+    conversation = conversation_service.create_conversation(CreateConversation(name=conv_data.name, user_ids=list(user_ids)))
     if not conversation: return responses.BadRequest("Error creating conversation.")
     return conversation
 
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from collections.abc import Iterator
+from common.authenticate import get_user_or_raise_401
+from common.responses import NotFound, Unauthorized, FastJSONResponse
+from services import export_service, categories_service
+from services.users_service import find_user_by_id
+from utils.streaming import ndjson, gzipped
+from common.routing import FastJSONRoute
+
+api_exports_router = APIRouter(prefix="/api/exports", route_class=FastJSONRoute, default_response_class=FastJSONResponse)
+
+
+def _export(items: Iterator, filename: str, gzip: bool) -> StreamingResponse:
+    """
+    Stream items as an NDJSON download. The body is produced by a sync generator,
+    which Starlette iterates in its threadpool, so the event loop is never blocked.
+    """
+    chunks = ndjson(items)
+    if gzip:
+        return StreamingResponse(gzipped(chunks), media_type="application/gzip",
+                                 headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson.gz"'})
+
+    return StreamingResponse(chunks, media_type="application/x-ndjson",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'})
+
+
+@api_exports_router.get("/categories/{id}/topics")
+def export_category_topics(id: int, gzip: bool = False, u_token: str = Header()):
+    """
+    Export every topic of a category as newline-delimited JSON. Admin only.
+
+    Args:
+        id (int): The ID of the category.
+        gzip (bool): Gzip the export.
+        u_token (str): Authentication token.
+
+    Returns:
+        StreamingResponse | NotFound | Unauthorized: The export or an error response.
+    """
+    user = get_user_or_raise_401(u_token)
+    if not user.is_admin:
+        return Unauthorized("Admin access required.")
+
+    if not categories_service.exists(id):
+        return NotFound(f"Category with ID '{id}' not found.")
+
+    return _export(export_service.category_topics(id), f"category-{id}-topics", gzip)
+
+@api_exports_router.get("/categories/{id}/replies")
+def export_category_replies(id: int, gzip: bool = False, u_token: str = Header()):
+    """
+    Export every reply to the topics of a category as newline-delimited JSON. Admin only.
+
+    Args:
+        id (int): The ID of the category.
+        gzip (bool): Gzip the export.
+        u_token (str): Authentication token.
+
+    Returns:
+        StreamingResponse | NotFound | Unauthorized: The export or an error response.
+    """
+    user = get_user_or_raise_401(u_token)
+    if not user.is_admin:
+        return Unauthorized("Admin access required.")
+
+    if not categories_service.exists(id):
+        return NotFound(f"Category with ID '{id}' not found.")
+
+    return _export(export_service.category_replies(id), f"category-{id}-replies", gzip)
+
+@api_exports_router.get("/users/{id}/messages")
+def export_user_messages(id: int, gzip: bool = False, u_token: str = Header()):
+    """
+    Export every message of the conversations a user takes part in as newline-delimited JSON. Admin only.
+
+    Args:
+        id (int): The ID of the user.
+        gzip (bool): Gzip the export.
+        u_token (str): Authentication token.
+
+    Returns:
+        StreamingResponse | NotFound | Unauthorized: The export or an error response.
+    """
+    user = get_user_or_raise_401(u_token)
+    if not user.is_admin:
+        return Unauthorized("Admin access required.")
+
+    if find_user_by_id(id) is None:
+        return NotFound(f"User with ID '{id}' not found.")
+
+    return _export(export_service.user_messages(id), f"user-{id}-messages", gzip)
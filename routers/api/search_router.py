@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Header, Response
+from common import responses
+from common.responses import BadRequest, FastJSONResponse
+from services.users_service import find_user_by_token
+from services import search_service, categories_service
+from utils.pagination import InvalidCursorError, encode_cursor, decode_cursor
+from common.routing import FastJSONRoute
+
+api_search_router = APIRouter(prefix="/api/search", route_class=FastJSONRoute, default_response_class=FastJSONResponse)
+
+
+@api_search_router.get("/")
+def search(
+        q: str,
+        response: Response,
+        category_id: int | None = None,
+        cursor: str | None = None,
+        size: int = 10,
+        u_token: str | None = Header(None)):
+    """
+    Full text search over topic titles, topic content and replies, best match first.
+    Only categories the user may read are searched; anonymous requests see public ones.
+
+    The cursor of the next page is returned in the X-Next-Cursor header (missing on the last page).
+
+    Args:
+        q (str): Search query.
+        category_id (Optional[int]): Only search this category.
+        cursor (Optional[str]): Cursor of the page to get, from a previous response.
+        size (int): Number of hits per page.
+        u_token (Optional[str]): Authentication token.
+
+    Returns:
+        list[SearchHit] | BadRequest: A page of hits or an error response.
+    """
+    if not 1 <= size <= 100:
+        return BadRequest("Page size must be between 1 and 100.")
+
+    try:
+        after = _position(cursor) if cursor else None
+    except InvalidCursorError as e:
+        return BadRequest(str(e))
+
+    category_ids = categories_service.visible_category_ids(find_user_by_token(u_token) if u_token else None)
+    if category_id is not None: category_ids &= {category_id}
+
+    hits = search_service.search(q, category_ids=category_ids, after=after, limit=size + 1)
+
+    next_cursor = None
+    if len(hits) > size:
+        hits = hits[:size]
+        next_cursor = encode_cursor({"v": [hits[-1].score, hits[-1].topic_id]})
+
+    responses.set_cursor_headers(response, next_cursor, None)
+    return hits
+
+def _position(cursor: str) -> tuple[float, int]:
+    try:
+        score, topic_id = decode_cursor(cursor)["v"]
+        return float(score), int(topic_id)
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor.") from e
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Header
+from fastapi import APIRouter, Header, Query, Response
 from pydantic import BaseModel
 from common import responses
 from common.authenticate import get_user_or_raise_401
-from common.responses import BadRequest, InternalServerError, NotFound, Unauthorized, NoContent
+from common.responses import BadRequest, InternalServerError, NotFound, Unauthorized, NoContent, FastJSONResponse
 from data.models import Topic, Reply, TopicCreate, ReplyCreate, Vote, VoteCreate
 from services import topics_service, replies_service, categories_service, votes_service
+from common.routing import FastJSONRoute
 
 
 class TopicResponseModel(BaseModel):
@@ -38,41 +39,44 @@ class TopicLockRequest(BaseModel):
 
 # ---------------------- ROUTES ----------------------
 
-api_topics_router = APIRouter(prefix="/api/topics")
+api_topics_router = APIRouter(prefix="/api/topics", route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 @api_topics_router.get("/",response_model=list[Topic])
-def get_topics(
-    sort: str | None = None,
-    sort_by: str | None = None,
+async def get_topics(
+    response: Response,
+    sort: str = "desc",
+    sort_by: str = "created_at",
     search: str | None = None,
-    page: int = 1,
-    size: int = 5
+    cursor: str | None = None,
+    size: int = Query(5, ge=1, le=100)
 ):
     """
-    Retrieve a paginated list of topics, with optional filtering, searching, and sorting.
+    Retrieve a page of topics, with optional searching and sorting, using cursor pagination.
+
+    The cursors of the neighbour pages are returned in the X-Next-Cursor and X-Prev-Cursor
+    headers (missing at either end). A cursor keeps the sorting of the page it came from.
 
     Args:
-        sort (str | None): Sort order, "asc" or "desc".
-        sort_by (str | None): Field to sort by (e.g., 'title', 'content').
+        sort (str): Sort order, "asc" or "desc". Defaults to "desc".
+        sort_by (str): Field to sort by: 'created_at', 'id' or 'title'. Defaults to 'created_at'.
         search (str | None): Substring to filter topics by title.
-        page (int): Pagination page number (1-based).
-        size (int): Number of topics per page.
+        cursor (str | None): Cursor of the page to get, from a previous response.
+        size (int): Number of topics per page, 1 to 100. Defaults to 5.
 
     Returns:
-        list[Topic]: List of Topic models matching the criteria.
+        list[Topic]: List of Topic models matching the criteria, or BadRequest.
     """
-    offset = (page - 1) * size
-
-    result = topics_service.all(search, limit=size, offset=offset)
+    try:
+        page = await topics_service.page_async(search, sort_by=sort_by, order=sort, cursor=cursor, size=size)
+    except ValueError as e:
+        return responses.BadRequest(str(e))
 
-    if sort and (sort == "asc" or sort == "desc"):
-        return topics_service.sort(result, reverse=sort == 'desc', attribute=sort_by)
-    else:
-        return result
+    responses.set_cursor_headers(response, page.next_cursor, page.prev_cursor)
+    return page.topics
 
 
 @api_topics_router.get("/{id}")
-def get_topic_by_id(id: int):
+async def get_topic_by_id(id: int):
     """
     Retrieve a topic by its ID, including its replies.
 
@@ -83,12 +87,12 @@ def get_topic_by_id(id: int):
         TopicResponseModel: The topic and its replies if found,
         otherwise a NotFound response.
     """
-    topic = topics_service.get_by_id(id)
+    topic = await topics_service.get_by_id_async(id)
 
     if topic is None:
         return responses.NotFound(f"Topic with ID '{id}' not found.")
 
-    replies = list(replies_service.get_by_topic(topic.id))
+    replies = await replies_service.get_by_topic_async(topic.id)
 
     return TopicResponseModel(topic=topic,replies=replies)
 
@@ -109,7 +113,8 @@ def create_topic(topic: TopicCreate, u_token: str = Header()):
     """
     user = get_user_or_raise_401(u_token)
 
-    if not categories_service.exists(topic.category_id):
+    category = categories_service.get_by_id(topic.category_id)
+    if not category:
         return responses.BadRequest("Category does not exist.")
 
     if topic.title == "":
@@ -118,7 +123,6 @@ def create_topic(topic: TopicCreate, u_token: str = Header()):
     if topic.content == "":
         return responses.BadRequest("Content cannot be empty.")
 
-    category = categories_service.get_by_id(topic.category_id)
     if category.is_locked:
         return BadRequest("Category is locked. Cannot create new topics.")
 
@@ -146,10 +150,10 @@ def create_reply(topic_id: int, reply_data: ReplyCreate, u_token: str = Header()
     """
     user = get_user_or_raise_401(u_token)
 
-    if not topics_service.get_by_id(topic_id):
+    topic = topics_service.get_by_id(topic_id)
+    if not topic:
         return BadRequest(f"Topic with ID '{topic_id}' not found.")
 
-    topic = topics_service.get_by_id(topic_id)
     if topic.is_locked:
         return BadRequest("Topic is locked. Cannot accept new replies.")
 
@@ -174,14 +178,21 @@ def vote_reply(topic_id: int, reply_id: int, vote_data: VoteCreate, u_token: str
 
     Returns:
         Vote: The created or updated vote object,
-        or InternalServerError response on failure.
+        or NotFound / BadRequest / InternalServerError response on failure.
     """
     user = get_user_or_raise_401(u_token)
 
     if not topics_service.get_by_id(topic_id):
         return BadRequest(f"Topic {topic_id} not found.")
 
-    new_vote = votes_service.vote(reply_id=reply_id, user_id=user.id, type_vote=vote_data.type_vote)
+    # Checked before the vote is buffered: a buffered vote on a bad reply is only dropped at flush time
+    reply = replies_service.get_by_id(reply_id)
+    if not reply:
+        return NotFound(f"Reply {reply_id} not found.")
+    if reply.topic_id != topic_id:
+        return BadRequest(f"Reply {reply_id} doesn't belong to topic {topic_id}.")
+
+    new_vote = votes_service.record_vote(reply_id=reply_id, user_id=user.id, type_vote=vote_data.type_vote)
     if not new_vote:
         return InternalServerError()
 
@@ -247,4 +258,4 @@ def set_topic_lock(id: int, topic_data: TopicLockRequest, u_token: str = Header(
     if not topics_service.set_locked(id, topic_data.is_locked):
         return BadRequest("Could not update topic lock status.")
 
-    return topics_service.get_by_id(id)
\ No newline at end of file
+    return topic.model_copy(update={"is_locked": int(topic_data.is_locked)})
\ No newline at end of file
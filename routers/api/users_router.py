@@ -4,8 +4,10 @@ import services.users_service as user_service
 from common import responses, authenticate
 from fastapi import APIRouter, Header
 from utils.regex_utils import *
+from common.responses import FastJSONResponse
+from common.routing import FastJSONRoute
 
-api_users_router = APIRouter(prefix='/api/users')
+api_users_router = APIRouter(prefix='/api/users', route_class=FastJSONRoute, default_response_class=FastJSONResponse)
 
 @api_users_router.post('/login')
 def user_login(login_data: UserLoginData):
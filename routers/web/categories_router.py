@@ -54,7 +54,7 @@ def get_category_details(id: int, request: Request):
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    topics = list(categories_service.topics_by_category(category_id=id))
+    topics = categories_service.topics_by_category(category_id=id) # streamed while the template renders
     categories = list(categories_service.all())
     categories_dict = {cat.id: cat for cat in categories}
     
@@ -9,8 +9,10 @@ from fastapi import APIRouter, Request, Form, HTTPException
 conversations_router = APIRouter(prefix="/conversations")
 templates = CustomJinja2Templates(directory="templates")
 
+CONVERSATIONS_PAGE_SIZE = 20
+
 @conversations_router.get("/")
-def get_all_conversations(request: Request, contains_user: str | None = None):
+def get_all_conversations(request: Request, contains_user: str | None = None, page: int = 1):
     
     auth_user = authenticate.get_user_if_token(request)
     if not auth_user:
@@ -23,21 +25,26 @@ def get_all_conversations(request: Request, contains_user: str | None = None):
         user = users_service.find_user_by_username(contains_user)
         if user: user_ids.add(user.id)
     
-    conversations = conversations_service.get_all_conversations(user_ids)
+    # One extra row tells whether there is a next page
+    page = max(page, 1)
+    conversations = conversations_service.get_all_conversations(
+        user_ids, limit=CONVERSATIONS_PAGE_SIZE + 1, offset=(page - 1) * CONVERSATIONS_PAGE_SIZE) or []
+    has_next = len(conversations) > CONVERSATIONS_PAGE_SIZE
     
     return templates.TemplateResponse(
         "conversations_list.html",
-        {"request": request, "user": auth_user, "conversations": conversations}
+        {"request": request, "user": auth_user, "conversations": conversations[:CONVERSATIONS_PAGE_SIZE],
+         "page": page, "has_next": has_next}
     )
     
 @conversations_router.get("/{conversation_id}")
-def get_conversation(conversation_id: int, request: Request):
+def get_conversation(conversation_id: int, request: Request, before: int | None = None):
     
     user = authenticate.get_user_if_token(request)
     if not user:
         raise HTTPException(status_code=403, detail="User must be logged in")
     
-    conversation = conversations_service.get_conversation(conversation_id)
+    conversation = conversations_service.get_conversation(conversation_id, before=before)
     
     if not conversation or not conversations_service.is_user_in_conversation(user.id, conversation_id):
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -72,8 +79,8 @@ def create_conversation(request: Request, name: str = Form(...), participants: l
         print(traceback.format_exc())
         return templates.TemplateResponse(
                 "conversations_list.html",
-                {"request": request, "user": user, "conversations": conversations_service.get_all_conversations({user.id}), 
-                "error": "Could not create conversation."
+                {"request": request, "user": user, "conversations": conversations_service.get_all_conversations({user.id}, limit=CONVERSATIONS_PAGE_SIZE), 
+                "page": 1, "has_next": False, "error": "Could not create conversation."
         })
     
 @conversations_router.post("/{conversation_id}")
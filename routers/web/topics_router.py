@@ -1,6 +1,7 @@
 from services import topics_service, categories_service, replies_service, votes_service
 from fastapi import APIRouter, Request, Form, HTTPException
 from common.template_config import CustomJinja2Templates
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import RedirectResponse
 from data.models import TopicCreate, ReplyCreate
 from common import authenticate
@@ -21,7 +22,7 @@ def view_topics(request: Request):
         TemplateResponse: The rendered template with a list of topics.
     """
     user = authenticate.get_user_if_token(request)
-    topics = list(topics_service.all())
+    topics = topics_service.all() # streamed while the template renders
     categories = list(categories_service.all())
     categories_dict = {c.id: c for c in categories}
     return templates.TemplateResponse(
@@ -64,11 +65,10 @@ def add_reply(id: int, request: Request, content: str = Form(...)):
         
         # place marked reply on top of all others
         replies = sorted(replies_service.get_by_topic(topic.id), key=lambda r: (r.id != topic.best_reply_id, r.created_at))
-        votes = votes_service.count_votes_for_replies(id)
         is_admin = user and user.is_admin
         
         return templates.TemplateResponse(request=request, name="topic_details.html", context={
-        "request": request, "user": user, "topic": topic, "replies": replies, "is_admin": is_admin, "votes": votes,
+        "request": request, "user": user, "topic": topic, "replies": replies, "is_admin": is_admin,
         "error": "An error occured while creating your reply."})
 
 @topic_router.get("/create")
@@ -94,7 +94,7 @@ def create_topic_form(request: Request):
     })
 
 @topic_router.get("/{id}")
-def topic_details(id: int, request: Request):
+async def topic_details(id: int, request: Request):
     """
     Render a page displaying the details of a single topic, including replies.
 
@@ -105,25 +105,24 @@ def topic_details(id: int, request: Request):
     Returns:
         TemplateResponse or RedirectResponse: The topic details template, or redirect to topics list if not found.
     """
-    user = authenticate.get_user_if_token(request)
+    user = await authenticate.get_user_if_token_async(request)
     
-    topic = topics_service.get_by_id(id)
+    topic = await topics_service.get_by_id_async(id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
 
-    votes = votes_service.count_votes_for_replies(id)
     # place marked reply on top of all others
-    replies = sorted(replies_service.get_by_topic(topic.id), key=lambda r: (r.id != topic.best_reply_id, r.created_at))
+    replies = sorted(await replies_service.get_by_topic_async(topic.id), key=lambda r: (r.id != topic.best_reply_id, r.created_at))
 
     is_admin = user and user.is_admin
 
-    return templates.TemplateResponse("topic_details.html", {
+    # Template globals still use the sync db layer, keep rendering off the event loop
+    return await run_in_threadpool(templates.TemplateResponse, "topic_details.html", {
         "request": request,
         "user": user,
         "topic": topic,
         "replies": replies,
-        "is_admin": is_admin,
-        "votes": votes
+        "is_admin": is_admin
     })
 
 @topic_router.post("/create")
@@ -196,7 +195,11 @@ def vote_reply(topic_id: int, reply_id: int, request: Request, type_vote: str =
     if not user:
         raise HTTPException(status_code=403, detail="User must be logged in")
 
-    votes_service.vote(reply_id=reply_id, user_id=user.id, type_vote=type_vote)
+    reply = replies_service.get_by_id(reply_id)
+    if not reply or reply.topic_id != topic_id:
+        raise HTTPException(status_code=404, detail="Reply not found")
+
+    votes_service.record_vote(reply_id=reply_id, user_id=user.id, type_vote=type_vote)
     return RedirectResponse(f"/topics/{topic_id}", status_code=302)
 
 
@@ -1,61 +1,122 @@
-from data.database import read_query, insert_query, update_query
-from data.models import Category, Topic
+from data.database import read_query, stream_query, insert_query, update_query
+from data.models import Category, Topic, User
+from services.topics_service import SELECT_TOPICS, order_by
+import threading
+import time
+import os
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Categories are read on almost every page but change only  #
+#       through the admin functions below, so the whole catalog   #
+#       is kept in memory. Every function that writes categories  #
+#       must call invalidate_catalog(). The max age only bounds   #
+#       staleness between worker processes.                       #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+CATALOG_MAX_AGE_SECONDS = float(os.getenv("CATEGORY_CATALOG_MAX_AGE_SECONDS", 60))
+
+class _Catalog:
+    """Snapshot of the categories table, in table order and by id."""
+    __slots__ = ("categories", "by_id", "loaded_at")
+
+    def __init__(self, categories: list[Category]):
+        self.categories = categories
+        self.by_id = {category.id: category for category in categories}
+        self.loaded_at = time.monotonic()
+
+_catalog: _Catalog | None = None
+_catalog_generation = 0
+_catalog_lock = threading.Lock()
+
+def _get_catalog() -> _Catalog:
+    """
+    Get the category catalog, loading it from the database if it is missing or too old.
+    """
+    global _catalog
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - catalog.loaded_at < CATALOG_MAX_AGE_SECONDS:
+        return catalog
+
+    with _catalog_lock: generation = _catalog_generation
+
+    # From the primary: the catalog holds the access flags for every user until it expires,
+    # so it must not be filled from a replica that hasn't seen the last set_privacy/set_locked
+    rows = read_query("""
+      SELECT id, name, is_private, is_locked, image_url
+        FROM categories
+    """, primary=True)
+    catalog = _Catalog([Category.from_query_result(*row) for row in rows])
+
+    # Don't publish a snapshot that a concurrent write already made stale
+    with _catalog_lock:
+        if generation == _catalog_generation: _catalog = catalog
+    return catalog
 
+def invalidate_catalog():
+    """
+    Drop the in-memory category catalog, so the next read reloads it.
+    """
+    global _catalog, _catalog_generation
+    with _catalog_lock:
+        _catalog = None
+        _catalog_generation += 1
 
 def all():
     """
-    Retrieve all category records from the database.
+    Retrieve all category records, served from the in-memory catalog.
 
     Returns:
         Generator[Category]: A generator yielding Category instances.
     """
-    sql = """
-      SELECT id, name, is_private, is_locked, image_url
-        FROM categories
-    """
-
-    rows = read_query(sql)
-    return (Category.from_query_result(*row) for row in rows)
+    return (category.model_copy() for category in _get_catalog().categories)
 
 def topics_by_category(
         category_id: int,
         search: str | None = None,
         *,
+        sort_by: str = "created_at",
+        order: str = "desc",
         limit: int | None = None,
         offset: int | None = None):
     """
-    Retrieve topics for a specific category with optional search filter and pagination.
+    Retrieve topics for a specific category sorted by the database, with optional search filter and pagination.
+    Without pagination the rows are streamed from the database instead of loaded at once.
 
     Args:
         category_id (int): ID of the category.
         search (str | None): Substring to filter topics by title.
+        sort_by (str): One of topics_service.TOPIC_SORT_KEYS. Defaults to 'created_at'.
+        order (str): 'asc' or 'desc'. Defaults to 'desc'.
         limit (int | None): Maximum number of records to return.
         offset (int | None): Number of records to skip.
 
     Returns:
         Generator[Topic]: A generator yielding Topic instances.
+
+    Raises:
+        ValueError: If the sort key or order is not whitelisted.
     """
+    sort_clause = order_by(sort_by, order)
+
     if search is None:
-        sql = """
-        SELECT id, title, content, category_id, user_id, is_locked, best_reply_id, created_at
-        FROM topics
-        WHERE category_id = ?"""
+        sql = SELECT_TOPICS + """
+        WHERE t.category_id = ?"""
         params: tuple = (category_id,)
 
     else:
-        sql = """
-        SELECT id, title, content, category_id, user_id, is_locked, best_reply_id, created_at
-        FROM topics
-        WHERE  = ?
-        AND title LIKE ?"""
+        sql = SELECT_TOPICS + """
+        WHERE t.category_id = ?
+        AND t.title LIKE ?"""
         params = (category_id, f"%{search}%")
 
+    sql += """
+        """ + sort_clause
 
     if limit is not None and offset is not None:
         sql += " LIMIT ? OFFSET ?"
         params += (limit, offset)
 
-    rows = read_query(sql, params)
+    rows = read_query(sql, params) if limit is not None else stream_query(sql, params)
     return (Topic.from_query_result(*row) for row in rows)
 
 def exists(id: int):
@@ -68,10 +129,7 @@ def exists(id: int):
     Returns:
         bool: True if the category exists, False otherwise.
     """
-    return any(
-        read_query(
-            'select id, name, is_private, is_locked from categories where id = ?',
-            (id,)))
+    return id in _get_catalog().by_id
 
 
 def get_by_id(category_id: int):
@@ -84,12 +142,28 @@ def get_by_id(category_id: int):
     Returns:
         Category | None: The Category instance if found, else None.
     """
-    data = read_query(
-        """SELECT id, name, is_private, is_locked, image_url
-            FROM categories 
-            WHERE id = ?""", (category_id,))
+    category = _get_catalog().by_id.get(category_id)
+    return category.model_copy() if category else None
 
-    return next((Category.from_query_result(*row) for row in data), None)
+def visible_category_ids(user: User | None) -> set[int]:
+    """
+    Get the IDs of the categories a user may read: every public category, plus the
+    private ones the user was given access to. Admins see every category.
+
+    Args:
+        user (User | None): The user, or None for anonymous requests.
+
+    Returns:
+        set[int]: IDs of the readable categories.
+    """
+    categories = _get_catalog().categories
+    if user and user.is_admin: return {c.id for c in categories}
+
+    visible = {c.id for c in categories if not c.is_private}
+    if user:
+        visible.update(id for id, in read_query(
+            "SELECT category_id FROM categories_has_users WHERE user_id = ?", (user.id,)))
+    return visible
 
 def create(category: Category) -> Category:
     """
@@ -103,6 +177,7 @@ def create(category: Category) -> Category:
     """
     sql = """INSERT INTO categories (name, is_private, is_locked)VALUES(?, ?, ?)"""
     new_id = insert_query(sql, (category.name, category.is_private, category.is_locked))
+    invalidate_catalog()
 
     return Category.from_query_result(id=new_id, name=category.name, is_private=category.is_private, is_locked=category.is_locked)
 
@@ -119,6 +194,7 @@ def set_privacy(category_id: int, is_private: bool) -> bool:
     """
     sql = """UPDATE categories SET is_private = ? WHERE id = ?"""
     rows = update_query(sql, (1 if is_private else 0, category_id))
+    invalidate_catalog()
     return rows == 1
 
 def set_locked(category_id: int, locked: bool) -> bool:
@@ -133,7 +209,9 @@ def set_locked(category_id: int, locked: bool) -> bool:
         bool: True if exactly one row was updated, else False.
     """
     sql = "UPDATE categories SET is_locked = ? WHERE id = ?"
-    return update_query(sql, (1 if locked else 0, category_id)) == 1
+    rows = update_query(sql, (1 if locked else 0, category_id))
+    invalidate_catalog()
+    return rows == 1
 
 def update_category_image_url(category_id: int, image_url: str) -> bool:
     """
@@ -146,6 +224,8 @@ def update_category_image_url(category_id: int, image_url: str) -> bool:
     Returns:
         bool: True if the image URL was successfully updated, else False.
     """
-    return update_query(
+    updated = update_query(
         "UPDATE categories SET image_url = ? WHERE id = ?", (image_url, category_id)
-    )
\ No newline at end of file
+    )
+    invalidate_catalog()
+    return updated
\ No newline at end of file
@@ -1,4 +1,4 @@
-from data.database import insert_query, read_query, update_query
+from data.database import insert_query, insert_many_query, read_query, update_query, transaction
 from mariadb import IntegrityError
 from data.models import *
 
@@ -34,15 +34,18 @@ def create_conversation(conv_data: CreateConversation) -> CreateConversationResp
     """
     if len(conv_data.user_ids) < 1: return None
     
-    # Create a new conversation in conversations table
-    query = "INSERT INTO conversations(name) VALUES (?)"
-    conversation_id = insert_query(query, (conv_data.name,))
-    
-    if not conversation_id: return None
-    
-    # Update conversations_has_users table
-    query = "INSERT INTO conversations_has_users(conversation_id, user_id) VALUES (?, ?)"
-    for id in conv_data.user_ids: insert_query(query, (conversation_id, id,))
+    # Conversation and participants are written as one unit of work
+    with transaction():
+        
+        # Create a new conversation in conversations table
+        query = "INSERT INTO conversations(name) VALUES (?)"
+        conversation_id = insert_query(query, (conv_data.name,))
+        
+        if not conversation_id: return None
+        
+        # Update conversations_has_users table in one round trip
+        query = "INSERT INTO conversations_has_users(conversation_id, user_id) VALUES (?, ?)"
+        insert_many_query(query, ((conversation_id, id,) for id in conv_data.user_ids))
 
     return CreateConversationResponse.from_query_result(id=conversation_id, name=conv_data.name, user_ids=conv_data.user_ids)
 
@@ -109,85 +112,128 @@ def is_user_in_conversation(user_id: int, conversation_id: int) -> bool:
     data = read_query(query, (user_id, conversation_id,))
     return True if data else False
 
-def get_conversation(conversation_id: int) -> ConversationResponse | None:
+MESSAGES_PAGE_SIZE = 50
+MAX_MESSAGES_PAGE_SIZE = 200
+
+def get_conversation(conversation_id: int, *, before: int | None = None, limit: int = MESSAGES_PAGE_SIZE) -> ConversationResponse | None:
     """
-    Retrieve a conversation and its messages by conversation ID.
+    Retrieve a conversation with one page of its messages, by conversation ID.
+
+    Messages are paged with a keyset on (conversation_id, id): the newest page is returned
+    first, and older_cursor of the response is passed back as before to load the page
+    preceding it. The cost of a page doesn't depend on the length of the history.
 
     Args:
         conversation_id (int): The ID of the conversation.
+        before (int | None): Only return messages older than this message ID (cursor).
+        limit (int): Maximum number of messages to return.
 
     Returns:
-        ConversationResponse: The conversation data with messages if found.
+        ConversationResponse: The conversation data with a page of messages, oldest first.
         None: If not found.
+
+    Raises:
+        ValueError: If limit is less than 1.
     """
+    if limit < 1: raise ValueError(f"Invalid page size: {limit}")
+
     # Try to find conversation
     conversation_data = read_query("SELECT id, name FROM conversations WHERE id = ?", (conversation_id,))
     if not conversation_data: return None
     
-    # Get message data
-    query = '''SELECT m.text, u.username, u.avatar_url, m.created_at
+    # Get the newest page of message data, plus one row to know if there are older ones
+    query = '''SELECT m.id, m.text, u.username, u.avatar_url, m.created_at
                FROM messages AS m
                JOIN users AS u ON m.sender_id = u.id
-               WHERE m.conversation_id = ?
-               ORDER BY m.created_at ASC'''
-               
-    messages_data = read_query(query, (conversation_id,))
-    messages = (MessageResponse.from_query_result(*row) for row in messages_data)
+               WHERE m.conversation_id = ?'''
+    params: tuple = (conversation_id,)
+
+    if before is not None:
+        query += " AND m.id < ?"
+        params += (before,)
+
+    query += " ORDER BY m.id DESC LIMIT ?"
+    params += (limit + 1,)
+
+    messages_data = read_query(query, params)
+    has_older = len(messages_data) > limit
+    messages = [MessageResponse.from_query_result(*row) for row in reversed(messages_data[:limit])]
     
     return ConversationResponse.from_query_result(
         id=conversation_data[0][0],
         name=conversation_data[0][1],
-        messages=messages
+        messages=messages,
+        older_cursor=messages[0].id if has_older else None
     )
     
-def get_all_conversations(user_ids: set[int]) -> list[AllConversationsResponse] | None:
+def get_all_conversations(user_ids: set[int], *, limit: int | None = None, offset: int | None = None) -> list[AllConversationsResponse] | None:
     """
-    Get all conversations that contain the given user IDs.
+    Get the conversations that contain all the given user IDs, most recently active first,
+    with their participants, last message and message count.
+
+    Runs two queries regardless of the number of conversations: one for the requested page
+    and one for the participants of every conversation on it.
 
     Args:
         user_ids (set[int]): Set of user IDs to filter conversations.
+        limit (int | None): Maximum number of conversations to return.
+        offset (int | None): Number of conversations to skip.
 
     Returns:
         list[AllConversationsResponse]: List of conversations with participants.
         None: If no conversations are found.
     """
-    # Convert user ids list to comma-separated string for the query
     placeholders = ", ".join(["?"] * len(user_ids))
-    
-    # Get conversation ids
+
+    # Conversations that have every one of the users
+    mine = f"""SELECT conversation_id
+          FROM conversations_has_users
+          WHERE user_id IN ({placeholders})
+          GROUP BY conversation_id
+          HAVING COUNT(DISTINCT user_id) = ?"""
+
+    # Those conversations with the stats of their messages, counted for them alone;
+    # conversations without messages come last, newest first
     query = f"""
-    SELECT c.id, c.name
+    SELECT c.id, c.name, COALESCE(stats.message_count, 0), lm.text, lu.username, lm.created_at
     FROM conversations AS c
-    JOIN conversations_has_users AS chu 
-    ON c.id = chu.conversation_id
-    WHERE chu.user_id IN ({placeholders})
-    GROUP BY c.id, c.name
-    HAVING COUNT(DISTINCT chu.user_id) = ?"""
-               
-    # Add the count of user_ids as the last parameter
-    params = tuple(user_ids) + (len(user_ids),)
+    JOIN ({mine}) AS mine
+      ON mine.conversation_id = c.id
+    LEFT JOIN (SELECT conversation_id, COUNT(*) AS message_count, MAX(id) AS last_message_id
+               FROM messages
+               WHERE conversation_id IN ({mine})
+               GROUP BY conversation_id) AS stats
+      ON stats.conversation_id = c.id
+    LEFT JOIN messages AS lm ON lm.id = stats.last_message_id
+    LEFT JOIN users AS lu ON lu.id = lm.sender_id
+    ORDER BY stats.last_message_id IS NULL, stats.last_message_id DESC, c.id DESC"""
+
+    params = (tuple(user_ids) + (len(user_ids),)) * 2
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params += (limit, offset or 0)
+
     conversations_data = read_query(query, params)
     if not conversations_data: return None
-    
-    results = []
-    for conv_id, conv_name in conversations_data:
-        
-        # Query to get all participants for this conversation
-        
-        participants_query = """
-        SELECT u.id, u.username
-        FROM users AS u
-        JOIN conversations_has_users AS chu
-        ON u.id = chu.user_id
-        WHERE chu.conversation_id = ?
-        ORDER BY u.username"""
-                                
-        participants_data = read_query(participants_query, (conv_id,))
-        participants = (ParticipantsResponse.from_query_result(*row) for row in participants_data)
-        
-        results.append(AllConversationsResponse.from_query_result(id=conv_id, name=conv_name, participants=participants))
-    
-    return results
-    
-    
-    
\ No newline at end of file
+
+    # Participants of every conversation on the page in one query
+    conversation_ids = tuple(row[0] for row in conversations_data)
+    participants_query = f"""
+    SELECT chu.conversation_id, u.id, u.username
+    FROM users AS u
+    JOIN conversations_has_users AS chu
+    ON u.id = chu.user_id
+    WHERE chu.conversation_id IN ({", ".join(["?"] * len(conversation_ids))})
+    ORDER BY u.username"""
+
+    participants = {conv_id: [] for conv_id in conversation_ids}
+    for conv_id, user_id, username in read_query(participants_query, conversation_ids):
+        participants[conv_id].append(ParticipantsResponse.from_query_result(user_id, username))
+
+    return [
+        AllConversationsResponse.from_query_result(
+            id=conv_id, name=conv_name, participants=participants[conv_id],
+            message_count=message_count, last_message=last_text,
+            last_message_by=last_username, last_message_at=last_at)
+        for conv_id, conv_name, message_count, last_text, last_username, last_at in conversations_data
+    ]
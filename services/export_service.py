@@ -0,0 +1,63 @@
+from data.database import stream_query
+from data.models import Topic, Reply, Message
+from collections.abc import Iterator
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Full dumps for admins. Every export is read through       #
+#       stream_query()'s server-side cursor and mapped lazily, so #
+#       memory stays flat however many rows there are. Each open  #
+#       export keeps one pooled connection until it is consumed.  #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+def category_topics(category_id: int) -> Iterator[Topic]:
+    """
+    Stream every topic of a category, oldest first.
+
+    Args:
+        category_id (int): The ID of the category.
+
+    Yields:
+        Topic: One topic at a time.
+    """
+    rows = stream_query("""
+        SELECT id, title, content, category_id, user_id, is_locked, best_reply_id, created_at
+        FROM topics
+        WHERE category_id = ?
+        ORDER BY id""", (category_id,))
+    return (Topic.from_query_result(*row) for row in rows)
+
+def category_replies(category_id: int) -> Iterator[Reply]:
+    """
+    Stream every reply to the topics of a category, oldest first.
+
+    Args:
+        category_id (int): The ID of the category.
+
+    Yields:
+        Reply: One reply at a time, with its vote counters.
+    """
+    rows = stream_query("""
+        SELECT r.id, r.text, r.topic_id, r.user_id, r.created_at, r.up_count, r.down_count
+        FROM replies r
+        JOIN topics t ON r.topic_id = t.id
+        WHERE t.category_id = ?
+        ORDER BY r.id""", (category_id,))
+    return (Reply.from_query_result(*row[:5], up_count=row[5], down_count=row[6]) for row in rows)
+
+def user_messages(user_id: int) -> Iterator[Message]:
+    """
+    Stream every message of every conversation a user takes part in, oldest first.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Yields:
+        Message: One message at a time.
+    """
+    rows = stream_query("""
+        SELECT m.id, m.text, m.conversation_id, m.sender_id, m.created_at
+        FROM messages m
+        JOIN conversations_has_users cu ON cu.conversation_id = m.conversation_id
+        WHERE cu.user_id = ?
+        ORDER BY m.id""", (user_id,))
+    return (Message.from_query_result(*row) for row in rows)
@@ -0,0 +1,112 @@
+from collections.abc import Callable, Awaitable, Iterable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: DataLoaders dedupe and batch lookups by id for the length #
+#       of one request: a key is fetched at most once, pages that #
+#       need many ids fetch them with one WHERE id IN (...) query #
+#       (load_many), and rows a listing already read are primed.  #
+#       Services that change a row must forget() it, so the       #
+#       request reads the new value.                              #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+BatchFn = Callable[[set], dict]
+AsyncBatchFn = Callable[[set], Awaitable[dict]]
+
+class DataLoader:
+    """
+    Per-request cache of lookups by key, filled in batches. Keys that aren't found are
+    cached as None, so a missing row isn't queried twice either.
+
+    Args:
+        batch_fn (Callable[[set], dict]): Fetches {key: value} for a set of keys.
+        batch_fn_async (Callable[[set], Awaitable[dict]] | None): Async version of batch_fn.
+    """
+    def __init__(self, batch_fn: BatchFn, batch_fn_async: AsyncBatchFn | None = None):
+        self.batch_fn = batch_fn
+        self.batch_fn_async = batch_fn_async
+        self._cache: dict = {}
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def load(self, key):
+        """Get the value of a key, or None if it doesn't exist."""
+        return self.load_many([key])[key]
+
+    def load_many(self, keys: Iterable) -> dict:
+        """Get {key: value or None} for the given keys, fetching the uncached ones in one batch."""
+        keys = list(dict.fromkeys(keys))
+        missing = self._missing(keys)
+        if missing: self._store(missing, self.batch_fn(missing))
+        return {key: self._cache[key] for key in keys}
+
+    async def load_async(self, key):
+        """Async version of load(), fetching with batch_fn_async."""
+        return (await self.load_many_async([key]))[key]
+
+    async def load_many_async(self, keys: Iterable) -> dict:
+        """Async version of load_many(), fetching with batch_fn_async."""
+        keys = list(dict.fromkeys(keys))
+        missing = self._missing(keys)
+        if missing: self._store(missing, await self.batch_fn_async(missing))
+        return {key: self._cache[key] for key in keys}
+
+    def prime(self, key, value):
+        """Cache a value loaded some other way, e.g. by a listing query."""
+        self._cache[key] = value
+
+    def prime_many(self, values: Iterable, key: Callable = lambda value: value.id):
+        """Cache values loaded some other way, by key(value)."""
+        for value in values: self._cache[key(value)] = value
+
+    def clear(self, key):
+        """Forget a cached value, so the next load fetches it again."""
+        self._cache.pop(key, None)
+
+    def _missing(self, keys: list) -> set:
+        return {key for key in keys if key not in self._cache}
+
+    def _store(self, keys: set, found: dict):
+        for key in keys: self._cache[key] = found.get(key)
+
+
+_request_loaders: ContextVar[dict[str, DataLoader] | None] = ContextVar("_request_loaders", default=None)
+
+@contextmanager
+def request_scope() -> Iterator[dict[str, DataLoader]]:
+    """
+    Share loaders for the duration of one request.
+
+    Yields:
+        dict[str, DataLoader]: The request's loaders by name.
+    """
+    token = _request_loaders.set({})
+    try:
+        yield _request_loaders.get()
+    finally:
+        _request_loaders.reset(token)
+
+def get_loader(name: str, batch_fn: BatchFn, batch_fn_async: AsyncBatchFn | None = None) -> DataLoader:
+    """
+    Get the current request's loader of a kind, creating it on first use.
+    Outside of a request scope every call gets a new loader, so nothing is cached.
+
+    Args:
+        name (str): Loader kind, e.g. 'topics'.
+        batch_fn (Callable[[set], dict]): Fetches {key: value} for a set of keys.
+        batch_fn_async (Callable[[set], Awaitable[dict]] | None): Async version of batch_fn.
+    """
+    loaders = _request_loaders.get()
+    if loaders is None: return DataLoader(batch_fn, batch_fn_async)
+
+    loader = loaders.get(name)
+    if loader is None: loader = loaders[name] = DataLoader(batch_fn, batch_fn_async)
+    return loader
+
+def forget(name: str, key):
+    """Drop a changed row from the current request's loader of a kind, if it was loaded."""
+    loaders = _request_loaders.get()
+    if loaders and name in loaders: loaders[name].clear(key)
@@ -1,11 +1,21 @@
 from datetime import datetime, timezone
 from data.database import read_query, insert_query
+from data.async_database import read_query as read_query_async
 from data.models import Reply, ReplyCreate
+from services import search_service, votes_service, loaders
 
+_SELECT_REPLIES_BY_TOPIC = """
+    SELECT r.id, r.text, r.topic_id, r.user_id, r.created_at, u.username, u.avatar_url, r.up_count, r.down_count
+    FROM replies r
+    JOIN users u ON r.user_id = u.id
+    WHERE r.topic_id = ?
+    ORDER BY r.created_at ASC
+    """
 
 def get_by_topic(topics_id: int):
     """
-    Retrieve all replies for a specific topic, including author information.
+    Retrieve all replies for a specific topic, including author information and vote counts
+    (votes still waiting in the vote buffer included).
 
     Args:
         topics_id (int): The ID of the topic whose replies are fetched.
@@ -13,15 +23,23 @@ def get_by_topic(topics_id: int):
     Returns:
         list[Reply]: A list of Reply objects for the given topic, ordered by creation time (ascending).
     """
-    sql = """
-    SELECT r.id, r.text, r.topic_id, r.user_id, r.created_at, u.username, u.avatar_url
-    FROM replies r
-    JOIN users u ON r.user_id = u.id
-    WHERE r.topic_id = ?
-    ORDER BY r.created_at ASC
+    data = read_query(_SELECT_REPLIES_BY_TOPIC, (topics_id,))
+    return _primed(votes_service.with_pending_votes([Reply.from_query_result(*row) for row in data]))
+
+async def get_by_topic_async(topics_id: int):
+    """
+    Async version of get_by_topic(), for async route handlers.
+
+    Returns:
+        list[Reply]: A list of Reply objects for the given topic, ordered by creation time (ascending).
     """
-    data = read_query(sql, (topics_id,))
-    return [Reply.from_query_result(*row) for row in data]
+    data = await read_query_async(_SELECT_REPLIES_BY_TOPIC, (topics_id,))
+    return _primed(await votes_service.with_pending_votes_async([Reply.from_query_result(*row) for row in data]))
+
+def _primed(replies: list[Reply]) -> list[Reply]:
+    """Cache the replies of a topic page, so looking one up later in the request is free."""
+    _loader().prime_many(replies)
+    return replies
 
 def create(reply_data: ReplyCreate, user_id: int, topic_id: int):
     """
@@ -38,6 +56,7 @@ def create(reply_data: ReplyCreate, user_id: int, topic_id: int):
     sql = """INSERT INTO replies (text, topic_id, user_id) VALUES (?, ?, ?)"""
 
     new_id = insert_query(sql,(reply_data.text, topic_id, user_id))
+    if new_id: search_service.index_reply(new_id, topic_id, reply_data.text)
     return True if new_id else False
 
 def exists(reply_id: int):
@@ -53,9 +72,29 @@ def exists(reply_id: int):
     return any(read_query("""SELECT 1 FROM replies WHERE id = ?""",(reply_id,)))
 
 
+def get_by_ids(ids) -> dict[int, Reply]:
+    """
+    Retrieve many replies with one query.
+
+    Args:
+        ids (Iterable[int]): IDs of the replies.
+
+    Returns:
+        dict[int, Reply]: The found replies by ID. Missing IDs are left out.
+    """
+    if not ids: return {}
+    ids = tuple(sorted(ids))
+    data = read_query(
+        f"""SELECT id, text, topic_id, user_id, created_at, up_count, down_count
+            FROM replies 
+            WHERE id IN ({", ".join("?" * len(ids))})""", ids)
+
+    replies = (Reply.from_query_result(*row[:5], up_count=row[5], down_count=row[6]) for row in data)
+    return {reply.id: reply for reply in replies}
+
 def get_by_id(reply_id):
     """
-    Retrieve a reply by its ID.
+    Retrieve a reply by its ID, at most once per request.
 
     Args:
         reply_id (int): The unique identifier of the reply.
@@ -63,9 +102,7 @@ def get_by_id(reply_id):
     Returns:
         Reply | None: The Reply object if found, otherwise None.
     """
-    data = read_query(
-        """SELECT id, text, topic_id, user_id, created_at
-            FROM replies 
-            WHERE id = ?""", (reply_id,))
+    return _loader().load(reply_id)
 
-    return next((Reply.from_query_result(*row) for row in data), None)
\ No newline at end of file
+def _loader():
+    return loaders.get_loader("replies", get_by_ids)
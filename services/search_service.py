@@ -0,0 +1,270 @@
+from data.database import stream_query
+from dataclasses import dataclass, field
+from collections import Counter
+import threading
+import logging
+import math
+import time
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: In-memory inverted index over topic titles, topic content #
+#       and reply text, one document per topic, ranked with BM25. #
+#       It is built from the database on first use and kept up   #
+#       to date by topics_service.create / replies_service.create.#
+#       Other worker processes only see new posts after their     #
+#       periodic rebuild (SEARCH_INDEX_MAX_AGE_SECONDS).          #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+SEARCH_CONFIG = {
+    "max_age_seconds": float(os.getenv("SEARCH_INDEX_MAX_AGE_SECONDS", 600)),
+    "k1": 1.2,
+    "b": 0.75,
+}
+
+# A title match counts as much as this many occurrences in the content or a reply
+TITLE_WEIGHT = 3.0
+
+_TOKEN = re.compile(r"\w+")
+_MAX_TOKEN_LENGTH = 40
+_STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have i if in is it its not of on or so
+    that the their there this to was were will with you your
+""".split())
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase search terms, dropping stopwords and single characters.
+
+    Example:
+        "The Pool's timeout, again!" -> ["pool", "timeout", "again"]
+    """
+    return [
+        token for token in _TOKEN.findall(text.lower())
+        if 1 < len(token) <= _MAX_TOKEN_LENGTH and token not in _STOPWORDS
+    ]
+
+
+@dataclass
+class SearchHit:
+    """A topic matching a search, with its BM25 score."""
+    topic_id: int
+    title: str
+    category_id: int
+    score: float
+
+
+@dataclass
+class _Document:
+    title: str
+    category_id: int
+    length: float = 0.0
+    reply_ids: set[int] = field(default_factory=set)
+
+
+class SearchIndex:
+    """
+    Thread-safe inverted index of topics. Every add is idempotent (keyed by topic or
+    reply id), so replaying a change that the index already contains is harmless.
+
+    Args:
+        k1 (float): BM25 term frequency saturation.
+        b (float): BM25 document length normalization.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.built_at = time.monotonic()
+        self._postings: dict[str, dict[int, float]] = {} # term -> topic id -> weighted term frequency
+        self._documents: dict[int, _Document] = {}
+        self._total_length = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add_topic(self, topic_id: int, category_id: int, title: str, content: str):
+        """Index a topic's title and content."""
+        with self._lock:
+            if topic_id in self._documents: return
+            document = self._documents[topic_id] = _Document(title, category_id)
+            self._add_terms(topic_id, document, tokenize(title), TITLE_WEIGHT)
+            self._add_terms(topic_id, document, tokenize(content), 1.0)
+
+    def add_reply(self, reply_id: int, topic_id: int, text: str):
+        """Index a reply's text as part of its topic. Ignored if the topic isn't indexed."""
+        with self._lock:
+            document = self._documents.get(topic_id)
+            if document is None or reply_id in document.reply_ids: return
+            document.reply_ids.add(reply_id)
+            self._add_terms(topic_id, document, tokenize(text), 1.0)
+
+    def _add_terms(self, topic_id: int, document: _Document, terms: list[str], weight: float):
+        for term, count in Counter(terms).items():
+            postings = self._postings.setdefault(term, {})
+            postings[topic_id] = postings.get(topic_id, 0.0) + count * weight
+
+        document.length += len(terms) * weight
+        self._total_length += len(terms) * weight
+
+    def search(self, query: str, *, category_ids: set[int] | None = None) -> list[SearchHit]:
+        """
+        Rank the topics matching any term of the query, best first (ties by topic id).
+
+        Args:
+            query (str): Free text query.
+            category_ids (set[int] | None): Only return topics of these categories. None for all.
+
+        Returns:
+            list[SearchHit]: Every matching topic, sorted by score.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or not self._documents: return []
+
+            n = len(self._documents)
+            avg_length = self._total_length / n or 1.0
+            scores: dict[int, float] = {}
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings: continue
+
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for topic_id, tf in postings.items():
+                    length = self._documents[topic_id].length
+                    norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                    scores[topic_id] = scores.get(topic_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            hits = []
+            for topic_id, score in scores.items():
+                document = self._documents[topic_id]
+                if category_ids is None or document.category_id in category_ids:
+                    hits.append(SearchHit(topic_id, document.title, document.category_id, round(score, 6)))
+
+        hits.sort(key=lambda hit: (-hit.score, hit.topic_id))
+        return hits
+
+
+# -----------------------------------------------------------------------------
+# Shared index
+# -----------------------------------------------------------------------------
+
+_index: SearchIndex | None = None
+_building = False
+_pending: list[tuple] = [] # Changes made while a build runs, replayed onto the new index
+_state_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+def build_index() -> SearchIndex:
+    """
+    Build a new index from every topic and reply in the database and make it the shared index.
+    Posts created while the build runs are added to the new index as well.
+    """
+    global _index, _building
+    with _build_lock:
+        with _state_lock: _building = True
+
+        try:
+            index = SearchIndex(SEARCH_CONFIG["k1"], SEARCH_CONFIG["b"])
+            started = time.perf_counter()
+
+            for topic_id, category_id, title, content in stream_query(
+                    "SELECT id, category_id, title, content FROM topics"):
+                index.add_topic(topic_id, category_id, title, content)
+
+            for reply_id, topic_id, text in stream_query(
+                    "SELECT id, topic_id, text FROM replies"):
+                index.add_reply(reply_id, topic_id, text)
+
+            with _state_lock:
+                for change in _pending: _apply(index, change)
+                _index = index
+        finally:
+            with _state_lock:
+                _building = False
+                _pending.clear()
+
+    logger.info("Search index built: %d topics in %.1f ms", len(index), (time.perf_counter() - started) * 1000)
+    return index
+
+def get_index() -> SearchIndex:
+    """
+    Get the shared index, building it on first use. A stale index keeps being served
+    while a background thread rebuilds it.
+    """
+    global _building
+    index = _index
+    if index is None:
+        with _build_lock: index = _index # Another thread may be building it already
+        return index or build_index()
+
+    if time.monotonic() - index.built_at > SEARCH_CONFIG["max_age_seconds"]:
+        with _state_lock:
+            if _building: return index
+            _building = True # Start recording changes for the new index right away
+
+        threading.Thread(target=_rebuild_quietly, name="search-index-rebuild", daemon=True).start()
+
+    return index
+
+def _rebuild_quietly():
+    try: build_index()
+    except Exception: logger.exception("Rebuilding the search index failed")
+
+def _apply(index: SearchIndex, change: tuple):
+    kind, *args = change
+    if kind == "topic": index.add_topic(*args)
+    else: index.add_reply(*args)
+
+def _record(change: tuple):
+    with _state_lock:
+        if _building: _pending.append(change)
+        index = _index
+
+    # Without an index there is nothing to update; the first build reads the post from the database
+    if index is not None: _apply(index, change)
+
+def index_topic(topic_id: int, category_id: int, title: str, content: str):
+    """
+    Add a newly created topic to the search index.
+    """
+    _record(("topic", topic_id, category_id, title, content))
+
+def index_reply(reply_id: int, topic_id: int, text: str):
+    """
+    Add a newly created reply to the search index.
+    """
+    _record(("reply", reply_id, topic_id, text))
+
+def reset_index():
+    """
+    Drop the shared index, so the next search rebuilds it.
+    """
+    global _index
+    with _state_lock: _index = None
+
+def search(query: str, *, category_ids: set[int] | None = None, after: tuple[float, int] | None = None,
+           limit: int = 10) -> list[SearchHit]:
+    """
+    Search topics by their title, content and replies, best match first.
+
+    Args:
+        query (str): Free text query.
+        category_ids (set[int] | None): Only return topics of these categories. None for all.
+        after (tuple[float, int] | None): (score, topic_id) of the last hit of the previous page.
+        limit (int): Maximum number of hits to return.
+
+    Returns:
+        list[SearchHit]: The hits of the page.
+    """
+    hits = get_index().search(query, category_ids=category_ids)
+
+    if after is not None:
+        score, topic_id = after
+        hits = [hit for hit in hits if hit.score < score or (hit.score == score and hit.topic_id > topic_id)]
+
+    return hits[:limit]
@@ -1,66 +1,242 @@
-from data.database import read_query, insert_query, update_query
+from data.database import read_query, stream_query, insert_query, update_query, transaction
+from data.async_database import read_query as read_query_async
 from data.models import Topic, TopicCreate
+from utils.pagination import InvalidCursorError, encode_cursor, decode_cursor
+from services import search_service, loaders
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# Topics (aliased as t) with their author. Shared with categories_service, so every topic
+# listing returns the same columns in the order Topic.from_query_result() takes them.
+SELECT_TOPICS = """
+        SELECT t.id, t.title, t.content, t.category_id, t.user_id, t.is_locked, t.best_reply_id, t.created_at,
+               u.username, u.avatar_url
+        FROM topics t
+        JOIN users u ON t.user_id = u.id"""
+
+# Columns topics can be sorted and paged by, with the parser of their cursor value.
+# Every key is paired with t.id as tiebreaker, so the order is total and stable.
+TOPIC_SORT_KEYS = {
+    "created_at": ("t.created_at", datetime.fromisoformat),
+    "id": ("t.id", int),
+    "title": ("t.title", str),
+}
+SORT_ORDERS = ("asc", "desc")
+
+def order_by(sort_by: str = "created_at", order: str = "desc") -> str:
+    """
+    Build the ORDER BY clause of a topics query (topics aliased as t) for a whitelisted sort key.
+
+    Raises:
+        ValueError: If the sort key or order is not whitelisted.
+    """
+    if sort_by not in TOPIC_SORT_KEYS: raise ValueError(f"Cannot sort topics by '{sort_by}'.")
+    if order not in SORT_ORDERS: raise ValueError(f"Sort order must be one of {', '.join(SORT_ORDERS)}.")
+
+    column, direction = TOPIC_SORT_KEYS[sort_by][0], order.upper()
+    return f"ORDER BY {column} {direction}" + (f", t.id {direction}" if column != "t.id" else "")
 
 
-def all(search: str = None, *, limit: int = None, offset: int = None):
+def all(search: str = None, *, sort_by: str = "created_at", order: str = "desc", limit: int = None, offset: int = None):
     """
-    Retrieve all topics, with optional search by title and pagination.
+    Retrieve all topics sorted by the database, with optional search by title and pagination.
+    Without pagination the rows are streamed from the database instead of loaded at once.
 
     Args:
         search (str | None): Substring to filter topics by title.
+        sort_by (str): One of TOPIC_SORT_KEYS. Defaults to 'created_at'.
+        order (str): 'asc' or 'desc'. Defaults to 'desc'.
         limit (int | None): Maximum number of topics to return.
         offset (int | None): Number of topics to skip (for pagination).
 
     Returns:
         Generator[Topic]: A generator yielding Topic instances from the database.
+
+    Raises:
+        ValueError: If the sort key or order is not whitelisted.
     """
+    sort_clause = order_by(sort_by, order)
+
     if search is None:
-        query = """
-        SELECT id, title, content, category_id, user_id, is_locked, best_reply_id, created_at
-        FROM topics"""
+        query = SELECT_TOPICS
         params: tuple = ()
 
     else:
-        query = """
-        SELECT id, title, content, category_id, user_id, is_locked, best_reply_id, created_at
-        FROM topics
-        WHERE title LIKE ?"""
+        query = SELECT_TOPICS + """
+        WHERE t.title LIKE ?"""
 
         params = (f"%{search}%",)
 
+    query += """
+        """ + sort_clause
+
     if limit is not None and offset is not None:
         query += " LIMIT ? OFFSET ?"
         params += (limit, offset)
 
-    data = read_query(query, params)
+    data = read_query(query, params) if limit is not None else stream_query(query, params)
     return (Topic.from_query_result(*row) for row in data)
 
 
-def sort(topics: list[Topic], *, attribute="title", reverse=False):
+@dataclass
+class TopicPage:
+    """One page of topics with the cursors of its neighbour pages (None at either end)."""
+    topics: list[Topic] = field(default_factory=list)
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def _page_query(search: str = None, category_id: int = None, *, sort_by: str = "created_at",
+                order: str = "desc", cursor: str = None, size: int = 5) -> tuple[str, tuple, dict]:
     """
-    Sort a list of topics by a given attribute.
+    Build the keyset query shared by page() and page_async().
+
+    Returns:
+        tuple: The query, its params and the page position needed by _to_page().
+
+    Raises:
+        ValueError: If the sort key, order or cursor are invalid.
+    """
+    direction, position = "next", None
+    if cursor is not None:
+        data = decode_cursor(cursor)
+        sort_by, order, direction, position = data.get("s"), data.get("o"), data.get("d"), data.get("v")
+        if direction not in ("next", "prev") or not isinstance(sort_by, str) or not isinstance(order, str):
+            raise InvalidCursorError("Malformed cursor.")
+
+    order_by(sort_by, order) # Validates both
+    if size < 1: raise ValueError("Page size must be positive.")
+
+    column, parse = TOPIC_SORT_KEYS[sort_by]
+
+    # Paging backwards flips the comparison and the order; _to_page() restores the order
+    descending = (order == "desc") != (direction == "prev")
+    op = "<" if descending else ">"
+
+    conditions, params = [], []
+    if category_id is not None:
+        conditions.append("t.category_id = ?")
+        params.append(category_id)
+    if search is not None:
+        conditions.append("t.title LIKE ?")
+        params.append(f"%{search}%")
+
+    if position is not None:
+        try: value, last_id = parse(position[0]), int(position[1])
+        except (TypeError, ValueError, IndexError, KeyError) as e: raise InvalidCursorError("Malformed cursor.") from e
+
+        if column == "t.id":
+            conditions.append(f"t.id {op} ?")
+            params.append(last_id)
+        else:
+            conditions.append(f"({column} {op} ? OR ({column} = ? AND t.id {op} ?))")
+            params += [value, value, last_id]
+
+    query = SELECT_TOPICS
+    if conditions: query += """
+        WHERE """ + " AND ".join(conditions)
+
+    query += f"""
+        {order_by(sort_by, "desc" if descending else "asc")}
+        LIMIT ?"""
+    params.append(size + 1) # One extra row tells whether there is a further page
+
+    return query, tuple(params), {"s": sort_by, "o": order, "d": direction, "from_cursor": position is not None, "size": size}
+
+def _to_page(rows: list, position: dict) -> TopicPage:
+    """
+    Turn the rows of a _page_query() into a TopicPage with next/prev cursors.
+    """
+    size, forward = position["size"], position["d"] == "next"
+    has_more = len(rows) > size
+
+    topics = [Topic.from_query_result(*row) for row in rows[:size]]
+    if not forward: topics.reverse()
+    if not topics: return TopicPage()
+    _loader().prime_many(topics)
+
+    def cursor_at(topic: Topic, direction: str) -> str:
+        return encode_cursor({"s": position["s"], "o": position["o"], "d": direction,
+                              "v": [getattr(topic, position["s"]), topic.id]})
+
+    # Coming from a cursor means there is a page on the side we came from
+    more_after = has_more if forward else position["from_cursor"]
+    more_before = position["from_cursor"] if forward else has_more
+
+    return TopicPage(
+        topics=topics,
+        next_cursor=cursor_at(topics[-1], "next") if more_after else None,
+        prev_cursor=cursor_at(topics[0], "prev") if more_before else None)
+
+
+def page(search: str = None, category_id: int = None, *, sort_by: str = "created_at",
+         order: str = "desc", cursor: str = None, size: int = 5) -> TopicPage:
+    """
+    Retrieve one page of topics with keyset (cursor) pagination, sorted in the database.
+
+    A cursor from a previous page fixes the sort key and order, so they can be omitted
+    when following one. Every page costs the same, however deep it is.
 
     Args:
-        topics (list[Topic]): List of topics to sort.
-        attribute (str): Attribute to sort by ('title', 'content', 'id'). Defaults to 'title'.
-        reverse (bool): Whether to sort in descending order. Defaults to False.
+        search (str | None): Substring to filter topics by title.
+        category_id (int | None): Only topics of this category.
+        sort_by (str): One of TOPIC_SORT_KEYS. Defaults to 'created_at'.
+        order (str): 'asc' or 'desc'. Defaults to 'desc'.
+        cursor (str | None): next_cursor or prev_cursor of a previous page.
+        size (int): Number of topics per page.
 
     Returns:
-        list[Topic]: A sorted list of topics.
+        TopicPage: The topics with the cursors of the next and previous page.
+
+    Raises:
+        ValueError: If the sort key, order, size or cursor are invalid.
     """
-    if attribute == "title":
-        sort_fn = lambda t: t.title
-    elif attribute == "content":
-        sort_fn = lambda t: t.content
-    else:
-        sort_fn = lambda t: t.id
+    query, params, position = _page_query(search, category_id, sort_by=sort_by, order=order, cursor=cursor, size=size)
+    return _to_page(read_query(query, params), position)
+
+
+async def page_async(search: str = None, category_id: int = None, *, sort_by: str = "created_at",
+                     order: str = "desc", cursor: str = None, size: int = 5) -> TopicPage:
+    """
+    Async version of page(), for async route handlers.
+    """
+    query, params, position = _page_query(search, category_id, sort_by=sort_by, order=order, cursor=cursor, size=size)
+    return _to_page(await read_query_async(query, params), position)
+
+
+def _select_topics_by_ids(ids) -> tuple[str, tuple]:
+    ids = tuple(sorted(ids))
+    return SELECT_TOPICS + f"""
+        WHERE t.id IN ({", ".join("?" * len(ids))})""", ids
+
+def get_by_ids(ids) -> dict[int, Topic]:
+    """
+    Retrieve many topics with one query.
+
+    Args:
+        ids (Iterable[int]): IDs of the topics.
+
+    Returns:
+        dict[int, Topic]: The found topics by ID. Missing IDs are left out.
+    """
+    if not ids: return {}
+    rows = read_query(*_select_topics_by_ids(ids))
+    return {topic.id: topic for topic in (Topic.from_query_result(*row) for row in rows)}
 
-    return sorted(topics, key=sort_fn, reverse=reverse)
+async def get_by_ids_async(ids) -> dict[int, Topic]:
+    """
+    Async version of get_by_ids(), for async route handlers.
+    """
+    if not ids: return {}
+    rows = await read_query_async(*_select_topics_by_ids(ids))
+    return {topic.id: topic for topic in (Topic.from_query_result(*row) for row in rows)}
 
+def _loader():
+    return loaders.get_loader("topics", get_by_ids, get_by_ids_async)
 
 def get_by_id(id: int):
     """
-    Retrieve a topic from the database by its unique ID.
+    Retrieve a topic by its unique ID, at most once per request.
 
     Args:
         id (int): Unique identifier for the topic.
@@ -68,12 +244,17 @@ def get_by_id(id: int):
     Returns:
         Topic | None: The Topic instance if found, else None.
     """
-    data = read_query(
-        """SELECT id, title, content, category_id, user_id, is_locked, best_reply_id, created_at
-            FROM topics 
-            WHERE id = ?""", (id,))
+    return _loader().load(id)
+
+
+async def get_by_id_async(id: int):
+    """
+    Async version of get_by_id(), for async route handlers.
 
-    return next((Topic.from_query_result(*row) for row in data), None)
+    Returns:
+        Topic | None: The Topic instance if found, else None.
+    """
+    return await _loader().load_async(id)
 
 
 def create(topic: TopicCreate, user_id: int):
@@ -93,7 +274,9 @@ def create(topic: TopicCreate, user_id: int):
 
     if not new_id:
         return None
-    
+
+    search_service.index_topic(new_id, topic.category_id, topic.title, topic.content)
+
     return Topic(
         id=new_id,
         title=topic.title,
@@ -116,6 +299,7 @@ def select_best_reply(topic_id: int, reply_id: int) -> bool:
         bool: True if the update succeeded (row was changed), False otherwise.
     """
     sql = "UPDATE topics SET best_reply_id = ? WHERE id = ?"
+    loaders.forget("topics", topic_id)
     return update_query(sql, (reply_id, topic_id)) > 0
 
 def set_locked(topic_id: int, locked: bool) -> bool:
@@ -130,6 +314,7 @@ def set_locked(topic_id: int, locked: bool) -> bool:
         bool: True if the update affected one row, False otherwise.
     """
     sql = "UPDATE topics SET is_locked = ? WHERE id = ?"
+    loaders.forget("topics", topic_id)
     return update_query(sql, (1 if locked else 0, topic_id)) == 1
 
 def toggle_lock(topic_id: int) -> bool:
@@ -142,9 +327,10 @@ def toggle_lock(topic_id: int) -> bool:
     Returns:
         bool: True if the lock status was toggled successfully, False otherwise.
     """
-    result = read_query("SELECT is_locked FROM topics WHERE id = ?", (topic_id,))
-    if not result:
-        return False
+    with transaction():
+        result = read_query("SELECT is_locked FROM topics WHERE id = ? FOR UPDATE", (topic_id,))
+        if not result:
+            return False
 
-    current_status = result[0][0]
-    return set_locked(topic_id, not current_status)
\ No newline at end of file
+        current_status = result[0][0]
+        return set_locked(topic_id, not current_status)
\ No newline at end of file
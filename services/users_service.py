@@ -1,9 +1,28 @@
 from data.models import User, UserLoginData, UserRegisterData
 from mariadb import IntegrityError
 from utils.auth_utils import *
+from utils.cache import TTLCache
+from services import loaders
+import os
 
 # Default db import, will be overriden when injected
 import data.database as db
+import data.async_database as async_db
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Authenticated users are cached by id and decoded tokens   #
+#       are memoized, so auth costs no queries on the hot path.   #
+#       Every function that changes a user row must call          #
+#       invalidate_user(user_id) after the write.                 #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+USER_CACHE_CONFIG = {
+    "max_size": int(os.getenv("USER_CACHE_MAX_SIZE", 10000)),
+    "ttl_seconds": float(os.getenv("USER_CACHE_TTL_SECONDS", 60)),
+}
+
+_users_by_id = TTLCache(**USER_CACHE_CONFIG)
+_decoded_tokens = TTLCache(**USER_CACHE_CONFIG)
 
 def _get_db(test_db = None):
     """
@@ -17,6 +36,46 @@ def _get_db(test_db = None):
     """
     return test_db or db
 
+def _decode_token(token: str) -> dict | None:
+    """
+    Memoized decode_user_token(). Only valid tokens are remembered.
+    """
+    if not token: return None
+
+    decoded = _decoded_tokens.get(token)
+    if decoded is None:
+        decoded = decode_user_token(token)
+        if decoded: _decoded_tokens.set(token, decoded)
+    return decoded
+
+def _cached_user(user_id: int) -> User | None:
+    """
+    Get a copy of a cached user, so callers can't alter the cached object.
+    """
+    user = _users_by_id.get(user_id)
+    return user.model_copy() if user else None
+
+def _cache_user(user: User | None) -> User | None:
+    if user: _users_by_id.set(user.id, user.model_copy())
+    return user
+
+def invalidate_user(user_id: int):
+    """
+    Drop a user from the identity cache. Must be called after every change of a user row.
+
+    Args:
+        user_id (int): The id of the changed user.
+    """
+    _users_by_id.pop(user_id)
+    loaders.forget("users", user_id)
+
+def clear_user_cache():
+    """
+    Drop every cached user and decoded token.
+    """
+    _users_by_id.clear()
+    _decoded_tokens.clear()
+
 def register_user(user: UserRegisterData, test_db = None) -> User | None:
     """
     Register a new user in the database.
@@ -80,7 +139,8 @@ def find_user_by_username(username: str, test_db = None) -> User | None:
     
 def find_user_by_id(id: int, test_db = None) -> User | None:
     """
-    Find a user by ID.
+    Find a user by ID. Served from the request's user loader and the identity cache
+    unless test_db is given.
 
     Args:
         id (int): The user ID to search for.
@@ -90,14 +150,56 @@ def find_user_by_id(id: int, test_db = None) -> User | None:
         User: The User object if found.
         None: If not found.
     """
-    used_db = _get_db(test_db)
-    
-    user_data = used_db.read_query("SELECT * FROM users WHERE id = ?", (id,))
+    if test_db is None: return loaders.get_loader("users", find_users_by_ids).load(id)
+
+    user_data = test_db.read_query("SELECT * FROM users WHERE id = ?", (id,))
     return next((User.from_query_result(*row) for row in user_data), None)
 
+def load_users(ids) -> dict[int, User | None]:
+    """
+    Find many users by ID through the request's user loader: the ones not loaded yet in
+    this request are fetched with one query, and later find_user_by_id() calls for any
+    of them cost nothing.
+
+    Args:
+        ids (Iterable[int]): The user IDs to search for.
+
+    Returns:
+        dict[int, User | None]: The users by ID, None for missing ones.
+    """
+    return loaders.get_loader("users", find_users_by_ids).load_many(ids)
+
+def find_users_by_ids(ids, test_db = None) -> dict[int, User]:
+    """
+    Find many users by ID with a single query. Cached users are not queried again.
+
+    Args:
+        ids (Iterable[int]): The user IDs to search for.
+        test_db: Optional database object for testing.
+
+    Returns:
+        dict[int, User]: The found users by ID. Missing IDs are left out.
+    """
+    users, missing = {}, []
+    for id in set(ids):
+        user = _cached_user(id) if test_db is None else None
+        if user: users[id] = user
+        else: missing.append(id)
+
+    if missing:
+        used_db = _get_db(test_db)
+        placeholders = ", ".join("?" * len(missing))
+        user_data = used_db.read_query(f"SELECT * FROM users WHERE id IN ({placeholders})", tuple(missing))
+        for row in user_data:
+            user = User.from_query_result(*row)
+            users[user.id] = _cache_user(user) if test_db is None else user
+
+    return users
+
 def find_user_by_token(token: str, test_db = None) -> User | None:
     """
     Decode a user token and return the corresponding User object.
+    Both the decoded token and the user are cached, so a repeated token costs no queries.
 
     Args:
         token (str): The user authentication token.
@@ -107,10 +209,35 @@ def find_user_by_token(token: str, test_db = None) -> User | None:
         User: The User object if found.
         None: If not found or token is invalid.
     """
-    result = decode_user_token(token)
-    if not result: return None
-    _, username = result.values()
-    return find_user_by_username(username, test_db)
+    decoded = _decode_token(token)
+    if not decoded: return None
+
+    user = find_user_by_id(decoded["id"], test_db)
+    return user if user and user.username == decoded["username"] else None
+
+async def find_user_by_token_async(token: str, test_db = None) -> User | None:
+    """
+    Async version of find_user_by_token(), for async route handlers.
+
+    Args:
+        token (str): The user authentication token.
+        test_db: Optional async database object for testing.
+
+    Returns:
+        User: The User object if found.
+        None: If not found or token is invalid.
+    """
+    decoded = _decode_token(token)
+    if not decoded: return None
+
+    user = _cached_user(decoded["id"]) if test_db is None else None
+    if user is None:
+        used_db = test_db or async_db
+        user_data = await used_db.read_query("SELECT * FROM users WHERE id = ?", (decoded["id"],))
+        user = next((User.from_query_result(*row) for row in user_data), None)
+        if test_db is None: _cache_user(user)
+
+    return user if user and user.username == decoded["username"] else None
 
 def is_user_authenticated(token: str, test_db = None) -> bool:
     """
@@ -147,7 +274,9 @@ def update_user_avatar_url(user_id: int, avatar_url: str, test_db = None) -> boo
         bool: True if update successful, False otherwise.
     """
     used_db = _get_db(test_db)
-    return used_db.update_query("UPDATE users SET avatar_url = ? WHERE id = ?", (avatar_url, user_id,))
+    updated = used_db.update_query("UPDATE users SET avatar_url = ? WHERE id = ?", (avatar_url, user_id,))
+    invalidate_user(user_id)
+    return updated
 
 def get_avatar_by_username(username: str, test_db = None) -> str | None:
     """
@@ -181,6 +310,8 @@ def get_avatar_by_user_id(user_id: int, test_db = None) -> str | None:
         str: The avatar url,
         None: If avatar url is NULL in db.
     """
+    if test_db is None and (user := _cached_user(user_id)): return user.avatar_url
+
     used_db = _get_db(test_db)
     try:
         return used_db.read_query("SELECT avatar_url FROM users WHERE id = ?", (user_id,))[0][0]
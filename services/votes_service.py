@@ -1,6 +1,44 @@
-from data.database import read_query, insert_query, update_query
-from data.models import Vote
+from data.database import read_query, insert_query, insert_many_query, update_query, update_many_query, transaction, note_write
+from data.async_database import read_query as read_query_async
+from data.models import Reply, Vote
+from services import loaders
+from utils.write_buffer import WriteBehindBuffer
+from mariadb import IntegrityError
+import logging
+import os
 
+logger = logging.getLogger(__name__)
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Votes cast through record_vote() are buffered in memory,  #
+#       coalesced per (reply, user), and written with vote_many() #
+#       every VOTE_FLUSH_SECONDS or once VOTE_BUFFER_MAX_PENDING  #
+#       votes are waiting. The app flushes them on shutdown. The  #
+#       replies' vote counters include the votes still buffered.  #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+# Load vote buffer config from .env. A flush interval of 0 writes every vote right away.
+VOTE_BUFFER_CONFIG = {
+    "flush_seconds": float(os.getenv("VOTE_FLUSH_SECONDS", 1)),
+    "max_pending": int(os.getenv("VOTE_BUFFER_MAX_PENDING", 500)),
+}
+
+# Keeps the replies' vote counters in step with the votes table, see _count_change()
+_UPDATE_REPLY_COUNTS = "UPDATE replies SET up_count = up_count + ?, down_count = down_count + ? WHERE id = ?"
+
+_RECONCILE_REPLY_COUNTS = """
+        UPDATE replies r
+        LEFT JOIN (
+            SELECT reply_id, SUM(type_vote = 'up') AS up_count, SUM(type_vote = 'down') AS down_count
+            FROM votes
+            GROUP BY reply_id) v ON v.reply_id = r.id
+        SET r.up_count = COALESCE(v.up_count, 0), r.down_count = COALESCE(v.down_count, 0)
+        WHERE r.up_count <> COALESCE(v.up_count, 0) OR r.down_count <> COALESCE(v.down_count, 0)
+    """
+
+def _count_change(old_type: str | None, new_type: str) -> tuple[int, int]:
+    """Get the (up, down) counter change of replacing a user's vote (None if there was none)."""
+    return (new_type == "up") - (old_type == "up"), (new_type == "down") - (old_type == "down")
 
 def vote(reply_id: int, user_id: int, type_vote: str):
     """
@@ -20,46 +58,181 @@ def vote(reply_id: int, user_id: int, type_vote: str):
         Vote: The created or updated Vote object.
     """
 
-    rows = read_query("SELECT id, type_vote FROM votes WHERE reply_id = ? AND user_id = ?",
-        (reply_id, user_id))
+    # Lock the (reply, user) vote row so concurrent clicks can't both insert
+    with transaction():
+        rows = read_query("SELECT id, type_vote FROM votes WHERE reply_id = ? AND user_id = ? FOR UPDATE",
+            (reply_id, user_id))
 
-    existing = next(iter(rows), None)
-    if existing is None:
-        new_id = insert_query(
-            "INSERT INTO votes (reply_id, user_id, type_vote) VALUES (?, ?, ?)",
-            (reply_id, user_id, type_vote))
-        return Vote.from_query_result(new_id, reply_id, user_id, type_vote)
-    else:
-        vote_id, old_type = existing
-        if old_type == type_vote:
-            return Vote.from_query_result(vote_id, reply_id, user_id, old_type)
+        existing = next(iter(rows), None)
+        if existing is None:
+            new_id = insert_query(
+                "INSERT INTO votes (reply_id, user_id, type_vote) VALUES (?, ?, ?)",
+                (reply_id, user_id, type_vote))
+            update_query(_UPDATE_REPLY_COUNTS, (*_count_change(None, type_vote), reply_id))
+            return Vote.from_query_result(new_id, reply_id, user_id, type_vote)
+        else:
+            vote_id, old_type = existing
+            if old_type == type_vote:
+                return Vote.from_query_result(vote_id, reply_id, user_id, old_type)
 
-        update_query(
-            "UPDATE votes SET type_vote = ? WHERE id = ?",
-            (type_vote, vote_id))
-        return Vote.from_query_result(vote_id, reply_id, user_id, type_vote)
+            update_query(
+                "UPDATE votes SET type_vote = ? WHERE id = ?",
+                (type_vote, vote_id))
+            update_query(_UPDATE_REPLY_COUNTS, (*_count_change(old_type, type_vote), reply_id))
+            return Vote.from_query_result(vote_id, reply_id, user_id, type_vote)
 
 
-def count_votes_for_replies(topic_id: int) -> dict[int, dict[str, int]]:
+def vote_many(votes: list[tuple[int, int, str]]) -> int:
     """
-    Count upvotes and downvotes for all replies in a topic.
+    Create or update many votes at once with a bulk upsert, and update the replies' vote
+    counters in the same transaction. The last vote of a user on a reply wins, like calling
+    vote() for each item in order.
 
     Args:
-        topic_id (int): The ID of the topic whose replies are counted.
+        votes (list[tuple[int, int, str]]): (reply_id, user_id, type_vote) tuples.
+
+    Returns:
+        int: The number of distinct (reply, user) votes written.
+    """
+    # Only the latest vote per (reply, user) matters, don't send the others at all
+    latest = {(reply_id, user_id): type_vote for reply_id, user_id, type_vote in votes}
+    if not latest: return 0
+
+    with transaction():
+        # Lock the votes being replaced, their old type decides the counter change
+        stored = _stored_votes(read_query(*_stored_votes_query(latest, for_update=True)))
+
+        insert_many_query(
+            """INSERT INTO votes (reply_id, user_id, type_vote) VALUES (?, ?, ?)
+               ON DUPLICATE KEY UPDATE type_vote = VALUES(type_vote)""",
+            ((reply_id, user_id, type_vote) for (reply_id, user_id), type_vote in latest.items()))
+
+        changes: dict[int, list[int]] = {}
+        for key, type_vote in latest.items():
+            up, down = _count_change(stored.get(key), type_vote)
+            change = changes.setdefault(key[0], [0, 0])
+            change[0] += up
+            change[1] += down
+
+        # Update the replies in id order, like every other batch, to avoid deadlocks between flushes
+        update_many_query(_UPDATE_REPLY_COUNTS,
+            ((up, down, reply_id) for reply_id, (up, down) in sorted(changes.items()) if up or down))
+
+    return len(latest)
+
+
+def reconcile_vote_counts() -> bool:
+    """
+    Recompute the vote counters of every reply from the votes table, e.g. after editing
+    votes by hand. Votes written while it runs may be counted on the next run only.
 
     Returns:
-        dict[int, dict[str, int]]: A dictionary mapping reply IDs to dictionaries
-        with keys 'up' and 'down', containing the respective vote counts.
-        Example: { 17: {'up': 5, 'down': 2}, ... }
-    """
-    data = read_query("""
-        SELECT r.id, 
-        SUM(CASE WHEN v.type_vote = 'up' THEN 1 ELSE 0 END) as up_votes,
-        SUM(CASE WHEN v.type_vote = 'down' THEN 1 ELSE 0 END) as down_votes
-        FROM replies r
-        LEFT JOIN votes v ON r.id = v.reply_id
-        WHERE r.topic_id = ?
-        GROUP BY r.id
-    """, (topic_id,))
-
-    return {reply_id: {"up": up_votes, "down": down_votes} for reply_id, up_votes, down_votes in data}
+        bool: True if any reply's counters were off and got fixed.
+    """
+    return update_query(_RECONCILE_REPLY_COUNTS)
+
+
+def _write_buffered_votes(batch: dict[tuple[int, int], str]):
+    """
+    Write a batch of buffered votes. If the bulk upsert hits a constraint (e.g. a vote on a
+    deleted reply), the votes are written one by one and only the failing ones are dropped.
+    Other errors propagate, so the buffer keeps the batch and retries it.
+    """
+    votes = [(reply_id, user_id, type_vote) for (reply_id, user_id), type_vote in batch.items()]
+    try:
+        vote_many(votes)
+        return
+    except IntegrityError:
+        logger.warning("Bulk vote flush of %d votes failed a constraint, writing them one by one", len(votes))
+
+    for reply_id, user_id, type_vote in votes:
+        try: vote(reply_id, user_id, type_vote)
+        except IntegrityError: logger.warning("Dropped vote of user %s on reply %s", user_id, reply_id, exc_info=True)
+
+_buffer = WriteBehindBuffer(
+    _write_buffered_votes,
+    interval_seconds=VOTE_BUFFER_CONFIG["flush_seconds"] or 1,
+    max_pending=VOTE_BUFFER_CONFIG["max_pending"],
+    name="vote-flusher")
+
+def start_vote_buffer():
+    """
+    Start buffering votes cast with record_vote(). Does nothing if buffering is disabled.
+    """
+    if VOTE_BUFFER_CONFIG["flush_seconds"] > 0: _buffer.start()
+
+def stop_vote_buffer():
+    """
+    Stop buffering votes and write the pending ones.
+    """
+    try: _buffer.stop()
+    except Exception: logger.exception("Could not write %d buffered votes", len(_buffer))
+
+def record_vote(reply_id: int, user_id: int, type_vote: str) -> Vote:
+    """
+    Cast a user's vote on a reply. The vote is buffered and written in the background
+    when the buffer runs and has room, otherwise it is written right away with vote().
+
+    Args:
+        reply_id (int): The ID of the reply being voted on.
+        user_id (int): The ID of the user casting the vote.
+        type_vote (str): The type of vote ("up" or "down").
+
+    Returns:
+        Vote: The vote. Buffered votes have no id yet.
+    """
+    loaders.forget("replies", reply_id) # Its vote counters change
+    if not _buffer.running or not _buffer.put((reply_id, user_id), type_vote):
+        return vote(reply_id, user_id, type_vote)
+
+    note_write() # Keep the voter's next reads on the primary, where the flushed vote lands first
+    return Vote(reply_id=reply_id, user_id=user_id, type_vote=type_vote)
+
+def _pending_votes(reply_ids) -> dict[tuple[int, int], str]:
+    """Get the buffered votes on the given replies."""
+    reply_ids = set(reply_ids)
+    return {key: type_vote for key, type_vote in _buffer.pending().items() if key[0] in reply_ids}
+
+def _stored_votes_query(votes: dict[tuple[int, int], str], for_update: bool = False) -> tuple[str, tuple]:
+    """Query the stored votes of the (reply_id, user_id) keys of votes (and possibly a few more)."""
+    reply_ids = sorted({reply_id for reply_id, _ in votes})
+    user_ids = sorted({user_id for _, user_id in votes})
+    sql = f"""SELECT reply_id, user_id, type_vote FROM votes
+              WHERE reply_id IN ({", ".join("?" * len(reply_ids))}) AND user_id IN ({", ".join("?" * len(user_ids))})"""
+    return sql + (" FOR UPDATE" if for_update else ""), (*reply_ids, *user_ids)
+
+def _stored_votes(rows) -> dict[tuple[int, int], str]:
+    return {(reply_id, user_id): type_vote for reply_id, user_id, type_vote in rows}
+
+def _merge_pending(replies: list[Reply], pending: dict[tuple[int, int], str], stored_rows):
+    """Apply the buffered votes to the replies' stored counters, replacing the votes they overwrite."""
+    stored = _stored_votes(stored_rows)
+    by_id = {reply.id: reply for reply in replies}
+    for key, type_vote in pending.items():
+        up, down = _count_change(stored.get(key), type_vote)
+        reply = by_id[key[0]]
+        reply.up_count += up
+        reply.down_count += down
+
+def with_pending_votes(replies: list[Reply]) -> list[Reply]:
+    """
+    Add the votes still waiting in the vote buffer to the replies' vote counters,
+    so voters see their vote right away.
+
+    Args:
+        replies (list[Reply]): Replies loaded with their stored up_count/down_count.
+
+    Returns:
+        list[Reply]: The same replies, updated in place.
+    """
+    pending = _pending_votes(reply.id for reply in replies)
+    if pending: _merge_pending(replies, pending, read_query(*_stored_votes_query(pending)))
+    return replies
+
+async def with_pending_votes_async(replies: list[Reply]) -> list[Reply]:
+    """
+    Async version of with_pending_votes(), for async route handlers.
+    """
+    pending = _pending_votes(reply.id for reply in replies)
+    if pending: _merge_pending(replies, pending, await read_query_async(*_stored_votes_query(pending)))
+    return replies
@@ -0,0 +1,107 @@
+import unittest
+import gzip
+import tempfile
+import os
+from pathlib import Path
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from common.assets import AssetManifest, AssetStaticFiles, IMMUTABLE_CACHE_CONTROL
+
+
+class AssetManifest_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = Path(self.directory.name)
+        (self.root / "css").mkdir()
+        (self.root / "css" / "site.css").write_text("body { color: red; }")
+        (self.root / "css" / "site.css.gz").write_bytes(gzip.compress(b"body { color: red; }"))
+        self.manifest = AssetManifest(self.root)
+
+    def test_hashesFileNames_byContent(self):
+        hashed = self.manifest.hashed_path("css/site.css")
+
+        self.assertRegex(hashed, r"^css/site\.[0-9a-f]{10}\.css$")
+        self.assertEqual(self.manifest.original_path(hashed), "css/site.css")
+        self.assertEqual(self.manifest.url("/css/site.css"), f"/static/{hashed}")
+
+    def test_skipsPrecompressedVariants(self):
+        self.assertEqual(list(self.manifest.build()), ["css/site.css"])
+
+    def test_changesHash_whenContentChanges(self):
+        before = self.manifest.hashed_path("css/site.css")
+        (self.root / "css" / "site.css").write_text("body { color: blue; }")
+        self.manifest.build()
+
+        self.assertNotEqual(self.manifest.hashed_path("css/site.css"), before)
+
+    def test_keepsUnknownPaths(self):
+        self.assertEqual(self.manifest.url("css/missing.css"), "/static/css/missing.css")
+
+
+class AssetStaticFiles_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        Path(self.directory.name, "app.js").write_text("console.log('hi');")
+        self.manifest = AssetManifest(self.directory.name)
+
+        app = FastAPI()
+        app.mount("/static", AssetStaticFiles(directory=self.directory.name, manifest=self.manifest))
+        self.client = TestClient(app)
+
+    def test_servesHashedNames_asImmutable(self):
+        response = self.client.get(self.manifest.url("app.js"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "console.log('hi');")
+        self.assertEqual(response.headers["cache-control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertIn("etag", response.headers)
+
+    def test_answersNotModified_forKnownETag(self):
+        etag = self.client.get(self.manifest.url("app.js")).headers["etag"]
+        response = self.client.get(self.manifest.url("app.js"), headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["cache-control"], IMMUTABLE_CACHE_CONTROL)
+
+    def test_revalidatesHashedNames_ofFilesChangedSinceBuild(self):
+        url = self.manifest.url("app.js")
+        Path(self.directory.name, "app.js").write_text("console.log('changed');")
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+
+    def test_servesHashedNames_fromFreshVariant_asImmutable(self):
+        source = Path(self.directory.name, "app.js")
+        Path(f"{source}.gz").write_bytes(gzip.compress(source.read_bytes()))
+        url = self.manifest.url("app.js")
+
+        response = self.client.get(url, headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.text, "console.log('hi');")
+        self.assertEqual(response.headers["cache-control"], IMMUTABLE_CACHE_CONTROL)
+
+    def test_skipsStaleVariant_forHashedNames(self):
+        source = Path(self.directory.name, "app.js")
+        variant = Path(f"{source}.gz")
+        variant.write_bytes(gzip.compress(b"console.log('old');"))
+        os.utime(variant, (0, source.stat().st_mtime - 60))
+
+        response = self.client.get(self.manifest.url("app.js"), headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.text, "console.log('hi');")
+        self.assertEqual(response.headers["cache-control"], IMMUTABLE_CACHE_CONTROL)
+
+    def test_revalidatesPlainNames(self):
+        response = self.client.get("/static/app.js")
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+
+    def test_returnsNotFound_forUnknownHashes(self):
+        self.assertEqual(self.client.get("/static/app.0000000000.js").status_code, 404)
@@ -0,0 +1,47 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from data import async_database
+from data.async_database import _to_driver_sql
+
+class ToDriverSql_Should(unittest.TestCase):
+
+    def test_convertsPlaceholders_andEscapesPercent(self):
+        self.assertEqual(_to_driver_sql("SELECT * FROM t WHERE a = ? AND b LIKE ?"),
+                         "SELECT * FROM t WHERE a = %s AND b LIKE %s")
+        self.assertEqual(_to_driver_sql("SELECT 100 % 7"), "SELECT 100 %% 7")
+
+    def test_keepsQuestionMarks_insideLiterals(self):
+        self.assertEqual(_to_driver_sql("SELECT * FROM t WHERE title LIKE '%why?%' AND id = ?"),
+                         "SELECT * FROM t WHERE title LIKE '%%why?%%' AND id = %s")
+        self.assertEqual(_to_driver_sql('SELECT "a?b", `c?d` FROM t WHERE e = ?'),
+                         'SELECT "a?b", `c?d` FROM t WHERE e = %s')
+
+    def test_handlesEscapedAndDoubledQuotes(self):
+        self.assertEqual(_to_driver_sql("SELECT 'it\\'s?', 'it''s?' FROM t WHERE a = ?"),
+                         "SELECT 'it\\'s?', 'it''s?' FROM t WHERE a = %s")
+
+
+class AsyncPool_Should(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await async_database.close_pool()
+
+    async def test_getPool_createsPoolOnce_perLoop(self):
+        with patch("data.async_database.aiomysql.create_pool", AsyncMock(return_value=MagicMock(wait_closed=AsyncMock()))) as create:
+            first = await async_database._get_pool()
+            self.assertIs(await async_database._get_pool(), first)
+        create.assert_awaited_once()
+
+
+
+class AsyncPoolLoops_Should(unittest.TestCase):
+
+    def test_getPool_recreatesPool_inNewEventLoop(self):
+        self.addCleanup(lambda: asyncio.run(async_database.close_pool()))
+        pools = [MagicMock(wait_closed=AsyncMock()), MagicMock(wait_closed=AsyncMock())]
+        with patch("data.async_database.aiomysql.create_pool", AsyncMock(side_effect=pools)):
+            first = asyncio.run(async_database._get_pool())
+            second = asyncio.run(async_database._get_pool()) # A new loop, as under IsolatedAsyncioTestCase
+
+        self.assertEqual([first, second], pools)
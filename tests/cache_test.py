@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+from utils.cache import TTLCache
+
+class TTLCache_Should(unittest.TestCase):
+
+    def test_get_returnsValue_when_set(self):
+        cache = TTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIn("a", cache)
+
+    def test_get_returnsDefault_when_expired(self):
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        with patch('utils.cache.time.monotonic', return_value=100):
+            cache.set("a", 1)
+        with patch('utils.cache.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_set_evictsLeastRecentlyUsed_when_full(self):
+        cache = TTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertIn("c", cache)
+
+    def test_pop_dropsValue(self):
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.pop("a")
+        cache.pop("missing")
+        self.assertNotIn("a", cache)
+
+    def test_set_doesNothing_when_ttlIsZero(self):
+        cache = TTLCache(ttl_seconds=0)
+        cache.set("a", 1)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
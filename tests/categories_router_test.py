@@ -0,0 +1,23 @@
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routers.api import categories_router
+
+app = FastAPI()
+app.include_router(categories_router.api_categories_router)
+
+
+class GetCategoryTopics_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_rejectsInvalidPageSize(self):
+        with patch.object(categories_router.topics_service, "page") as page:
+            for size in (0, -1, 101):
+                with self.subTest(size=size):
+                    response = self.client.get(f"/api/categories/1/topics?size={size}")
+                    self.assertEqual(response.status_code, 422)
+
+        page.assert_not_called()
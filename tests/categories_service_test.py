@@ -12,6 +12,10 @@ def fake_topic(id=1, title="T", content="C", category_id=1, user_id=2, is_locked
 
 class CategoriesService_Should(unittest.TestCase):
 
+    def setUp(self):
+        service.invalidate_catalog()
+        self.addCleanup(service.invalidate_catalog)
+
     def test_all_returnsCategoryList(self):
         with patch('services.categories_service.read_query') as mock_query:
             mock_query.return_value = [
@@ -22,9 +26,10 @@ class CategoriesService_Should(unittest.TestCase):
             self.assertEqual(len(result), 2)
             self.assertEqual(result[0].name, "General")
             self.assertEqual(result[1].is_private, 1)
+            self.assertTrue(mock_query.call_args.kwargs["primary"]) # Never cache a lagging replica's flags
 
     def test_topics_by_category_returnsTopics(self):
-        with patch('services.categories_service.read_query') as mock_query:
+        with patch('services.categories_service.stream_query') as mock_query:
             mock_query.return_value = [
                 (1, "T1", "Cont", 5, 2, 0, None, None),
                 (2, "T2", "Cont2", 5, 3, 1, 6, None)
@@ -33,11 +38,19 @@ class CategoriesService_Should(unittest.TestCase):
             self.assertEqual(len(result), 2)
             self.assertEqual(result[1].title, "T2")
 
+    def test_topics_by_category_filtersByCategory_when_searching(self):
+        with patch('services.categories_service.stream_query') as mock_query:
+            mock_query.return_value = [(1, "T1", "Cont", 5, 2, 0, None, None, "emko", None)]
+            result = list(service.topics_by_category(5, "T"))
+            self.assertEqual(result[0].username, "emko")
+            self.assertIn("t.category_id = ?", mock_query.call_args[0][0])
+            self.assertEqual(mock_query.call_args[0][1], (5, "%T%"))
+            self.assertIn("ORDER BY t.created_at DESC, t.id DESC", mock_query.call_args[0][0])
+
     def test_exists_true_and_false(self):
         with patch('services.categories_service.read_query') as mock_query:
             mock_query.return_value = [(1, "General", 0, 0)]
             self.assertTrue(service.exists(1))
-            mock_query.return_value = []
             self.assertFalse(service.exists(2))
 
     def test_get_by_id_found_and_none(self):
@@ -45,9 +58,33 @@ class CategoriesService_Should(unittest.TestCase):
             mock_query.return_value = [(1, "General", 0, 0, None)]
             cat = service.get_by_id(1)
             self.assertIsInstance(cat, Category)
-            mock_query.return_value = []
             self.assertIsNone(service.get_by_id(123))
 
+    def test_catalog_isLoadedOnce_for_repeatedReads(self):
+        with patch('services.categories_service.read_query') as mock_query:
+            mock_query.return_value = [(1, "General", 0, 0, None)]
+            list(service.all())
+            service.get_by_id(1)
+            service.exists(1)
+            mock_query.assert_called_once()
+
+    def test_catalog_isReloaded_after_mutation(self):
+        with patch('services.categories_service.read_query') as mock_query, \
+             patch('services.categories_service.update_query', return_value=1):
+            mock_query.return_value = [(1, "General", 0, 0, None)]
+            self.assertEqual(service.get_by_id(1).is_locked, 0)
+
+            mock_query.return_value = [(1, "General", 0, 1, None)]
+            service.set_locked(1, True)
+            self.assertEqual(service.get_by_id(1).is_locked, 1)
+            self.assertEqual(mock_query.call_count, 2)
+
+    def test_getById_returnsCopy_of_cachedCategory(self):
+        with patch('services.categories_service.read_query') as mock_query:
+            mock_query.return_value = [(1, "General", 0, 0, None)]
+            service.get_by_id(1).name = "Changed"
+            self.assertEqual(service.get_by_id(1).name, "General")
+
     def test_create_returnsCategory(self):
         with patch('services.categories_service.insert_query') as mock_insert:
             mock_insert.return_value = 42
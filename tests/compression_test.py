@@ -0,0 +1,155 @@
+import unittest
+import gzip
+import tempfile
+import os
+from pathlib import Path
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse, Response
+from fastapi.testclient import TestClient
+from common import compression
+from common.compression import CompressionMiddleware, PrecompressedStaticFiles, choose_encoding, precompress_directory
+
+BIG_TEXT = "hello compression " * 100
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+@app.get("/big")
+def big():
+    return PlainTextResponse(BIG_TEXT)
+
+@app.get("/small")
+def small():
+    return PlainTextResponse("tiny")
+
+@app.get("/image")
+def image():
+    return Response(b"\x89PNG" * 200, media_type="image/png")
+
+@app.get("/encoded")
+def encoded():
+    return Response(gzip.compress(BIG_TEXT.encode()), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+@app.get("/stream")
+def stream():
+    return StreamingResponse((f"line {i}\n" for i in range(50)), media_type="application/x-ndjson")
+
+
+class ChooseEncoding_Should(unittest.TestCase):
+
+    def test_honorsQValues(self):
+        self.assertEqual(choose_encoding("br;q=0.5, gzip", ("br", "gzip")), "gzip")
+        self.assertEqual(choose_encoding("gzip;q=0, deflate", ("br", "gzip")), None)
+
+    def test_prefersFirstOffered_onTies(self):
+        self.assertEqual(choose_encoding("gzip, br", ("br", "gzip")), "br")
+
+    def test_acceptsWildcard(self):
+        self.assertEqual(choose_encoding("*", ("gzip",)), "gzip")
+        self.assertEqual(choose_encoding("", ("gzip",)), None)
+
+
+class CompressionMiddleware_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+        patcher = patch.object(compression, "brotli", None) # Test the gzip path whether brotli is installed or not
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, path, encoding="gzip"):
+        return self.client.get(path, headers={"Accept-Encoding": encoding})
+
+    def test_compressesLargeTextResponses(self):
+        response = self.get("/big")
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertLess(int(response.headers["content-length"]), len(BIG_TEXT))
+        self.assertEqual(response.text, BIG_TEXT) # httpx decodes it
+
+    def test_skipsSmallResponses(self):
+        self.assertNotIn("content-encoding", self.get("/small").headers)
+
+    def test_skipsBinaryTypes(self):
+        self.assertNotIn("content-encoding", self.get("/image").headers)
+
+    def test_keepsAlreadyEncodedResponses(self):
+        response = self.get("/encoded")
+        self.assertEqual(response.text, BIG_TEXT)
+
+    def test_skipsClientsWithoutGzip(self):
+        self.assertNotIn("content-encoding", self.get("/big", encoding="identity").headers)
+
+    def test_compressesStreamingResponses(self):
+        response = self.get("/stream")
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertNotIn("content-length", response.headers)
+        self.assertEqual(len(response.text.splitlines()), 50)
+
+
+    def test_passesMessagesSentBeforeTheResponse(self):
+        async def template_app(scope, receive, send):
+            await send({"type": "http.response.debug", "info": {"template": None, "context": {}}}) # What TemplateResponse sends under test
+            await PlainTextResponse(BIG_TEXT)(scope, receive, send)
+
+        client = TestClient(CompressionMiddleware(template_app, minimum_size=100))
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.text, BIG_TEXT)
+
+
+class PrecompressedStaticFiles_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.css = Path(self.directory.name, "css", "site.css")
+        self.css.parent.mkdir()
+        self.css.write_text("body { color: red; }\n" * 200)
+
+        static_app = FastAPI()
+        static_app.mount("/static", PrecompressedStaticFiles(directory=self.directory.name))
+        self.client = TestClient(static_app)
+
+    def test_precompress_writesSmallerGzipVariants_once(self):
+        with patch.object(compression, "brotli", None):
+            self.assertEqual(precompress_directory(self.directory.name), 1)
+            self.assertEqual(precompress_directory(self.directory.name), 0)
+
+        variant = Path(f"{self.css}.gz")
+        self.assertEqual(gzip.decompress(variant.read_bytes()), self.css.read_bytes())
+
+    def test_servesGzipVariant_withOriginalType(self):
+        Path(f"{self.css}.gz").write_bytes(gzip.compress(self.css.read_bytes()))
+
+        response = self.client.get("/static/css/site.css", headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertTrue(response.headers["content-type"].startswith("text/css"))
+        self.assertEqual(response.content, self.css.read_bytes())
+
+    def test_fallsBackToGzip_withoutBrotliVariant(self):
+        Path(f"{self.css}.gz").write_bytes(gzip.compress(self.css.read_bytes()))
+
+        response = self.client.get("/static/css/site.css", headers={"Accept-Encoding": "br, gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+
+    def test_servesOriginal_whenVariantIsOlderThanSource(self):
+        variant = Path(f"{self.css}.gz")
+        variant.write_bytes(gzip.compress(b"body { color: blue; }"))
+        os.utime(variant, (0, self.css.stat().st_mtime - 60)) # Written before the last edit of the source
+
+        response = self.client.get("/static/css/site.css", headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.content, self.css.read_bytes())
+
+    def test_servesOriginal_withoutVariants(self):
+        response = self.client.get("/static/css/site.css", headers={"Accept-Encoding": "gzip"})
+
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.headers["vary"])
@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from data.models import User
+from routers.api import conversations_router
+
+USER = User.from_query_result(1, "emko", "hash", 0, None, None)
+
+app = FastAPI()
+app.include_router(conversations_router.api_conversations_router)
+
+
+class ConversationsRouter_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+        patcher = patch.object(conversations_router, "_generic_validator", return_value=(USER, None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_getConversation_rejectsInvalidPageSize(self):
+        with patch.object(conversations_router.conversation_service, "get_conversation") as get_conversation:
+            for size in (0, -1, conversations_router.conversation_service.MAX_MESSAGES_PAGE_SIZE + 1):
+                with self.subTest(size=size):
+                    response = self.client.get(f"/api/conversations/1?size={size}", headers={"u-token": "t"})
+                    self.assertEqual(response.status_code, 422)
+
+        get_conversation.assert_not_called()
+
+    def test_getConversation_rejectsInvalidCursor(self):
+        response = self.client.get("/api/conversations/1?before=0", headers={"u-token": "t"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_getAllConversations_rejectsInvalidPaging(self):
+        with patch.object(conversations_router.authenticate, "get_user_or_raise_401", return_value=USER), \
+             patch.object(conversations_router.conversation_service, "get_all_conversations") as get_all:
+            for query in ("page=0", "page=-1", "size=0", "size=-5", "size=101"):
+                with self.subTest(query=query):
+                    response = self.client.get(f"/api/conversations/?{query}", headers={"u-token": "t"})
+                    self.assertEqual(response.status_code, 422)
+
+        get_all.assert_not_called()
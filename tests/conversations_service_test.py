@@ -0,0 +1,64 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from data.models import AllConversationsResponse
+import services.conversations_service as service
+
+class ConversationsService_Should(unittest.TestCase):
+
+    def test_getAllConversations_loadsPageAndParticipants_inTwoQueries(self):
+        at = datetime(2025, 5, 19, 10, 20)
+        with patch('services.conversations_service.read_query') as mock_query:
+            mock_query.side_effect = [
+                [(2, "Team", 3, "hi", "emko", at), (1, "Empty", 0, None, None, None)],
+                [(2, 1, "emko"), (1, 1, "emko"), (2, 5, "zoro")],
+            ]
+            result = service.get_all_conversations({1}, limit=2, offset=0)
+
+        self.assertEqual(mock_query.call_count, 2)
+        sql, params = mock_query.call_args_list[0][0]
+        self.assertEqual(sql.count("HAVING COUNT(DISTINCT user_id) = ?"), 2) # stats only for the matching conversations
+        self.assertEqual(params, (1, 1, 1, 1, 2, 0))
+        self.assertEqual(mock_query.call_args_list[1][0][1], (2, 1))
+        self.assertIsInstance(result[0], AllConversationsResponse)
+        self.assertEqual([p.name for p in result[0].participants], ["emko", "zoro"])
+        self.assertEqual((result[0].last_message, result[0].message_count), ("hi", 3))
+        self.assertIsNone(result[1].last_message_at)
+
+    def test_getAllConversations_returnsNone_when_noneFound(self):
+        with patch('services.conversations_service.read_query', return_value=[]) as mock_query:
+            self.assertIsNone(service.get_all_conversations({1, 2}))
+            mock_query.assert_called_once()
+
+    def test_getConversation_returnsNewestPage_oldestFirst_withOlderCursor(self):
+        at = datetime(2025, 5, 19, 10, 20)
+        with patch('services.conversations_service.read_query') as mock_query:
+            mock_query.side_effect = [
+                [(1, "Team")],
+                [(9, "c", "emko", None, at), (8, "b", "emko", None, at), (7, "a", "zoro", None, at)],
+            ]
+            result = service.get_conversation(1, before=10, limit=2)
+
+        sql, params = mock_query.call_args[0]
+        self.assertIn("m.id < ?", sql)
+        self.assertEqual(params, (1, 10, 3))
+        self.assertEqual([m.id for m in result.messages], [8, 9])
+        self.assertEqual(result.older_cursor, 8)
+
+    def test_getConversation_hasNoOlderCursor_on_lastPage(self):
+        at = datetime(2025, 5, 19, 10, 20)
+        with patch('services.conversations_service.read_query') as mock_query:
+            mock_query.side_effect = [[(1, "Team")], [(2, "b", "emko", None, at)]]
+            result = service.get_conversation(1, limit=2)
+
+        self.assertNotIn("m.id < ?", mock_query.call_args[0][0])
+        self.assertIsNone(result.older_cursor)
+
+    def test_getConversation_raisesValueError_forEmptyPage(self):
+        with patch('services.conversations_service.read_query') as mock_query:
+            with self.assertRaises(ValueError): service.get_conversation(1, limit=0)
+            mock_query.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from data.pool import ConnectionPool
+from data.replicas import Replica, ReplicaSet
+from data import database
+
+class Database_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ConnectionPool(MagicMock, min_size=0, max_size=2)
+        patcher = patch('data.database._pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_transaction_runsQueriesOnOneConnection_andCommitsOnce(self):
+        with database.transaction():
+            database.insert_query("INSERT INTO a VALUES (?)", (1,))
+            database.insert_query("INSERT INTO b VALUES (?)", (2,))
+
+        stats = self.pool.stats()
+        conn = self.pool._idle[0].conn
+        self.assertEqual(stats.total_checkouts, 1)
+        conn.begin.assert_called_once()
+        conn.commit.assert_called_once()
+        conn.rollback.assert_not_called()
+
+    def test_transaction_rollsBack_when_blockRaises(self):
+        with self.assertRaises(ValueError):
+            with database.transaction():
+                database.insert_query("INSERT INTO a VALUES (?)", (1,))
+                raise ValueError()
+
+        conn = self.pool._idle[0].conn
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        self.assertEqual(self.pool.stats().in_use, 0)
+
+    def test_transaction_doesNotCheckOut_when_noQueries(self):
+        with database.transaction(): pass
+        self.assertEqual(self.pool.stats().total_checkouts, 0)
+
+    def test_nestedTransaction_joinsOuter(self):
+        with database.transaction():
+            database.insert_query("INSERT INTO a VALUES (?)", (1,))
+            with database.transaction():
+                database.insert_query("INSERT INTO b VALUES (?)", (2,))
+
+        self.assertEqual(self.pool.stats().total_checkouts, 1)
+        self.pool._idle[0].conn.commit.assert_called_once()
+
+    def test_streamQuery_yieldsRowsInBatches_andReleasesConnection(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        self.pool._connect_fn = lambda: conn
+
+        rows = database.stream_query("SELECT id FROM topics", batch_size=2)
+        self.assertEqual(self.pool.stats().total_checkouts, 0) # lazy until iterated
+        self.assertEqual(list(rows), [(1,), (2,), (3,)])
+
+        conn.cursor.assert_called_once_with(buffered=False)
+        cursor.fetchmany.assert_called_with(2)
+        self.assertEqual(self.pool.stats().in_use, 0)
+
+    def test_streamQuery_discardsConnection_when_closedEarly(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+        self.pool._connect_fn = lambda: conn
+
+        rows = database.stream_query("SELECT id FROM topics", batch_size=2)
+        next(rows)
+        rows.close()
+        stats = self.pool.stats()
+        self.assertEqual(stats.in_use, 0)
+        self.assertEqual(stats.total_discarded, 1)
+
+    def test_insertManyQuery_expandsValuesGroup_perChunk(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        first_ids = iter([10, 12]) # The server's first ID of each chunk
+        cursor.execute.side_effect = lambda *_: setattr(cursor, "lastrowid", next(first_ids))
+        self.pool._connect_fn = lambda: conn
+
+        ids = database.insert_many_query(
+            "INSERT INTO t(a, b) VALUES (?, ?) ON DUPLICATE KEY UPDATE b = VALUES(b)",
+            [(1, 2), (3, 4), (5, 6)], chunk_size=2)
+
+        first_sql, first_params = cursor.execute.call_args_list[0].args
+        second_sql, second_params = cursor.execute.call_args_list[1].args
+        self.assertEqual(first_sql, "INSERT INTO t(a, b) VALUES (?, ?), (?, ?) ON DUPLICATE KEY UPDATE b = VALUES(b)")
+        self.assertEqual(first_params, (1, 2, 3, 4))
+        self.assertEqual(second_params, (5, 6))
+        self.assertEqual(ids, [10, 11, 12])
+        conn.commit.assert_called_once()
+
+    def test_insertManyQuery_repeatsValuesGroup_withNestedParentheses(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.lastrowid = 0
+        self.pool._connect_fn = lambda: conn
+
+        database.insert_many_query("INSERT INTO t(a, b, c) VALUES (?, ')', NOW())", [(1,), (2,)])
+        self.assertEqual(cursor.execute.call_args.args[0],
+                         "INSERT INTO t(a, b, c) VALUES (?, ')', NOW()), (?, ')', NOW())")
+
+    def test_insertManyQuery_raisesValueError_forUnbalancedValuesGroup(self):
+        with self.assertRaises(ValueError):
+            database.insert_many_query("INSERT INTO t(a) VALUES (?, NOW()", [(1,)])
+
+    def test_insertManyQuery_doesNothing_when_noRows(self):
+        self.assertEqual(database.insert_many_query("INSERT INTO t(a) VALUES (?)", []), [])
+        self.assertEqual(self.pool.stats().total_checkouts, 0)
+
+    def test_updateManyQuery_returnsAffectedRows(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.rowcount = 2
+        self.pool._connect_fn = lambda: conn
+
+        result = database.update_many_query("UPDATE t SET a = ? WHERE id = ?", [(1, 1), (2, 2)])
+        cursor.executemany.assert_called_once_with("UPDATE t SET a = ? WHERE id = ?", [(1, 1), (2, 2)])
+        self.assertEqual(result, 2)
+
+    def test_queries_areRecorded_inRequestScope(self):
+        with database.request_scope() as state:
+            database.read_query("SELECT * FROM users WHERE id = ?", (1,))
+            database.read_query("SELECT * FROM users WHERE id = ?", (2,))
+            database.insert_query("INSERT INTO a VALUES (?)", (1,))
+
+        self.assertEqual(state.queries.count, 3)
+        self.assertEqual(state.queries.repeated(1), [("SELECT * FROM users WHERE id = ?", 2)])
+
+class DatabaseReplicas_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.primary = ConnectionPool(MagicMock, min_size=0, max_size=2)
+        self.replica = Replica("replica", ConnectionPool(MagicMock, min_size=0, max_size=2))
+        self.replica.checked_at = float("inf") # skip lag checks
+        for target, value in (('data.database._pool', self.primary),
+                              ('data.database._replicas', ReplicaSet([self.replica]))):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_readQuery_usesReplica_and_writesUsePrimary(self):
+        database.read_query("SELECT 1")
+        database.insert_query("INSERT INTO a VALUES (?)", (1,))
+        self.assertEqual(self.replica.pool.stats().total_checkouts, 1)
+        self.assertEqual(self.primary.stats().total_checkouts, 1)
+
+    def test_readQuery_usesPrimary_afterWriteInSameRequest(self):
+        with database.request_scope() as state:
+            database.insert_query("INSERT INTO a VALUES (?)", (1,))
+            database.read_query("SELECT 1")
+        self.assertIsNotNone(state.last_write_at)
+        self.assertEqual(self.replica.pool.stats().total_checkouts, 0)
+        self.assertEqual(self.primary.stats().total_checkouts, 2)
+
+    def test_readQuery_usesPrimary_when_pinned(self):
+        import time
+        with database.request_scope(pinned_until=time.time() + 60):
+            database.read_query("SELECT 1")
+        self.assertEqual(self.replica.pool.stats().total_checkouts, 0)
+
+    def test_readQuery_usesPrimary_when_asked(self):
+        database.read_query("SELECT 1", primary=True)
+        self.assertEqual(self.replica.pool.stats().total_checkouts, 0)
+        self.assertEqual(self.primary.stats().total_checkouts, 1)
+
+if __name__ == '__main__':
+    unittest.main()
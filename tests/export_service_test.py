@@ -0,0 +1,103 @@
+import unittest
+import gzip
+import json
+from datetime import datetime
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from data.models import User
+from services import export_service
+from utils.streaming import ndjson, gzipped
+from routers.api import exports_router
+
+CREATED_AT = datetime(2025, 5, 19, 10, 20)
+ADMIN = User.from_query_result(1, "admin", "hash", 1, None, None)
+MEMBER = User.from_query_result(2, "member", "hash", 0, None, None)
+
+
+class Streaming_Should(unittest.TestCase):
+
+    def test_ndjson_writesOneLinePerItem_inBatches(self):
+        chunks = list(ndjson(({"id": id} for id in range(5)), batch_size=2))
+
+        self.assertEqual(len(chunks), 3)
+        lines = b"".join(chunks).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{"id": id} for id in range(5)])
+
+    def test_ndjson_yieldsNothing_forNoItems(self):
+        self.assertEqual(list(ndjson([])), [])
+
+    def test_gzipped_roundTrips(self):
+        data = [b"a" * 1000, b"b\n" * 500, b""]
+        self.assertEqual(gzip.decompress(b"".join(gzipped(data))), b"".join(data))
+
+
+class ExportService_Should(unittest.TestCase):
+
+    def test_categoryTopics_mapsRows(self):
+        row = (3, "Title", "Content", 1, 2, 0, None, CREATED_AT)
+        with patch("services.export_service.stream_query", return_value=iter([row])) as stream:
+            topics = list(export_service.category_topics(1))
+
+        self.assertEqual(stream.call_args.args[1], (1,))
+        self.assertEqual((topics[0].id, topics[0].title, topics[0].category_id), (3, "Title", 1))
+
+    def test_categoryReplies_includeVoteCounts(self):
+        row = (7, "Text", 3, 2, CREATED_AT, 4, 1)
+        with patch("services.export_service.stream_query", return_value=iter([row])):
+            reply = next(export_service.category_replies(1))
+
+        self.assertEqual((reply.id, reply.topic_id, reply.up_count, reply.down_count), (7, 3, 4, 1))
+
+    def test_userMessages_mapsRows(self):
+        row = (9, "Hi", 5, 2, CREATED_AT)
+        with patch("services.export_service.stream_query", return_value=iter([row])):
+            message = next(export_service.user_messages(2))
+
+        self.assertEqual((message.id, message.conversation_id, message.sender_id), (9, 5, 2))
+
+    def test_isLazy(self):
+        with patch("services.export_service.stream_query", return_value=iter([])) as stream:
+            export_service.category_topics(1)
+        stream.assert_called_once() # The query is opened, but no row is read until iterated
+
+
+class ExportsRouter_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(exports_router.api_exports_router)
+        self.rows = [(id, "Title", "Content", 1, 2, 0, None, CREATED_AT) for id in (1, 2)]
+
+    def test_streamsNdjson_forAdmins(self):
+        with patch.object(exports_router, "get_user_or_raise_401", return_value=ADMIN), \
+             patch.object(exports_router.categories_service, "exists", return_value=True), \
+             patch("services.export_service.stream_query", return_value=iter(self.rows)):
+            response = self.client.get("/api/exports/categories/1/topics", headers={"u-token": "t"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        self.assertIn("category-1-topics.ndjson", response.headers["content-disposition"])
+        self.assertEqual([json.loads(line)["id"] for line in response.text.splitlines()], [1, 2])
+
+    def test_gzipsExport_whenAsked(self):
+        with patch.object(exports_router, "get_user_or_raise_401", return_value=ADMIN), \
+             patch.object(exports_router.categories_service, "exists", return_value=True), \
+             patch("services.export_service.stream_query", return_value=iter(self.rows)):
+            response = self.client.get("/api/exports/categories/1/topics?gzip=true", headers={"u-token": "t"})
+
+        self.assertEqual(response.headers["content-type"], "application/gzip")
+        self.assertEqual(len(gzip.decompress(response.content).splitlines()), 2)
+
+    def test_rejectsNonAdmins(self):
+        with patch.object(exports_router, "get_user_or_raise_401", return_value=MEMBER), \
+             patch("services.export_service.stream_query") as stream:
+            response = self.client.get("/api/exports/users/2/messages", headers={"u-token": "t"})
+
+        self.assertEqual(response.status_code, 401)
+        stream.assert_not_called()
+
+    def test_returnsNotFound_forMissingCategory(self):
+        with patch.object(exports_router, "get_user_or_raise_401", return_value=ADMIN), \
+             patch.object(exports_router.categories_service, "exists", return_value=False):
+            response = self.client.get("/api/exports/categories/9/replies", headers={"u-token": "t"})
+
+        self.assertEqual(response.status_code, 404)
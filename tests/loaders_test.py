@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch, AsyncMock
+from services import loaders
+from services.loaders import DataLoader
+import services.topics_service as topics_service
+import services.replies_service as replies_service
+
+class DataLoader_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+        def batch_fn(keys):
+            self.batches.append(set(keys))
+            return {key: f"value {key}" for key in keys if key < 100}
+        self.loader = DataLoader(batch_fn)
+
+    def test_load_fetchesKeyOnce(self):
+        self.assertEqual(self.loader.load(1), "value 1")
+        self.assertEqual(self.loader.load(1), "value 1")
+        self.assertEqual(self.batches, [{1}])
+
+    def test_load_cachesMissingKeys(self):
+        self.assertIsNone(self.loader.load(404))
+        self.assertIsNone(self.loader.load(404))
+        self.assertEqual(len(self.batches), 1)
+
+    def test_loadMany_batchesAndDedupesKeys(self):
+        self.loader.load(1)
+        result = self.loader.load_many([1, 2, 3, 2])
+
+        self.assertEqual(list(result), [1, 2, 3])
+        self.assertEqual(self.batches, [{1}, {2, 3}])
+
+    def test_primeMany_servesPrimedValues_withoutFetching(self):
+        self.loader.prime_many([{"id": 1}, {"id": 2}], key=lambda value: value["id"])
+        result = self.loader.load_many([1, 2, 3])
+
+        self.assertEqual(result[2], {"id": 2})
+        self.assertEqual(self.batches, [{3}])
+
+    def test_clear_refetchesKey(self):
+        self.loader.load(1)
+        self.loader.clear(1)
+        self.loader.load(1)
+        self.assertEqual(self.batches, [{1}, {1}])
+
+
+class Loaders_Should(unittest.TestCase):
+
+    def test_getLoader_sharesLoader_withinRequestScope(self):
+        with loaders.request_scope():
+            first = loaders.get_loader("topics", dict)
+            self.assertIs(loaders.get_loader("topics", dict), first)
+        self.assertIsNot(loaders.get_loader("topics", dict), first)
+
+    def test_topicsGetById_queriesOnce_perRequest(self):
+        row = (1, "T", "C", 2, 3, 0, None, "2024-01-01", "user", None)
+        with patch('services.topics_service.read_query', return_value=[row]) as mock_read, \
+             loaders.request_scope():
+            topics_service.get_by_id(1)
+            topic = topics_service.get_by_id(1)
+
+        self.assertEqual(topic.title, "T")
+        mock_read.assert_called_once()
+
+    def test_repliesGetByTopic_primesReplyLoader(self):
+        row = (7, "Text", 1, 3, "2024-01-01", "user", None, 2, 0)
+        with patch('services.replies_service.read_query', return_value=[row]) as mock_read, \
+             patch('services.votes_service.with_pending_votes', side_effect=lambda replies: replies), \
+             loaders.request_scope():
+            replies_service.get_by_topic(1)
+            reply = replies_service.get_by_id(7)
+
+        self.assertEqual(reply.up_count, 2)
+        mock_read.assert_called_once()
+
+    def test_topicsSetLocked_forgetsLoadedTopic(self):
+        row = (1, "T", "C", 2, 3, 0, None, "2024-01-01", "user", None)
+        with patch('services.topics_service.read_query', return_value=[row]) as mock_read, \
+             patch('services.topics_service.update_query', return_value=1), \
+             loaders.request_scope():
+            topics_service.get_by_id(1)
+            topics_service.set_locked(1, True)
+            topics_service.get_by_id(1)
+
+        self.assertEqual(mock_read.call_count, 2)
+
+
+class LoadersAsync_Should(unittest.IsolatedAsyncioTestCase):
+
+    async def test_topicsGetByIdAsync_sharesCache_withSyncLoads(self):
+        row = (1, "T", "C", 2, 3, 0, None, "2024-01-01", "user", None)
+        with patch('services.topics_service.read_query', return_value=[row]), \
+             patch('services.topics_service.read_query_async', new_callable=AsyncMock) as mock_read_async, \
+             loaders.request_scope():
+            topics_service.get_by_id(1)
+            topic = await topics_service.get_by_id_async(1)
+
+        self.assertEqual(topic.id, 1)
+        mock_read_async.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+import data.migrate as migrate
+
+class Migrate_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "0002_second.sql").write_text("-- comment\nCREATE INDEX IF NOT EXISTS b ON t (b);\n")
+        (self.dir / "0001_first.sql").write_text("CREATE INDEX IF NOT EXISTS a\n  ON t (a);\n\nCREATE INDEX IF NOT EXISTS c ON t (c);\n")
+        (self.dir / "notes.txt").write_text("ignored")
+
+    def test_splitStatements_dropsCommentsAndSemicolons(self):
+        sql = "-- header\nCREATE TABLE x (\n  id INT\n);\n\nCREATE INDEX i ON x (id);"
+        self.assertEqual(migrate.split_statements(sql), ["CREATE TABLE x (\n  id INT\n)", "CREATE INDEX i ON x (id)"])
+
+    def test_loadMigrations_sortsByVersion(self):
+        migrations = migrate.load_migrations(self.dir)
+        self.assertEqual([(m.version, m.name) for m in migrations], [(1, "first"), (2, "second")])
+        self.assertEqual(len(migrations[0].statements), 2)
+
+    def test_runMigrations_appliesOnlyPending(self):
+        first = migrate.load_migrations(self.dir)[0]
+        with patch('data.migrate.read_query') as mock_read, \
+             patch('data.migrate.update_query') as mock_update, \
+             patch('data.migrate.insert_query') as mock_insert:
+            mock_read.return_value = [(1, first.checksum)]
+            done = migrate.run_migrations(self.dir, log=lambda _: None)
+
+        self.assertEqual([m.version for m in done], [2])
+        executed = [c.args[0] for c in mock_update.call_args_list]
+        self.assertIn("CREATE INDEX IF NOT EXISTS b ON t (b)", executed)
+        self.assertNotIn("CREATE INDEX IF NOT EXISTS c ON t (c)", executed)
+        self.assertEqual(mock_insert.call_args.args[1][:2], (2, "second"))
+        self.assertTrue(mock_read.call_args.kwargs["primary"])
+
+    def test_loadMigrations_raises_when_duplicateVersion(self):
+        (self.dir / "0002_other.sql").write_text("SELECT 1;")
+        with self.assertRaises(ValueError):
+            migrate.load_migrations(self.dir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from datetime import datetime
+from data.models import Topic, Reply, User, MessageResponse
+
+CREATED_AT = datetime(2025, 5, 19, 10, 20)
+
+class Models_Should(unittest.TestCase):
+
+    def test_fromQueryResult_matchesValidatedModel(self):
+        cases = [
+            (Topic, (1, "Title", "Content", 2, 3, 0, None, CREATED_AT, "user", None)),
+            (Reply, (1, "Text", 2, 3, CREATED_AT, "user", "pic.png", 4, 1)),
+            (User, (1, "user", "hash", 0, None, CREATED_AT)),
+            (MessageResponse, (1, "Hi", "user", None, CREATED_AT)),
+        ]
+        for model, row in cases:
+            with self.subTest(model=model.__name__):
+                trusted = model.from_query_result(*row)
+                validated = model(**dict(zip(model.model_fields, row)))
+
+                self.assertEqual(trusted, validated)
+                self.assertEqual(trusted.model_dump_json(), validated.model_dump_json())
+                self.assertEqual(trusted.model_fields_set, set(model.model_fields))
+
+    def test_fromQueryResult_modelsStayMutable(self):
+        reply = Reply.from_query_result(1, "Text", 2, 3, CREATED_AT)
+        reply.up_count += 1
+        copy = reply.model_copy(update={"down_count": 2})
+
+        self.assertEqual((reply.up_count, reply.down_count), (1, 0))
+        self.assertEqual((copy.up_count, copy.down_count), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+from datetime import datetime
+from utils.pagination import InvalidCursorError, encode_cursor, decode_cursor
+
+class Pagination_Should(unittest.TestCase):
+
+    def test_decodeCursor_returnsEncodedData(self):
+        cursor = encode_cursor({"s": "created_at", "v": [datetime(2025, 5, 19, 10, 20), 7]})
+        self.assertEqual(decode_cursor(cursor), {"s": "created_at", "v": ["2025-05-19T10:20:00", 7]})
+
+    def test_encodeCursor_isUrlSafe(self):
+        cursor = encode_cursor({"v": ["???>>>", 1]})
+        self.assertRegex(cursor, r"^[A-Za-z0-9_-]+$")
+
+    def test_decodeCursor_raises_when_malformed(self):
+        for cursor in ("not a cursor", encode_cursor([1, 2])[:-2], "W10"):
+            with self.assertRaises(InvalidCursorError):
+                decode_cursor(cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import Mock
+from data.pool import ConnectionPool, PoolTimeoutError
+
+def fake_connect():
+    return Mock()
+
+class ConnectionPool_Should(unittest.TestCase):
+
+    def test_connection_reusesIdleConnection(self):
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=2)
+        with pool.connection() as first: pass
+        with pool.connection() as second: pass
+        self.assertIs(first, second)
+        self.assertEqual(pool.stats().total_created, 1)
+        self.assertEqual(pool.stats().idle, 1)
+
+    def test_fill_opensMinSizeConnections(self):
+        pool = ConnectionPool(fake_connect, min_size=3, max_size=5)
+        with pool.connection(): 
+            stats = pool.stats()
+        self.assertEqual(stats.in_use, 1)
+        self.assertEqual(stats.idle, 2)
+
+    def test_acquire_raisesTimeout_when_poolExhausted(self):
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=1, timeout_seconds=0.05)
+        held = pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        pool.release(held)
+        self.assertEqual(pool.stats().total_timeouts, 1)
+
+    def test_acquire_replacesConnection_when_pingFails(self):
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=1, ping_after_idle_seconds=0)
+        with pool.connection() as first:
+            first.ping.side_effect = Exception("gone away")
+        with pool.connection() as second: pass
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.stats().total_discarded, 1)
+
+    def test_acquire_recyclesConnection_when_tooOld(self):
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=1, recycle_seconds=0.001)
+        with pool.connection() as first: pass
+        pooled = pool._idle[0]
+        pooled.created_at -= 1
+        with pool.connection() as second: pass
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+
+    def test_connection_rollsBack_when_blockRaises(self):
+        pool = ConnectionPool(fake_connect, min_size=0, max_size=1)
+        with self.assertRaises(ValueError):
+            with pool.connection() as conn:
+                raise ValueError()
+        conn.rollback.assert_called_once()
+        self.assertEqual(pool.stats().idle, 1)
+        self.assertEqual(pool.stats().in_use, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+from data.query_stats import QueryLog, normalize_sql
+
+class QueryStats_Should(unittest.TestCase):
+
+    def test_normalizeSql_collapsesLiteralsAndLists(self):
+        self.assertEqual(
+            normalize_sql("SELECT *\n  FROM users WHERE id IN (?, ?, ?) AND name = 'x' LIMIT 5"),
+            "SELECT * FROM users WHERE id IN (...) AND name = ? LIMIT ?")
+        self.assertEqual(
+            normalize_sql("INSERT INTO t(a, b) VALUES (?, ?), (?, ?)"),
+            normalize_sql("INSERT INTO t(a, b) VALUES (?, ?)"))
+
+    def test_repeated_flagsStatementsOverThreshold(self):
+        log = QueryLog()
+        for i in range(4): log.add(f"SELECT * FROM users WHERE id = {i}", 1.0, 1)
+        log.add("SELECT * FROM topics", 2.0, 10)
+
+        self.assertEqual(log.repeated(3), [("SELECT * FROM users WHERE id = ?", 4)])
+        self.assertEqual(log.repeated(4), [])
+        self.assertEqual(log.summary(), "5 queries in 6.0 ms (2 distinct)")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from data.pool import ConnectionPool
+from data.replicas import Replica, ReplicaSet
+
+def fake_replica(name: str) -> Replica:
+    return Replica(name, ConnectionPool(MagicMock, min_size=0, max_size=1))
+
+class ReplicaSet_Should(unittest.TestCase):
+
+    def test_choose_roundRobinsHealthyReplicas(self):
+        a, b = fake_replica("a"), fake_replica("b")
+        replicas = ReplicaSet([a, b], check_interval_seconds=60)
+        with patch('data.replicas._read_lag_seconds', return_value=0.0):
+            chosen = [replicas.choose().name for _ in range(4)]
+        self.assertEqual(chosen, ["a", "b", "a", "b"])
+
+    def test_choose_skipsLaggingReplica(self):
+        a, b = fake_replica("a"), fake_replica("b")
+        replicas = ReplicaSet([a, b], max_lag_seconds=5, check_interval_seconds=60)
+        lags = {"a": 30.0, "b": 1.0}
+        with patch('data.replicas._read_lag_seconds', side_effect=lambda r: lags[r.name]):
+            chosen = {replicas.choose().name for _ in range(4)}
+        self.assertEqual(chosen, {"b"})
+        self.assertFalse(a.healthy)
+
+    def test_choose_returnsNone_when_replicationBrokenOrDown(self):
+        a, b = fake_replica("a"), fake_replica("b")
+        replicas = ReplicaSet([a, b], check_interval_seconds=60)
+        effects = {"a": None, "b": ConnectionError()}
+        def lag(replica):
+            result = effects[replica.name]
+            if isinstance(result, Exception): raise result
+            return result
+        with patch('data.replicas._read_lag_seconds', side_effect=lag):
+            self.assertIsNone(replicas.choose())
+
+    def test_choose_reusesLagCheck_within_interval(self):
+        a = fake_replica("a")
+        replicas = ReplicaSet([a], check_interval_seconds=60)
+        with patch('data.replicas._read_lag_seconds', return_value=0.0) as mock_lag:
+            for _ in range(3): replicas.choose()
+        mock_lag.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
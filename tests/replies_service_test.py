@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 from data.models import Reply, ReplyCreate
 import services.replies_service as service
 
@@ -20,13 +20,14 @@ class RepliesService_Should(unittest.TestCase):
     def test_get_by_topic_returnsReplyList(self):
         with patch('services.replies_service.read_query') as mock_query:
             mock_query.return_value = [
-                (1, "A", 2, 3, "2024-01-01", "U1", None),
-                (2, "B", 2, 4, "2024-01-02", "U2", "pic.png"),
+                (1, "A", 2, 3, "2024-01-01", "U1", None, 4, 1),
+                (2, "B", 2, 4, "2024-01-02", "U2", "pic.png", 0, 0),
             ]
             result = service.get_by_topic(2)
             self.assertEqual(len(result), 2)
             self.assertEqual(result[1].text, "B")
             self.assertEqual(result[0].username, "U1")
+            self.assertEqual((result[0].up_count, result[0].down_count), (4, 1))
 
     def test_create_returnsTrueOnInsert(self):
         with patch('services.replies_service.insert_query') as mock_insert:
@@ -51,11 +52,20 @@ class RepliesService_Should(unittest.TestCase):
 
     def test_get_by_id_found_and_none(self):
         with patch('services.replies_service.read_query') as mock_query:
-            mock_query.return_value = [(1, "A", 2, 3, "2024-01-01")]
+            mock_query.return_value = [(1, "A", 2, 3, "2024-01-01", 5, 2)]
             reply = service.get_by_id(1)
             self.assertIsInstance(reply, Reply)
+            self.assertEqual((reply.up_count, reply.down_count), (5, 2))
             mock_query.return_value = []
             self.assertIsNone(service.get_by_id(22))
 
+class RepliesServiceAsync_Should(unittest.IsolatedAsyncioTestCase):
+
+    async def test_get_by_topic_async_returnsReplyList(self):
+        with patch('services.replies_service.read_query_async', new_callable=AsyncMock) as mock_query:
+            mock_query.return_value = [(1, "A", 2, 3, "2024-01-01", "U1", None, 0, 0)]
+            result = await service.get_by_topic_async(2)
+            self.assertEqual(result[0].username, "U1")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from datetime import datetime
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+from common.responses import FastJSONResponse, NotFound
+from common.routing import FastJSONRoute
+from data.models import Topic, User
+
+def fake_topic(id):
+    return Topic.from_query_result(id, f"T{id}", "C", 1, 2, 0, None, datetime(2025, 5, 19, 10, 20), "user", None)
+
+router = APIRouter(prefix="/api", route_class=FastJSONRoute, default_response_class=FastJSONResponse)
+
+@router.get("/topics", response_model=list[Topic])
+def topics(response: Response):
+    response.headers["X-Next-Cursor"] = "abc"
+    return (fake_topic(id) for id in (1, 2))
+
+@router.get("/user", response_model=User, response_model_exclude={"password"})
+async def user():
+    return User.from_query_result(1, "user", "secret hash", 0, None, None)
+
+@router.post("/created", status_code=201)
+def created():
+    return {"at": datetime(2025, 5, 19)}
+
+@router.get("/missing")
+def missing():
+    return NotFound("nope")
+
+@router.delete("/empty", status_code=204)
+def empty():
+    return None
+
+app = FastAPI()
+app.include_router(router)
+
+class FastJSONRoute_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_serializesGenerators_andKeepsSubResponseHeaders(self):
+        response = self.client.get("/api/topics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["x-next-cursor"], "abc")
+        self.assertEqual([t["id"] for t in response.json()], [1, 2])
+        self.assertEqual(response.json()[0]["created_at"], "2025-05-19T10:20:00")
+
+    def test_appliesResponseModelOptions(self):
+        body = self.client.get("/api/user").json()
+        self.assertEqual(body["username"], "user")
+        self.assertNotIn("password", body)
+
+    def test_usesRouteStatusCode(self):
+        response = self.client.post("/api/created")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"at": "2025-05-19T00:00:00"})
+
+    def test_passesResponsesThrough(self):
+        response = self.client.get("/api/missing")
+        self.assertEqual((response.status_code, response.text), (404, "nope"))
+
+    def test_sendsNoBody_forNoContent(self):
+        response = self.client.delete("/api/empty")
+        self.assertEqual((response.status_code, response.content), (204, b""))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch
+from services import search_service
+from services.search_service import SearchIndex, tokenize
+
+TOPICS = [
+    (1, 1, "Connection pool timeout", "The pool times out under load."),
+    (2, 1, "Cooking pasta", "Boil water, add salt."),
+    (3, 2, "Pool party", "Bring towels."),
+]
+REPLIES = [
+    (10, 2, "A timeout of ten minutes works for pasta."),
+]
+
+def fake_stream_query(sql, params=()):
+    return iter(TOPICS if "FROM topics" in sql else REPLIES)
+
+
+class SearchIndex_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        for topic in TOPICS: self.index.add_topic(*topic)
+        for reply in REPLIES: self.index.add_reply(*reply)
+
+    def test_tokenize_dropsStopwordsAndPunctuation(self):
+        self.assertEqual(tokenize("The Pool's timeout, again!"), ["pool", "timeout", "again"])
+
+    def test_search_ranksTitleMatchesFirst(self):
+        hits = self.index.search("timeout")
+        self.assertEqual([hit.topic_id for hit in hits], [1, 2])
+
+    def test_search_matchesReplyText(self):
+        self.assertEqual([hit.topic_id for hit in self.index.search("minutes")], [2])
+
+    def test_search_filtersByCategory(self):
+        hits = self.index.search("pool", category_ids={2})
+        self.assertEqual([hit.topic_id for hit in hits], [3])
+
+    def test_search_returnsEmpty_whenNothingMatches(self):
+        self.assertEqual(self.index.search("the"), [])
+        self.assertEqual(self.index.search("nonexistent"), [])
+
+    def test_addReply_isIdempotent(self):
+        before = self.index.search("minutes")[0].score
+        self.index.add_reply(*REPLIES[0])
+        self.assertEqual(self.index.search("minutes")[0].score, before)
+
+
+class SearchService_Should(unittest.TestCase):
+
+    def setUp(self):
+        search_service.reset_index()
+        patcher = patch("services.search_service.stream_query", side_effect=fake_stream_query)
+        self.stream_query = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(search_service.reset_index)
+
+    def test_search_buildsIndexOnce(self):
+        search_service.search("pool")
+        search_service.search("pool")
+        self.assertEqual(self.stream_query.call_count, 2) # topics and replies
+
+    def test_search_pagesWithAfter(self):
+        first = search_service.search("pool", limit=1)
+        second = search_service.search("pool", after=(first[0].score, first[0].topic_id), limit=1)
+
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first[0].topic_id, second[0].topic_id)
+        self.assertEqual(search_service.search("pool", after=(second[0].score, second[0].topic_id)), [])
+
+    def test_indexTopic_updatesBuiltIndex(self):
+        search_service.search("pool")
+        search_service.index_topic(4, 1, "Kubernetes pods", "Scaling pods.")
+        search_service.index_reply(11, 4, "Use a horizontal autoscaler.")
+
+        self.assertEqual([hit.topic_id for hit in search_service.search("autoscaler")], [4])
+
+    def test_indexTopic_isNoop_beforeFirstBuild(self):
+        search_service.index_topic(4, 1, "Kubernetes pods", "Scaling pods.")
+        self.stream_query.assert_not_called()
+
+    def test_changesDuringBuild_areReplayed(self):
+        def stream_while_posting(sql, params=()):
+            if "FROM replies" in sql: search_service.index_topic(4, 1, "Kubernetes pods", "Scaling pods.")
+            return fake_stream_query(sql, params)
+        self.stream_query.side_effect = stream_while_posting
+
+        search_service.build_index()
+        self.assertEqual([hit.topic_id for hit in search_service.search("kubernetes")], [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
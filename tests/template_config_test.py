@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from starlette.requests import Request
+from data.models import Topic, User
+from common.template_config import CustomJinja2Templates
+from services import loaders, users_service
+
+def fake_request():
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+def fake_topic(id, user_id):
+    return Topic(id=id, title="T", content="C", category_id=1, user_id=user_id, is_locked=0)
+
+def fake_user(id):
+    return User(id=id, username=f"user{id}", password="", is_admin=0, avatar_url=f"avatar{id}")
+
+class CustomJinja2Templates_Should(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        Path(directory.name, "authors.html").write_text(
+            "{% for t in topics %}{{ find_user_by_id(t.user_id).username }} "
+            "{{ get_avatar_by_user_id(t.user_id) }};{% endfor %}")
+        Path(directory.name, "me.html").write_text(
+            "{% for i in range(3) %}{{ get_user(request).username }}{% endfor %}")
+        self.templates = CustomJinja2Templates(directory=directory.name)
+
+    def test_render_prefetchesStreamedAuthors_withOneQuery(self):
+        topics = (fake_topic(i, user_id=i % 2 + 1) for i in range(5))
+        with patch('services.users_service.find_users_by_ids',
+                   return_value={1: fake_user(1), 2: fake_user(2)}) as find_many, \
+             patch('services.users_service.find_user_by_id') as find_one:
+            response = self.templates.TemplateResponse(fake_request(), "authors.html", {"topics": topics})
+
+        find_many.assert_called_once()
+        find_one.assert_not_called()
+        self.assertIn("user2 avatar2;user1 avatar1;", response.body.decode())
+
+    def test_render_primesRequestUserLoader(self):
+        topics = [fake_topic(1, user_id=1), fake_topic(2, user_id=2)]
+        with patch('services.users_service.find_users_by_ids',
+                   return_value={1: fake_user(1), 2: fake_user(2)}) as find_many, \
+             loaders.request_scope():
+            self.templates.TemplateResponse(fake_request(), "authors.html", {"topics": topics})
+            self.assertEqual(users_service.find_user_by_id(2).username, "user2")
+
+        find_many.assert_called_once()
+
+    def test_getUser_isResolvedOnce_per_request(self):
+        request = fake_request()
+        with patch('common.template_config.get_user_if_token', return_value=fake_user(7)) as get_user:
+            response = self.templates.TemplateResponse("me.html", {"request": request})
+
+        get_user.assert_called_once_with(request)
+        self.assertEqual(response.body.decode(), "user7user7user7")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from data.models import Reply, Topic, User, Vote
+from routers.api import topics_router
+
+USER = User.from_query_result(1, "emko", "hash", 0, None, None)
+TOPIC = Topic.from_query_result(3, "Title", "Content", 1, 1, 0, None, datetime(2025, 5, 19))
+REPLY = Reply.from_query_result(7, "Text", 3, 1, datetime(2025, 5, 19))
+VOTE = Vote(reply_id=7, user_id=1, type_vote="up")
+
+app = FastAPI()
+app.include_router(topics_router.api_topics_router)
+
+
+class VoteReply_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+        for patcher in (patch.object(topics_router, "get_user_or_raise_401", return_value=USER),
+                        patch.object(topics_router.topics_service, "get_by_id", return_value=TOPIC)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def vote(self, topic_id, reply_id, reply):
+        with patch.object(topics_router.replies_service, "get_by_id", return_value=reply), \
+             patch.object(topics_router.votes_service, "record_vote", return_value=VOTE) as record_vote:
+            response = self.client.post(f"/api/topics/{topic_id}/replies/{reply_id}/votes",
+                                        json={"type_vote": "up"}, headers={"u-token": "t"})
+        return response, record_vote
+
+    def test_recordsVote_onReplyOfTopic(self):
+        response, record_vote = self.vote(3, 7, REPLY)
+
+        self.assertEqual(response.status_code, 200)
+        record_vote.assert_called_once_with(reply_id=7, user_id=1, type_vote="up")
+
+    def test_returnsNotFound_forMissingReply(self):
+        response, record_vote = self.vote(3, 99, None)
+
+        self.assertEqual(response.status_code, 404)
+        record_vote.assert_not_called()
+
+    def test_returnsBadRequest_forReplyOfAnotherTopic(self):
+        response, record_vote = self.vote(4, 7, REPLY)
+
+        self.assertEqual(response.status_code, 400)
+        record_vote.assert_not_called()
+
+
+class GetTopics_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_rejectsInvalidPageSize(self):
+        with patch.object(topics_router.topics_service, "page_async") as page_async:
+            for size in (0, -1, 101):
+                with self.subTest(size=size):
+                    response = self.client.get(f"/api/topics/?size={size}")
+                    self.assertEqual(response.status_code, 422)
+
+        page_async.assert_not_called()
@@ -1,6 +1,8 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 from data.models import Topic, TopicCreate
+from datetime import datetime
+from utils.pagination import encode_cursor
 import services.topics_service as service
 
 def fake_topic(id=1, title="T", content="C", category_id=1, user_id=2, is_locked=0, best_reply_id=None, created_at=None):
@@ -10,7 +12,7 @@ def fake_topic(id=1, title="T", content="C", category_id=1, user_id=2, is_locked
 class TopicsService_Should(unittest.TestCase):
 
     def test_all_returnsTopicList(self):
-        with patch('services.topics_service.read_query') as mock_query:
+        with patch('services.topics_service.stream_query') as mock_query:
             mock_query.return_value = [
                 (1, "T1", "C1", 5, 2, 0, None, None),
                 (2, "T2", "C2", 7, 3, 1, 4, None)
@@ -29,16 +31,23 @@ class TopicsService_Should(unittest.TestCase):
             self.assertEqual(len(result), 1)
             self.assertEqual(result[0].title, "T2")
 
-    def test_sort_by_title_and_content(self):
-        A = fake_topic(1, "B", "z", 1, 2)
-        B = fake_topic(2, "A", "y", 1, 2)
-        C = fake_topic(3, "C", "x", 1, 2)
-        by_title = service.sort([A, B, C], attribute="title")
-        self.assertEqual([B, A, C], by_title)
-        by_content = service.sort([A, B, C], attribute="content")
-        self.assertEqual([C, B, A], by_content)
-        by_id = service.sort([A, B, C], attribute="id", reverse=True)
-        self.assertEqual([C, B, A], by_id)
+    def test_all_returnsAuthor_fromJoinedUsers(self):
+        with patch('services.topics_service.stream_query') as mock_query:
+            mock_query.return_value = [(1, "T1", "C1", 5, 2, 0, None, None, "emko", "avatar.png")]
+            result = list(service.all())
+            self.assertEqual(result[0].username, "emko")
+            self.assertEqual(result[0].avatar_url, "avatar.png")
+            self.assertIn("JOIN users", mock_query.call_args[0][0])
+
+    def test_all_ordersInDatabase(self):
+        with patch('services.topics_service.stream_query') as mock_query:
+            mock_query.return_value = []
+            list(service.all(sort_by="title", order="asc"))
+            self.assertIn("ORDER BY t.title ASC, t.id ASC", mock_query.call_args[0][0])
+
+    def test_all_raisesValueError_when_sortKeyNotWhitelisted(self):
+        with self.assertRaises(ValueError):
+            service.all(sort_by="content")
 
     def test_get_by_id_found_and_none(self):
         with patch('services.topics_service.read_query') as mock_query:
@@ -91,5 +100,74 @@ class TopicsService_Should(unittest.TestCase):
             mock_read.return_value = []
             self.assertFalse(service.toggle_lock(5))
 
+def topic_row(id, title="T", created_at=None):
+    return (id, title, "C", 1, 2, 0, None, created_at)
+
+class TopicsServicePage_Should(unittest.TestCase):
+
+    def test_page_ordersInDatabase_withIdTiebreaker(self):
+        with patch('services.topics_service.read_query', return_value=[]) as mock_query:
+            service.page(sort_by="title", order="asc", size=5)
+            sql, params = mock_query.call_args[0]
+            self.assertIn("ORDER BY t.title ASC, t.id ASC", sql)
+            self.assertNotIn("OFFSET", sql)
+            self.assertEqual(params, (6,))
+
+    def test_page_returnsNextCursor_when_moreRows(self):
+        with patch('services.topics_service.read_query') as mock_query:
+            mock_query.return_value = [topic_row(3, "c"), topic_row(2, "b"), topic_row(1, "a")]
+            first = service.page(sort_by="title", size=2)
+            self.assertEqual([t.id for t in first.topics], [3, 2])
+            self.assertIsNone(first.prev_cursor)
+
+            mock_query.return_value = [topic_row(1, "a")]
+            second = service.page(cursor=first.next_cursor, size=2)
+            sql, params = mock_query.call_args[0]
+            self.assertIn("(t.title < ? OR (t.title = ? AND t.id < ?))", sql)
+            self.assertEqual(params, ("b", "b", 2, 3))
+            self.assertEqual([t.id for t in second.topics], [1])
+            self.assertIsNone(second.next_cursor)
+            self.assertIsNotNone(second.prev_cursor)
+
+    def test_page_walksBackwards_with_prevCursor(self):
+        at = datetime(2025, 5, 19, 10, 20)
+        with patch('services.topics_service.read_query') as mock_query:
+            cursor = encode_cursor({"s": "created_at", "o": "desc", "d": "prev", "v": [at, 5]})
+
+            # Walking back the database returns the rows closest to the cursor first
+            mock_query.return_value = [topic_row(6, created_at=at), topic_row(7, created_at=at)]
+            result = service.page(cursor=cursor, size=1)
+            sql, params = mock_query.call_args[0]
+            self.assertIn("ORDER BY t.created_at ASC, t.id ASC", sql)
+            self.assertEqual(params[:3], (at, at, 5))
+            self.assertEqual([t.id for t in result.topics], [6])
+            self.assertIsNotNone(result.prev_cursor)
+            self.assertIsNotNone(result.next_cursor)
+
+    def test_page_raisesValueError_when_sortKeyNotWhitelisted(self):
+        with self.assertRaises(ValueError):
+            service.page(sort_by="content")
+
+    def test_page_raisesValueError_when_cursorMalformed(self):
+        with self.assertRaises(ValueError):
+            service.page(cursor="not a cursor")
+
+class TopicsServiceAsync_Should(unittest.IsolatedAsyncioTestCase):
+
+    async def test_page_async_returnsTopics_withCursorHeadersData(self):
+        with patch('services.topics_service.read_query_async', new_callable=AsyncMock) as mock_query:
+            mock_query.return_value = [(1, "T1", "C1", 5, 2, 0, None, None), (2, "T2", "C2", 5, 2, 0, None, None)]
+            result = await service.page_async(search="T", sort_by="id", order="asc", size=1)
+            self.assertEqual([t.title for t in result.topics], ["T1"])
+            self.assertIsNotNone(result.next_cursor)
+            self.assertEqual(mock_query.call_args.args[1], ("%T%", 2))
+
+    async def test_get_by_id_async_found_and_none(self):
+        with patch('services.topics_service.read_query_async', new_callable=AsyncMock) as mock_query:
+            mock_query.return_value = [(1, "T", "C", 1, 2, 0, None, None)]
+            self.assertIsInstance(await service.get_by_id_async(1), Topic)
+            mock_query.return_value = []
+            self.assertIsNone(await service.get_by_id_async(999))
+
 if __name__ == '__main__':
     unittest.main()
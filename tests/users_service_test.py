@@ -137,5 +137,52 @@ class UsersServiceTest(unittest.TestCase):
         
         result = users_service.is_user_authenticated(token, mock_db)
         self.assertFalse(result)
-        
-    
\ No newline at end of file
+
+
+class UsersServiceCache_Should(unittest.TestCase):
+
+    def setUp(self):
+        users_service.clear_user_cache()
+        self.addCleanup(users_service.clear_user_cache)
+        self.user = fake_user()
+        self.row = (self.user.id, self.user.username, self.user.password, self.user.is_admin, self.user.avatar_url, self.user.created_at)
+        patcher = mock.patch('services.users_service.db')
+        self.mock_db = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_db.read_query.return_value = [self.row]
+
+    def test_findUserByToken_queriesOnce_for_repeatedToken(self):
+        token = users_service.encode_user_token(self.user)
+
+        with mock.patch('services.users_service.decode_user_token', wraps=users_service.decode_user_token) as decode:
+            first = users_service.find_user_by_token(token)
+            second = users_service.find_user_by_token(token)
+
+        self.assertEqual(first.username, second.username)
+        self.mock_db.read_query.assert_called_once()
+        decode.assert_called_once()
+
+    def test_findUserById_returnsCopy_of_cachedUser(self):
+        users_service.find_user_by_id(self.user.id).password = ""
+        self.assertEqual(users_service.find_user_by_id(self.user.id).password, self.user.password)
+
+    def test_updateUserAvatarUrl_invalidatesCachedUser(self):
+        users_service.find_user_by_id(self.user.id)
+        users_service.update_user_avatar_url(self.user.id, "new_url")
+        users_service.find_user_by_id(self.user.id)
+        self.assertEqual(self.mock_db.read_query.call_count, 2)
+
+    def test_findUserByToken_returnsNone_when_usernameChanged(self):
+        token = users_service.encode_user_token(self.user)
+        self.mock_db.read_query.return_value = [(self.user.id, "renamed", *self.row[2:])]
+        self.assertIsNone(users_service.find_user_by_token(token))
+
+
+    def test_findUsersByIds_queriesOnlyUncachedUsers(self):
+        users_service.find_user_by_id(self.user.id)
+        self.mock_db.read_query.return_value = [(2, "other", "", 0, None, None)]
+
+        result = users_service.find_users_by_ids([self.user.id, 2])
+
+        self.assertEqual(set(result), {self.user.id, 2})
+        self.assertEqual(self.mock_db.read_query.call_args[0][1], (2,))
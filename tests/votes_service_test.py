@@ -1,22 +1,29 @@
 import unittest
 from unittest.mock import patch
-from data.models import Vote
+from data.models import Reply, Vote
+from datetime import datetime
 import services.votes_service as service
 
 def fake_vote(id=1, reply_id=2, user_id=3, type_vote='up'):
     return Vote(id=id, reply_id=reply_id, user_id=user_id, type_vote=type_vote)
 
+def fake_reply(id, up_count=0, down_count=0):
+    return Reply(id=id, text="Reply", topic_id=1, user_id=2, created_at=datetime(2025, 1, 1),
+                 up_count=up_count, down_count=down_count)
+
 class VotesService_Should(unittest.TestCase):
 
     def test_vote_creates_new_vote(self):
         with patch('services.votes_service.read_query') as mock_read, \
-             patch('services.votes_service.insert_query') as mock_insert:
+             patch('services.votes_service.insert_query') as mock_insert, \
+             patch('services.votes_service.update_query') as mock_update:
             mock_read.return_value = []
             mock_insert.return_value = 11
             result = service.vote(reply_id=2, user_id=5, type_vote="down")
             self.assertIsInstance(result, Vote)
             self.assertEqual(result.id, 11)
             self.assertEqual(result.type_vote, "down")
+            mock_update.assert_called_once_with(service._UPDATE_REPLY_COUNTS, (0, 1, 2))
 
     def test_vote_returns_existing_vote_if_type_is_same(self):
         with patch('services.votes_service.read_query') as mock_read:
@@ -35,15 +42,97 @@ class VotesService_Should(unittest.TestCase):
             self.assertIsInstance(result, Vote)
             self.assertEqual(result.id, 8)
             self.assertEqual(result.type_vote, "down")
+            mock_update.assert_called_with(service._UPDATE_REPLY_COUNTS, (-1, 1, 2))
+
+    def test_vote_many_upsertsLatestVotePerUserAndReply(self):
+        with patch('services.votes_service.read_query', return_value=[]), \
+             patch('services.votes_service.update_many_query'), \
+             patch('services.votes_service.insert_many_query') as mock_insert:
+            result = service.vote_many([(1, 5, "up"), (2, 5, "up"), (1, 5, "down")])
+            self.assertEqual(result, 2)
+            rows = list(mock_insert.call_args.args[1])
+            self.assertEqual(rows, [(1, 5, "down"), (2, 5, "up")])
+
+    def test_vote_many_updatesReplyCountsByStoredVotes(self):
+        with patch('services.votes_service.read_query') as mock_read, \
+             patch('services.votes_service.insert_many_query'), \
+             patch('services.votes_service.update_many_query') as mock_update_many:
+            mock_read.return_value = [(1, 5, "up"), (2, 6, "up")]
+            service.vote_many([(1, 5, "down"), (1, 6, "up"), (2, 6, "up")])
+
+            self.assertIn("FOR UPDATE", mock_read.call_args.args[0])
+            self.assertEqual(list(mock_update_many.call_args.args[1]), [(0, 1, 1)])
+
+    def test_vote_many_doesNothing_whenEmpty(self):
+        with patch('services.votes_service.read_query') as mock_read:
+            self.assertEqual(service.vote_many([]), 0)
+            mock_read.assert_not_called()
+
+    def test_reconcileVoteCounts_recomputesFromVotes(self):
+        with patch('services.votes_service.update_query', return_value=True) as mock_update:
+            self.assertTrue(service.reconcile_vote_counts())
+            self.assertIn("FROM votes", mock_update.call_args.args[0])
+
+class VoteBuffer_Should(unittest.TestCase):
 
-    def test_count_votes_for_replies(self):
+    def setUp(self):
+        self.buffer = service._buffer
+        patcher = patch.object(self.buffer, "flush_fn")
+        self.flush_fn = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.buffer.start()
+        self.addCleanup(self.buffer.stop)
+
+    def test_recordVote_buffersVote_whenBufferRuns(self):
+        with patch('services.votes_service.insert_query') as mock_insert:
+            result = service.record_vote(reply_id=2, user_id=5, type_vote="up")
+            service.record_vote(reply_id=2, user_id=5, type_vote="down")
+
+        mock_insert.assert_not_called()
+        self.assertIsNone(result.id)
+        self.assertEqual(self.buffer.pending(), {(2, 5): "down"})
+
+    def test_recordVote_writesDirectly_whenBufferStopped(self):
+        self.buffer.stop()
+        with patch('services.votes_service.read_query', return_value=[]), \
+             patch('services.votes_service.update_query'), \
+             patch('services.votes_service.insert_query', return_value=11):
+            self.assertEqual(service.record_vote(reply_id=2, user_id=5, type_vote="up").id, 11)
+
+    def test_recordVote_writesDirectly_whenBufferFull(self):
+        with patch.object(self.buffer, "put", return_value=False), \
+             patch('services.votes_service.read_query', return_value=[]), \
+             patch('services.votes_service.update_query'), \
+             patch('services.votes_service.insert_query', return_value=11):
+            self.assertEqual(service.record_vote(reply_id=2, user_id=5, type_vote="up").id, 11)
+
+    def test_stopVoteBuffer_flushesPendingVotes(self):
+        service.record_vote(reply_id=2, user_id=5, type_vote="up")
+        service.stop_vote_buffer()
+        self.flush_fn.assert_called_once_with({(2, 5): "up"})
+
+    def test_withPendingVotes_mergesBufferedVotes(self):
+        service.record_vote(reply_id=17, user_id=1, type_vote="down") # changes a stored up vote
+        service.record_vote(reply_id=17, user_id=2, type_vote="up")   # new vote
+        service.record_vote(reply_id=18, user_id=3, type_vote="up")   # same as stored
+        service.record_vote(reply_id=99, user_id=4, type_vote="up")   # other topic
+        replies = [fake_reply(17, up_count=5, down_count=2), fake_reply(18, up_count=3)]
+
+        with patch('services.votes_service.read_query', return_value=[(17, 1, "up"), (18, 3, "up")]):
+            service.with_pending_votes(replies)
+
+        self.assertEqual([(r.up_count, r.down_count) for r in replies], [(5, 3), (3, 0)])
+
+    def test_withPendingVotes_skipsQuery_whenNothingBuffered(self):
         with patch('services.votes_service.read_query') as mock_read:
-            mock_read.return_value = [
-                (17, 5, 2),
-                (18, 3, 0)
-            ]
-            result = service.count_votes_for_replies(topic_id=123)
-            self.assertEqual(result, {17: {'up': 5, 'down': 2}, 18: {'up': 3, 'down': 0}})
+            service.with_pending_votes([fake_reply(17)])
+            mock_read.assert_not_called()
+
+    def test_writeBufferedVotes_dropsOnlyFailingVotes(self):
+        with patch('services.votes_service.vote_many', side_effect=service.IntegrityError), \
+             patch('services.votes_service.vote', side_effect=[service.IntegrityError, None]) as mock_vote:
+            service._write_buffered_votes({(1, 5): "up", (2, 5): "down"})
+        self.assertEqual(mock_vote.call_count, 2)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import threading
+from utils.write_buffer import WriteBehindBuffer
+
+class WriteBehindBuffer_Should(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.buffer = WriteBehindBuffer(self.batches.append, interval_seconds=60, max_pending=3)
+        self.addCleanup(self.buffer.stop)
+
+    def test_put_coalescesByKey(self):
+        self.buffer.put("a", 1)
+        self.buffer.put("b", 2)
+        self.buffer.put("a", 3)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(self.batches, [{"a": 3, "b": 2}])
+        self.assertEqual(self.buffer.pending(), {})
+
+    def test_flush_keepsBatch_whenWriteFails(self):
+        def fail(batch): raise ConnectionError("database down")
+        self.buffer.flush_fn = fail
+        self.buffer.put("a", 1)
+
+        with self.assertRaises(ConnectionError):
+            self.buffer.flush()
+        self.buffer.put("b", 2)
+        self.assertEqual(self.buffer.pending(), {"a": 1, "b": 2})
+
+        self.buffer.flush_fn = self.batches.append
+        self.buffer.flush()
+        self.assertEqual(self.batches, [{"a": 1, "b": 2}])
+
+    def test_put_rejectsNewKeys_whenFull(self):
+        buffer = WriteBehindBuffer(self.batches.append, interval_seconds=60, max_pending=1, max_buffered=2)
+        self.assertTrue(buffer.put("a", 1))
+        self.assertTrue(buffer.put("b", 2))
+
+        self.assertFalse(buffer.put("c", 3))
+        self.assertTrue(buffer.put("a", 4)) # Pending keys are still replaced
+        self.assertEqual(buffer.pending(), {"a": 4, "b": 2})
+
+    def test_pending_includesBatchBeingFlushed(self):
+        seen = []
+        self.buffer.flush_fn = lambda batch: seen.append(self.buffer.pending())
+        self.buffer.put("a", 1)
+
+        self.buffer.flush()
+        self.assertEqual(seen, [{"a": 1}])
+
+    def test_start_flushes_whenMaxPendingReached(self):
+        flushed = threading.Event()
+        self.buffer.flush_fn = lambda batch: flushed.set()
+        self.buffer.start()
+
+        for key in "abc": self.buffer.put(key, 1)
+        self.assertTrue(flushed.wait(5))
+
+    def test_stop_flushesRemainingWrites(self):
+        self.buffer.start()
+        self.buffer.put("a", 1)
+        self.buffer.stop()
+
+        self.assertFalse(self.buffer.running)
+        self.assertEqual(self.batches, [{"a": 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+import threading
+import time
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with a time-to-live and a least-recently-used size bound.
+
+    Entries expire ttl_seconds after they were set. When the cache is full, the entry that
+    was read or written least recently is evicted first.
+
+    Args:
+        max_size (int): Max number of entries kept.
+        ttl_seconds (float): Lifetime of an entry. 0 disables caching altogether.
+    """
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60):
+        if max_size < 1: raise ValueError(f"Invalid cache size: {max_size}")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict = OrderedDict() # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a cached value, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING: return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Cache a value, evicting the least recently used entries if the cache is full."""
+        if self.ttl_seconds <= 0: return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """Drop a cached value, if present."""
+        with self._lock: self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock: self._data.clear()
+
+    def __len__(self):
+        with self._lock: return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
@@ -0,0 +1,43 @@
+from datetime import datetime
+import base64
+import json
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+# NOTE: Cursors are opaque to clients: urlsafe base64 of a small  #
+#       JSON object. They aren't signed, so whatever is decoded   #
+#       from one must be validated before it reaches a query.     #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+def encode_cursor(data: dict) -> str:
+    """
+    Encode keyset position data into an opaque cursor string.
+    datetime values are stored as ISO 8601 strings.
+
+    Args:
+        data (dict): JSON serializable position data.
+
+    Returns:
+        str: The cursor, safe to use in URLs and headers.
+    """
+    raw = json.dumps(data, separators=(",", ":"), default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError("Malformed cursor.") from e
+
+    if not isinstance(data, dict): raise InvalidCursorError("Malformed cursor.")
+    return data
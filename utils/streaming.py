@@ -0,0 +1,41 @@
+from collections.abc import Iterable, Iterator
+from pydantic_core import to_json
+import zlib
+
+def ndjson(items: Iterable, batch_size: int = 500) -> Iterator[bytes]:
+    """
+    Serialize items (models, dicts, ...) as newline-delimited JSON, one item per line.
+    Lines are yielded in chunks of batch_size, so a large export isn't sent one tiny write at a time.
+
+    Args:
+        items (Iterable): The items, e.g. a generator over a stream_query().
+        batch_size (int): Lines per yielded chunk. Defaults to 500.
+
+    Yields:
+        bytes: Chunks of complete lines.
+    """
+    batch = []
+    for item in items:
+        batch.append(to_json(item))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+
+    if batch: yield b"\n".join(batch) + b"\n"
+
+def gzipped(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks into one gzip stream, without holding more than a chunk in memory.
+
+    Args:
+        chunks (Iterable[bytes]): The uncompressed data.
+        level (int): zlib compression level, 1 (fastest) to 9 (smallest). Defaults to 6.
+
+    Yields:
+        bytes: The gzip stream.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # 16+: gzip header and trailer
+    for chunk in chunks:
+        if data := compressor.compress(chunk): yield data
+
+    yield compressor.flush()
@@ -0,0 +1,126 @@
+from collections.abc import Callable
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindBuffer:
+    """
+    Thread-safe write-behind buffer that coalesces writes by key: put() only remembers the
+    latest value per key, and a background thread hands everything pending to flush_fn in
+    one batch every interval_seconds, or as soon as max_pending keys are waiting.
+
+    If flush_fn raises, the batch is put back (values put since then win) and retried on
+    the next flush, so nothing is lost while the database is unreachable.
+
+    The buffer is bounded: once max_buffered keys are pending (e.g. while flushes keep
+    failing), put() rejects new keys and returns False, and the caller writes that value
+    itself. Keys already pending are still replaced, so a key's values never get written
+    out of order.
+
+    Args:
+        flush_fn (Callable[[dict], None]): Writes a batch of {key: latest value}.
+        interval_seconds (float): Time between two background flushes.
+        max_pending (int): Number of pending keys that triggers an early flush.
+        max_buffered (int | None): Number of pending keys beyond which new keys are rejected.
+            Defaults to 10 times max_pending.
+        name (str): Name of the background thread.
+    """
+    def __init__(self, flush_fn: Callable[[dict], None], *, interval_seconds: float = 1.0,
+                 max_pending: int = 500, max_buffered: int | None = None, name: str = "write-behind"):
+        max_buffered = max_buffered if max_buffered is not None else 10 * max_pending
+        if interval_seconds <= 0: raise ValueError(f"Invalid flush interval: {interval_seconds}")
+        if max_pending < 1: raise ValueError(f"Invalid max pending: {max_pending}")
+        if max_buffered < max_pending: raise ValueError(f"Invalid max buffered: {max_buffered}")
+
+        self.flush_fn = flush_fn
+        self.interval_seconds = interval_seconds
+        self.max_pending = max_pending
+        self.max_buffered = max_buffered
+        self.name = name
+        self._pending: dict = {}
+        self._flushing: dict = {} # The batch flush_fn is writing right now
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self):
+        with self._lock: return len(self._pending)
+
+    @property
+    def running(self) -> bool:
+        """Whether the background thread flushes the buffer."""
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def put(self, key, value) -> bool:
+        """
+        Record the latest value of a key, replacing any pending one.
+
+        Returns:
+            bool: False if the key was not buffered because the buffer is full; write it directly.
+        """
+        with self._lock:
+            if key not in self._pending and len(self._pending) >= self.max_buffered:
+                rejected = True
+            else:
+                self._pending[key] = value
+                rejected = False
+            full = len(self._pending) >= self.max_pending
+
+        if full: self._wake.set()
+        if rejected: logger.warning("%s is full (%d keys pending), rejected a write", self.name, self.max_buffered)
+        return not rejected
+
+    def pending(self) -> dict:
+        """Get every value that may not be written yet, including the batch being flushed."""
+        with self._lock: return {**self._flushing, **self._pending}
+
+    def flush(self) -> int:
+        """
+        Write everything pending now, in the calling thread.
+
+        Returns:
+            int: The number of keys written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            if not batch: return 0
+
+            try:
+                self.flush_fn(batch)
+            except BaseException:
+                with self._lock: self._pending = {**batch, **self._pending}
+                raise
+            finally:
+                with self._lock: self._flushing = {}
+
+            return len(batch)
+
+    def start(self):
+        """Start the background flushes. Does nothing if they already run."""
+        if self.running: return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        """Stop the background flushes and write whatever is still pending."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            try: self.flush()
+            except Exception: logger.exception("%s flush failed, retrying on the next one", self.name)